@@ -0,0 +1,195 @@
+"""
+Input backends and speed profiles
+MouseAction and KeyboardAction send their events through a backend:
+pyautogui on a real or virtual display (run under Xvfb for CI on Linux),
+or a recorder that only logs events, for tests, benchmarks and dry runs
+"""
+import logging
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import pyautogui
+    PYAUTOGUI_AVAILABLE = True
+    # Fail-safe: move to corner to stop
+    pyautogui.FAILSAFE = True
+except Exception:  # ImportError, or no display to connect to
+    PYAUTOGUI_AVAILABLE = False
+
+try:
+    import pyperclip
+except ImportError:
+    pyperclip = None
+
+logger = logging.getLogger("agent_s.actions.backend")
+
+# Default timings per speed profile (seconds); explicit action params win.
+# "human" is the timing the handlers always used; its pause after every
+# mouse or keyboard action replaces pyautogui's own 0.1 s PAUSE (backend
+# calls pass _pause=False). "demo" is slow enough to follow on screen.
+SPEED_PROFILES = {
+    "instant": {"type_interval": 0.0, "press_interval": 0.0, "move_duration": 0.0, "pause": 0.0, "paste": True},
+    "human": {"type_interval": 0.01, "press_interval": 0.1, "move_duration": 0.5, "pause": 0.1, "paste": True},
+    "demo": {"type_interval": 0.08, "press_interval": 0.3, "move_duration": 1.0, "pause": 0.5, "paste": False},
+}
+DEFAULT_PROFILE = os.getenv("AGENT_INPUT_PROFILE", "human")
+
+PASTE_HOTKEY = ("command", "v") if sys.platform == "darwin" else ("ctrl", "v")
+
+
+def speed_profile(name: Optional[str] = None) -> Dict[str, Any]:
+    """Timings of a speed profile (default: AGENT_INPUT_PROFILE)"""
+    name = name or DEFAULT_PROFILE
+    if name not in SPEED_PROFILES:
+        raise ValueError(f"Unknown speed profile: {name} (expected one of {', '.join(SPEED_PROFILES)})")
+    return SPEED_PROFILES[name]
+
+
+class PyAutoGUIBackend:
+    """
+    Real input through pyautogui
+
+    Calls pass _pause=False: the handlers pause per speed profile, and the
+    execution engine already waits for the screen to settle after a step.
+    """
+
+    name = "pyautogui"
+
+    def __init__(self):
+        self.available = PYAUTOGUI_AVAILABLE
+
+    def move(self, x: int, y: int, duration: float):
+        pyautogui.moveTo(x, y, duration=duration, _pause=False)
+
+    def click(self, x: Optional[int], y: Optional[int], button: str = "left", clicks: int = 1, interval: float = 0.0):
+        pyautogui.click(x, y, clicks=clicks, interval=interval, button=button, _pause=False)
+
+    def drag(self, x: int, y: int, duration: float, button: str = "left"):
+        # Absolute, like every other coordinate in a plan (pyautogui.drag is relative)
+        pyautogui.dragTo(x, y, duration=duration, button=button, _pause=False)
+
+    def scroll(self, clicks: int, x: Optional[int] = None, y: Optional[int] = None):
+        pyautogui.scroll(clicks, x=x, y=y, _pause=False)
+
+    def write(self, text: str, interval: float):
+        pyautogui.write(text, interval=interval, _pause=False)
+
+    def press(self, key: str, presses: int = 1, interval: float = 0.0):
+        pyautogui.press(key, presses=presses, interval=interval, _pause=False)
+
+    def hotkey(self, keys: Sequence[str]):
+        pyautogui.hotkey(*keys, _pause=False)
+
+    def paste(self, text: str) -> bool:
+        """
+        Enter text through the clipboard, restoring what was on it
+
+        Returns:
+            False if there is no usable clipboard (the caller types instead)
+        """
+        if pyperclip is None:
+            return False
+        try:
+            previous = pyperclip.paste()
+            pyperclip.copy(text)
+        except pyperclip.PyperclipException as e:
+            logger.debug(f"Clipboard unavailable: {e}")
+            return False
+        try:
+            pyautogui.hotkey(*PASTE_HOTKEY, _pause=False)
+            # Let the application read the clipboard before it is restored
+            time.sleep(0.05)
+        finally:
+            pyperclip.copy(previous)
+        return True
+
+    def position(self) -> Tuple[int, int]:
+        return tuple(pyautogui.position())
+
+    def sleep(self, seconds: float):
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class RecordingBackend:
+    """
+    Records input events instead of sending them
+
+    Nothing sleeps: `elapsed` adds up the time the same events would have
+    taken on a display (typing intervals, mouse tweens and pauses), so
+    tests stay fast and benchmarks can compare profiles without a screen.
+    """
+
+    name = "mock"
+    available = True
+
+    def __init__(self, clipboard: bool = True):
+        """
+        Args:
+            clipboard: Whether paste() works (False behaves like a display
+                without a clipboard tool)
+        """
+        self.clipboard = clipboard
+        self.events: List[Dict[str, Any]] = []
+        self.elapsed = 0.0
+        self.cursor = (0, 0)
+
+    def _record(self, event: str, seconds: float = 0.0, **details):
+        self.events.append({"event": event, **details})
+        self.elapsed += seconds
+
+    def move(self, x: int, y: int, duration: float):
+        self.cursor = (x, y)
+        self._record("move", duration, x=x, y=y)
+
+    def click(self, x: Optional[int], y: Optional[int], button: str = "left", clicks: int = 1, interval: float = 0.0):
+        if x is not None and y is not None:
+            self.cursor = (x, y)
+        self._record("click", interval * (clicks - 1), x=self.cursor[0], y=self.cursor[1], button=button, clicks=clicks)
+
+    def drag(self, x: int, y: int, duration: float, button: str = "left"):
+        self.cursor = (x, y)
+        self._record("drag", duration, x=x, y=y, button=button)
+
+    def scroll(self, clicks: int, x: Optional[int] = None, y: Optional[int] = None):
+        if x is not None and y is not None:
+            self.cursor = (x, y)
+        self._record("scroll", clicks=clicks)
+
+    def write(self, text: str, interval: float):
+        self._record("write", interval * len(text), text=text)
+
+    def press(self, key: str, presses: int = 1, interval: float = 0.0):
+        self._record("press", interval * presses, key=key, presses=presses)
+
+    def hotkey(self, keys: Sequence[str]):
+        self._record("hotkey", keys=list(keys))
+
+    def paste(self, text: str) -> bool:
+        if not self.clipboard:
+            return False
+        self._record("paste", 0.05, text=text)
+        return True
+
+    def position(self) -> Tuple[int, int]:
+        return self.cursor
+
+    def sleep(self, seconds: float):
+        self.elapsed += seconds
+
+
+def get_backend(name: Optional[str] = None):
+    """
+    The input backend to use
+
+    Args:
+        name: "pyautogui" or "mock" (default: AGENT_INPUT_BACKEND, pyautogui)
+    """
+    name = name or os.getenv("AGENT_INPUT_BACKEND", "pyautogui")
+    if name == "pyautogui":
+        return PyAutoGUIBackend()
+    if name == "mock":
+        return RecordingBackend()
+    raise ValueError(f"Unknown input backend: {name}")
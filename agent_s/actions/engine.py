@@ -0,0 +1,319 @@
+"""
+Closed-loop action execution
+Runs a plan one action at a time and, after each input action, watches
+cheap low-resolution captures until the UI has reacted and settled instead
+of sleeping a fixed delay
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger("agent_s.actions.engine")
+
+# Actions whose effect shows up on the screen
+INPUT_ACTIONS = ("mouse", "keyboard")
+
+
+class ExecutionEngine:
+    """
+    Observe-act loop over the mouse, keyboard, wait and mcp_tool actions
+
+    After a mouse or keyboard action the engine polls probe captures
+    (grayscale, downscaled by probe_scale) with a backoff from poll_min to
+    poll_max. A step is done as soon as its expected change appears (an
+    action's optional "expect": {"region": [x, y, width, height]}), when
+    the screen changed and then stayed still for `quiet` seconds, or when
+    nothing changed within the grace period: three times the UI's usual
+    response latency, learned as a moving average of how long past actions
+    took to show their first change. No step waits longer than step_timeout.
+
+    Consecutive keyboard actions run as one batch (KeyboardAction.
+    execute_batch) with a single wait at the end, since keystrokes need no
+    screen reaction in between; an action with an "expect" ends its batch.
+    """
+
+    def __init__(
+        self,
+        screen,
+        mouse,
+        keyboard,
+        mcp_client=None,
+        step_timeout: Optional[float] = None,
+        quiet: Optional[float] = None,
+        poll_min: float = 0.03,
+        poll_max: float = 0.25,
+        probe_scale: int = 4,
+        threshold: int = 24,
+        min_changed_pixels: int = 4
+    ):
+        """
+        Args:
+            screen: ScreenAction used for probe captures
+            mouse, keyboard: MouseAction and KeyboardAction
+            mcp_client: MCPClient for mcp_tool actions
+            step_timeout: Longest wait after one action (AGENT_STEP_TIMEOUT)
+            quiet: Stillness that counts as settled (AGENT_SETTLE_QUIET)
+            poll_min, poll_max: Probe interval bounds in seconds
+            probe_scale: Downscale factor of probe captures
+            threshold: Smallest gray-level change that counts
+            min_changed_pixels: Changed probe pixels that make a change
+        """
+        if step_timeout is None:
+            step_timeout = float(os.getenv("AGENT_STEP_TIMEOUT", 5.0))
+        if quiet is None:
+            quiet = float(os.getenv("AGENT_SETTLE_QUIET", 0.15))
+        self.screen = screen
+        self.mouse = mouse
+        self.keyboard = keyboard
+        self.mcp_client = mcp_client
+        self.step_timeout = step_timeout
+        self.quiet = quiet
+        self.poll_min = poll_min
+        self.poll_max = poll_max
+        self.probe_scale = probe_scale
+        self.threshold = threshold
+        self.min_changed_pixels = min_changed_pixels
+
+        # Moving average of action -> first visible change (seconds)
+        self.response_latency = 0.3
+
+    @property
+    def grace(self) -> float:
+        """How long to wait for a reaction before deciding there is none"""
+        return min(max(3 * self.response_latency, 0.2), self.step_timeout)
+
+    async def run(
+        self,
+        actions: List[Dict[str, Any]],
+        on_step: Optional[Callable[[Dict[str, Any]], None]] = None,
+        profile: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Execute actions in order
+
+        A failed action is recorded and the remaining actions still run,
+        as the old fixed-delay loop did.
+
+        Args:
+            actions: Validated plan
+            on_step: Called with each step report as it completes
+            profile: Input speed profile (instant, human or demo)
+
+        Returns:
+            One report per action: index, type, description, success, error,
+            and timings in seconds (execute, first_change, settle, total)
+            with whether the screen changed, whether an expected change
+            was seen (None if none was given) and whether the wait timed out;
+            actions run as a batch also carry its size ("batch")
+        """
+        reports = []
+        i = 0
+        while i < len(actions):
+            size = self._keyboard_run(actions, i)
+            if size > 1:
+                batch = await self.step_batch(i, actions[i:i + size], profile)
+            else:
+                batch = [await self.step(i, actions[i], profile)]
+            for report in batch:
+                reports.append(report)
+                if on_step is not None:
+                    on_step(report)
+            i += len(batch)
+        return reports
+
+    @staticmethod
+    def _keyboard_run(actions: List[Dict[str, Any]], start: int) -> int:
+        """Length of the batchable keyboard actions from start (0 if none)"""
+        size = 0
+        while start + size < len(actions) and actions[start + size].get("type") == "keyboard":
+            size += 1
+            if actions[start + size - 1].get("expect"):
+                break
+        return size
+
+    def _report(self, index: int, action: Dict[str, Any]) -> Dict[str, Any]:
+        kind = action.get("type")
+        return {
+            "index": index,
+            "type": kind,
+            "description": action.get("description", kind),
+            "success": True,
+            "error": None,
+            "execute": 0.0,
+            "first_change": None,
+            "settle": 0.0,
+            "total": 0.0,
+            "changed": False,
+            "expected": None,
+            "timed_out": False,
+        }
+
+    async def step(self, index: int, action: Dict[str, Any], profile: Optional[str] = None) -> Dict[str, Any]:
+        """Execute one action and wait for its effect"""
+        kind = action.get("type")
+        report = self._report(index, action)
+        logger.info(f"Executing action {index + 1}: {kind}")
+        started = time.monotonic()
+
+        before = await self._probe() if kind in INPUT_ACTIONS else None
+        try:
+            result = await self._execute(action, profile)
+            if isinstance(result, dict) and result.get("success") is False:
+                report["success"], report["error"] = False, str(result.get("error", "failed"))
+            elif isinstance(result, dict) and "artifact_url" in result:
+                report["artifact_url"] = result["artifact_url"]
+        except Exception as e:
+            logger.error(f"Error executing action {index + 1}: {e}")
+            report["success"], report["error"] = False, str(e)
+        acted = time.monotonic()
+        report["execute"] = round(acted - started, 4)
+
+        if kind in INPUT_ACTIONS and report["success"]:
+            region = (action.get("expect") or {}).get("region")
+            await self._settle(before, acted, report, region)
+
+        report["total"] = round(time.monotonic() - started, 4)
+        logger.debug(f"Step {index + 1} timings: {report}")
+        return report
+
+    async def step_batch(
+        self,
+        index: int,
+        actions: List[Dict[str, Any]],
+        profile: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Execute consecutive keyboard actions together and wait once
+
+        Every report carries the batch's execute time; the wait for the
+        screen (and the last action's expect, if any) is on the last one.
+        """
+        reports = [self._report(index + i, action) for i, action in enumerate(actions)]
+        logger.info(f"Executing actions {index + 1}-{index + len(actions)}: keyboard batch")
+        started = time.monotonic()
+
+        before = await self._probe()
+        try:
+            results = await asyncio.to_thread(
+                self.keyboard.execute_batch, [action.get("params", {}) for action in actions], profile
+            )
+        except Exception as e:
+            logger.error(f"Error executing actions {index + 1}-{index + len(actions)}: {e}")
+            results = [{"success": False, "error": str(e)}] * len(actions)
+        acted = time.monotonic()
+
+        for report, result in zip(reports, results):
+            report["batch"] = len(actions)
+            report["execute"] = round(acted - started, 4)
+            if isinstance(result, dict) and result.get("success") is False:
+                report["success"], report["error"] = False, str(result.get("error", "failed"))
+            report["total"] = report["execute"]
+
+        last = reports[-1]
+        if any(report["success"] for report in reports):
+            region = (actions[-1].get("expect") or {}).get("region")
+            await self._settle(before, acted, last, region)
+        last["total"] = round(time.monotonic() - started, 4)
+        logger.debug(f"Batch {index + 1}-{index + len(actions)} timings: {last}")
+        return reports
+
+    async def _execute(self, action: Dict[str, Any], profile: Optional[str] = None) -> Any:
+        kind = action["type"]
+        params = action.get("params", {})
+        if kind == "mouse":
+            # pyautogui blocks (moves have a duration); keep it off the loop
+            return await asyncio.to_thread(self.mouse.execute, params, profile)
+        if kind == "keyboard":
+            return await asyncio.to_thread(self.keyboard.execute, params, profile)
+        if kind == "wait":
+            await asyncio.sleep(params.get("duration", 1))
+            return None
+        if kind == "mcp_tool":
+            if self.mcp_client is None:
+                raise RuntimeError("No MCP client configured")
+            return await self.mcp_client.execute_tool(tool_name=action["tool"], params=params)
+        raise ValueError(f"Unknown action type: {kind}")
+
+    async def _settle(
+        self,
+        before: Optional[np.ndarray],
+        acted: float,
+        report: Dict[str, Any],
+        region: Optional[List[int]] = None
+    ):
+        """Poll until the expected change, or until the screen reacted and went still"""
+        if before is None:
+            # Nothing to compare against: fall back to a fixed pause
+            await asyncio.sleep(self.grace)
+            report["settle"] = round(self.grace, 4)
+            return
+
+        grace = self.grace
+        interval = self.poll_min
+        if region is not None:
+            report["expected"] = False
+            x, y, w, h = (v // self.probe_scale for v in region)
+            window = (slice(y, y + max(h, 1)), slice(x, x + max(w, 1)))
+        last, last_change = before, None
+        while True:
+            await asyncio.sleep(interval)
+            current = await self._probe()
+            now = time.monotonic()
+            if current is None:
+                break
+            if self._differs(last, current):
+                last, last_change = current, now
+                if report["first_change"] is None:
+                    report["first_change"] = round(now - acted, 4)
+                    report["changed"] = True
+                interval = self.poll_min
+            else:
+                interval = min(interval * 1.5, self.poll_max)
+
+            if region is not None and self._differs(before[window], current[window]):
+                report["expected"] = True
+                break
+            if last_change is not None and now - last_change >= self.quiet:
+                break
+            if last_change is None and now - acted >= grace:
+                break
+            if now - acted >= self.step_timeout:
+                report["timed_out"] = True
+                logger.warning(f"Screen did not settle within {self.step_timeout}s")
+                break
+
+        report["settle"] = round(time.monotonic() - acted, 4)
+        if report["first_change"] is not None:
+            self.response_latency = 0.7 * self.response_latency + 0.3 * report["first_change"]
+
+    async def _probe(self) -> Optional[np.ndarray]:
+        """A cheap capture for change detection (None if capture fails)"""
+        try:
+            return await asyncio.to_thread(self._grab_probe)
+        except Exception as e:
+            logger.warning(f"Probe capture failed: {e}")
+            return None
+
+    def _grab_probe(self) -> np.ndarray:
+        frame = self.screen.grab()
+        image = frame.image.reduce(self.probe_scale) if self.probe_scale > 1 else frame.image
+        return np.asarray(image.convert("L"))
+
+    def _differs(self, a: np.ndarray, b: np.ndarray) -> bool:
+        if a.shape != b.shape:
+            return True
+        changed = (np.maximum(a, b) - np.minimum(a, b)) > self.threshold
+        return int(np.count_nonzero(changed)) >= self.min_changed_pixels
+
+    def stats(self) -> Dict[str, Any]:
+        """Settings and learned latency for /health"""
+        return {
+            "response_latency": round(self.response_latency, 4),
+            "grace": round(self.grace, 4),
+            "quiet": self.quiet,
+            "step_timeout": self.step_timeout
+        }
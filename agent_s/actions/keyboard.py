@@ -3,14 +3,10 @@ Keyboard Action Handler
 Controls keyboard input
 """
 import logging
-from typing import Dict, Any, List
-import time
+import os
+from typing import Dict, Any, List, Optional
 
-try:
-    import pyautogui
-    PYAUTOGUI_AVAILABLE = True
-except ImportError:
-    PYAUTOGUI_AVAILABLE = False
+from agent_s.actions.backend import get_backend, speed_profile
 
 logger = logging.getLogger("agent_s.actions.keyboard")
 
@@ -18,13 +14,28 @@ logger = logging.getLogger("agent_s.actions.keyboard")
 class KeyboardAction:
     """Handle keyboard input operations"""
     
-    def __init__(self):
-        if not PYAUTOGUI_AVAILABLE:
+    def __init__(self, backend=None, allow_paste: Optional[bool] = None, paste_min_chars: Optional[int] = None):
+        """
+        Args:
+            backend: Input backend (default: get_backend())
+            allow_paste: Enter long text through the clipboard (AGENT_ALLOW_PASTE)
+            paste_min_chars: Shortest text that is pasted rather than typed
+                (AGENT_PASTE_MIN_CHARS)
+        """
+        if allow_paste is None:
+            allow_paste = os.getenv("AGENT_ALLOW_PASTE", "true").lower() in ("1", "true", "yes")
+        if paste_min_chars is None:
+            paste_min_chars = int(os.getenv("AGENT_PASTE_MIN_CHARS", 40))
+        self.backend = backend or get_backend()
+        self.allow_paste = allow_paste
+        self.paste_min_chars = paste_min_chars
+        
+        if not self.backend.available:
             logger.warning("pyautogui not available, keyboard actions will fail")
         else:
-            logger.info("KeyboardAction initialized with pyautogui")
+            logger.info(f"KeyboardAction initialized with {self.backend.name}")
     
-    def execute(self, params: Dict[str, Any]) -> Dict[str, Any]:
+    def execute(self, params: Dict[str, Any], profile: Optional[str] = None) -> Dict[str, Any]:
         """
         Execute keyboard action
         
@@ -35,56 +46,116 @@ class KeyboardAction:
                 - key: Key to press
                 - keys: List of keys for hotkey
                 - interval: Time between keystrokes
-                
+            profile: Speed profile for timings the params leave out
+        
         Returns:
             Result dictionary
         """
-        if not PYAUTOGUI_AVAILABLE:
+        if not self.backend.available:
             raise RuntimeError("pyautogui not available for keyboard control")
         
+        speed = speed_profile(profile)
+        result = self._run(params, speed)
+        self.backend.sleep(speed["pause"])
+        return result
+    
+    def execute_batch(self, actions: List[Dict[str, Any]], profile: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Execute several keyboard actions back to back
+        
+        Consecutive type/write actions without an interval of their own are
+        joined into one text, entered in one go; the profile's pause
+        follows each event, as it does after execute().
+        
+        Args:
+            actions: Parameters of each action, as for execute()
+            profile: Speed profile for timings the params leave out
+        
+        Returns:
+            One result per action (joined actions share theirs)
+        """
+        if not self.backend.available:
+            raise RuntimeError("pyautogui not available for keyboard control")
+        
+        speed = speed_profile(profile)
+        results: List[Dict[str, Any]] = []
+        i = 0
+        while i < len(actions):
+            end = i + 1
+            if self._joinable(actions[i]):
+                while end < len(actions) and self._joinable(actions[end]):
+                    end += 1
+            if end - i > 1:
+                text = "".join(params["text"] for params in actions[i:end])
+                result = self._run({"action": "type", "text": text}, speed)
+                if result["success"]:
+                    result["coalesced"] = end - i
+                results += [result] * (end - i)
+            else:
+                results.append(self._run(actions[i], speed))
+            self.backend.sleep(speed["pause"])
+            i = end
+        return results
+    
+    @staticmethod
+    def _joinable(params: Dict[str, Any]) -> bool:
+        return params.get("action", "type") in ("type", "write") and bool(params.get("text")) and "interval" not in params
+    
+    def _run(self, params: Dict[str, Any], speed: Dict[str, Any]) -> Dict[str, Any]:
         action = params.get("action", "type")
         
         try:
             if action == "type" or action == "write":
-                return self._type_text(params)
+                return self._type_text(params, speed)
             elif action == "press":
-                return self._press_key(params)
+                return self._press_key(params, speed)
             elif action == "hotkey":
                 return self._hotkey(params)
             else:
                 raise ValueError(f"Unknown keyboard action: {action}")
-                
+        
         except Exception as e:
             logger.error(f"Keyboard action failed: {e}")
             return {"success": False, "error": str(e)}
     
-    def _type_text(self, params: Dict[str, Any]) -> Dict[str, Any]:
+    def _type_text(self, params: Dict[str, Any], speed: Dict[str, Any]) -> Dict[str, Any]:
         """Type text string"""
         text = params.get("text", "")
-        interval = params.get("interval", 0.01)  # Delay between keystrokes
+        interval = params.get("interval", speed["type_interval"])  # Delay between keystrokes
         
         if not text:
             raise ValueError("Text parameter required for type action")
         
-        pyautogui.write(text, interval=interval)
-        logger.info(f"Typed text: {text[:50]}{'...' if len(text) > 50 else ''}")
+        # Long single-line text goes through the clipboard in one keystroke;
+        # newlines are typed, so Enter still submits as it would when typing
+        method = "type"
+        if (
+            self.allow_paste and speed["paste"] and "interval" not in params
+            and len(text) >= self.paste_min_chars and "\n" not in text
+            and self.backend.paste(text)
+        ):
+            method = "paste"
+        else:
+            self.backend.write(text, interval)
+        logger.info(f"Typed text ({method}): {text[:50]}{'...' if len(text) > 50 else ''}")
         
         return {
             "success": True,
             "action": "type",
-            "text_length": len(text)
+            "text_length": len(text),
+            "method": method
         }
     
-    def _press_key(self, params: Dict[str, Any]) -> Dict[str, Any]:
+    def _press_key(self, params: Dict[str, Any], speed: Dict[str, Any]) -> Dict[str, Any]:
         """Press a single key or key combination"""
         key = params.get("key")
         presses = params.get("presses", 1)
-        interval = params.get("interval", 0.1)
+        interval = params.get("interval", speed["press_interval"])
         
         if not key:
             raise ValueError("Key parameter required for press action")
         
-        pyautogui.press(key, presses=presses, interval=interval)
+        self.backend.press(key, presses=presses, interval=interval)
         logger.info(f"Pressed key: {key} ({presses} times)")
         
         return {
@@ -104,7 +175,7 @@ class KeyboardAction:
         if isinstance(keys, str):
             keys = keys.split("+")
         
-        pyautogui.hotkey(*keys)
+        self.backend.hotkey(keys)
         logger.info(f"Pressed hotkey: {'+'.join(keys)}")
         
         return {
@@ -116,8 +187,8 @@ class KeyboardAction:
     def type_slowly(self, text: str, delay: float = 0.1):
         """Type text with visible delay (for demonstration)"""
         for char in text:
-            pyautogui.write(char)
-            time.sleep(delay)
+            self.backend.write(char, 0)
+            self.backend.sleep(delay)
     
     @staticmethod
     def get_special_keys() -> List[str]:
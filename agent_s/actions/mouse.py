@@ -3,15 +3,9 @@ Mouse Action Handler
 Controls mouse movement and clicks
 """
 import logging
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Optional, Tuple
 
-try:
-    import pyautogui
-    PYAUTOGUI_AVAILABLE = True
-    # Fail-safe: move to corner to stop
-    pyautogui.FAILSAFE = True
-except ImportError:
-    PYAUTOGUI_AVAILABLE = False
+from agent_s.actions.backend import get_backend, speed_profile
 
 logger = logging.getLogger("agent_s.actions.mouse")
 
@@ -19,13 +13,18 @@ logger = logging.getLogger("agent_s.actions.mouse")
 class MouseAction:
     """Handle mouse control operations"""
     
-    def __init__(self):
-        if not PYAUTOGUI_AVAILABLE:
+    def __init__(self, backend=None):
+        """
+        Args:
+            backend: Input backend (default: get_backend())
+        """
+        self.backend = backend or get_backend()
+        if not self.backend.available:
             logger.warning("pyautogui not available, mouse actions will fail")
         else:
-            logger.info("MouseAction initialized with pyautogui")
+            logger.info(f"MouseAction initialized with {self.backend.name}")
     
-    def execute(self, params: Dict[str, Any]) -> Dict[str, Any]:
+    def execute(self, params: Dict[str, Any], profile: Optional[str] = None) -> Dict[str, Any]:
         """
         Execute mouse action
         
@@ -35,34 +34,40 @@ class MouseAction:
                 - x, y: Coordinates
                 - button: "left", "right", "middle" (for clicks)
                 - duration: Movement duration in seconds
-                
+            profile: Speed profile for timings the params leave out
+        
         Returns:
             Result dictionary
         """
-        if not PYAUTOGUI_AVAILABLE:
+        if not self.backend.available:
             raise RuntimeError("pyautogui not available for mouse control")
         
         action = params.get("action", "click")
+        speed = speed_profile(profile)
         
         try:
             if action == "click":
-                return self._click(params)
+                result = self._click(params)
             elif action == "double_click":
-                return self._double_click(params)
+                result = self._double_click(params)
             elif action == "right_click":
-                return self._right_click(params)
+                result = self._right_click(params)
             elif action == "move":
-                return self._move(params)
+                result = self._move(params, speed)
             elif action == "drag":
-                return self._drag(params)
+                result = self._drag(params, speed)
             elif action == "scroll":
-                return self._scroll(params)
+                result = self._scroll(params)
             else:
                 raise ValueError(f"Unknown mouse action: {action}")
-                
+        
         except Exception as e:
             logger.error(f"Mouse action failed: {e}")
             return {"success": False, "error": str(e)}
+        
+        # Stands in for pyautogui's own pause after each call
+        self.backend.sleep(speed["pause"])
+        return result
     
     def _click(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """Perform mouse click"""
@@ -70,11 +75,10 @@ class MouseAction:
         y = params.get("y")
         button = params.get("button", "left")
         
+        self.backend.click(x, y, button=button)
         if x is not None and y is not None:
-            pyautogui.click(x, y, button=button)
             logger.info(f"Clicked at ({x}, {y}) with {button} button")
         else:
-            pyautogui.click(button=button)
             logger.info(f"Clicked at current position with {button} button")
         
         return {"success": True, "action": "click", "x": x, "y": y, "button": button}
@@ -84,11 +88,10 @@ class MouseAction:
         x = params.get("x")
         y = params.get("y")
         
+        self.backend.click(x, y, clicks=2)
         if x is not None and y is not None:
-            pyautogui.doubleClick(x, y)
             logger.info(f"Double-clicked at ({x}, {y})")
         else:
-            pyautogui.doubleClick()
             logger.info("Double-clicked at current position")
         
         return {"success": True, "action": "double_click", "x": x, "y": y}
@@ -98,40 +101,39 @@ class MouseAction:
         x = params.get("x")
         y = params.get("y")
         
+        self.backend.click(x, y, button="right")
         if x is not None and y is not None:
-            pyautogui.rightClick(x, y)
             logger.info(f"Right-clicked at ({x}, {y})")
         else:
-            pyautogui.rightClick()
             logger.info("Right-clicked at current position")
         
         return {"success": True, "action": "right_click", "x": x, "y": y}
     
-    def _move(self, params: Dict[str, Any]) -> Dict[str, Any]:
+    def _move(self, params: Dict[str, Any], speed: Dict[str, Any]) -> Dict[str, Any]:
         """Move mouse to position"""
         x = params.get("x")
         y = params.get("y")
-        duration = params.get("duration", 0.5)
+        duration = params.get("duration", speed["move_duration"])
         
         if x is None or y is None:
             raise ValueError("x and y coordinates required for move action")
         
-        pyautogui.moveTo(x, y, duration=duration)
+        self.backend.move(x, y, duration)
         logger.info(f"Moved mouse to ({x}, {y})")
         
         return {"success": True, "action": "move", "x": x, "y": y}
     
-    def _drag(self, params: Dict[str, Any]) -> Dict[str, Any]:
+    def _drag(self, params: Dict[str, Any], speed: Dict[str, Any]) -> Dict[str, Any]:
         """Drag mouse from current position or specified start to end"""
         x = params.get("x")
         y = params.get("y")
-        duration = params.get("duration", 0.5)
+        duration = params.get("duration", speed["move_duration"])
         button = params.get("button", "left")
         
         if x is None or y is None:
             raise ValueError("x and y coordinates required for drag action")
         
-        pyautogui.drag(x, y, duration=duration, button=button)
+        self.backend.drag(x, y, duration, button=button)
         logger.info(f"Dragged to ({x}, {y})")
         
         return {"success": True, "action": "drag", "x": x, "y": y}
@@ -142,17 +144,14 @@ class MouseAction:
         x = params.get("x")
         y = params.get("y")
         
-        if x is not None and y is not None:
-            pyautogui.moveTo(x, y)
-        
-        pyautogui.scroll(clicks)
+        self.backend.scroll(clicks, x, y)
         logger.info(f"Scrolled {clicks} clicks")
         
         return {"success": True, "action": "scroll", "clicks": clicks}
     
     def get_position(self) -> Tuple[int, int]:
         """Get current mouse position"""
-        if not PYAUTOGUI_AVAILABLE:
+        if not self.backend.available:
             return (0, 0)
         
-        return pyautogui.position()
+        return self.backend.position()
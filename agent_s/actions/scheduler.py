@@ -0,0 +1,270 @@
+"""
+Job scheduler for Agent-S requests
+Serializes everything that drives the mouse and keyboard through one
+desktop-control lane, while requests that only look at the screen run in
+parallel beside it
+"""
+import asyncio
+import itertools
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger("agent_s.actions.scheduler")
+
+# Lanes
+CONTROL = "control"
+ANALYSIS = "analysis"
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    """The job was cancelled before it produced a result"""
+
+
+class Job:
+    """One queued request: a coroutine factory plus its lifecycle"""
+
+    def __init__(
+        self,
+        run: Callable[[], Awaitable[Any]],
+        lane: str,
+        priority: int = 0,
+        description: str = ""
+    ):
+        self.id = uuid.uuid4().hex[:12]
+        self.run = run
+        self.lane = lane
+        self.priority = priority
+        self.description = description
+        self.status = QUEUED
+        self.sequence = 0
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+        self._task: Optional[asyncio.Task] = None
+        self._done = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status in FINISHED
+
+    async def wait(self) -> Any:
+        """
+        The job's result once it has finished
+
+        Raises:
+            JobCancelled: The job was cancelled
+            Exception: Whatever the job raised
+        """
+        await self._done.wait()
+        if self.status == CANCELLED:
+            raise JobCancelled(f"Job {self.id} was cancelled")
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Status for polling (the result only once the job succeeded)"""
+        now = time.time()
+        return {
+            "job_id": self.id,
+            "lane": self.lane,
+            "priority": self.priority,
+            "description": self.description,
+            "status": self.status,
+            "created": datetime.fromtimestamp(self.created).isoformat(),
+            "wait": round((self.started or self.finished or now) - self.created, 3),
+            "duration": round((self.finished or now) - self.started, 3) if self.started else None,
+            "result": self.result if self.status == SUCCEEDED else None,
+            "error": str(self.error) if self.error is not None else None,
+        }
+
+
+class JobScheduler:
+    """
+    Priority queues with a fixed number of workers per lane
+
+    The control lane has a single worker, so desktop-control jobs run one
+    at a time: the highest priority first, in submission order among equal
+    priorities. The analysis lane runs up to analysis_workers jobs at once.
+    Finished jobs stay queryable until max_history newer ones have finished.
+    """
+
+    def __init__(self, analysis_workers: Optional[int] = None, max_history: int = 100):
+        """
+        Args:
+            analysis_workers: Concurrent analysis-only jobs (AGENT_ANALYSIS_WORKERS)
+            max_history: Finished jobs kept for status polling
+        """
+        if analysis_workers is None:
+            analysis_workers = int(os.getenv("AGENT_ANALYSIS_WORKERS", 2))
+        self.workers = {CONTROL: 1, ANALYSIS: max(analysis_workers, 1)}
+        self.max_history = max_history
+
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._history: deque = deque()
+        self._queues: Dict[str, asyncio.PriorityQueue] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._sequence = itertools.count()
+
+        self.counts = {lane: {"submitted": 0, SUCCEEDED: 0, FAILED: 0, CANCELLED: 0} for lane in self.workers}
+        self._wait_total = {lane: 0.0 for lane in self.workers}
+        self._run_total = {lane: 0.0 for lane in self.workers}
+        self._started = {lane: 0 for lane in self.workers}
+
+    def submit(
+        self,
+        run: Callable[[], Awaitable[Any]],
+        lane: str = CONTROL,
+        priority: int = 0,
+        description: str = ""
+    ) -> Job:
+        """
+        Queue a job
+
+        Args:
+            run: Called with no arguments when the job starts; returns the
+                coroutine to run
+            lane: CONTROL for anything that moves the mouse or types,
+                ANALYSIS for jobs that only read the screen
+            priority: Higher runs first among queued jobs of the lane
+            description: Shown in status and logs
+        """
+        if lane not in self.workers:
+            raise ValueError(f"Unknown lane: {lane}")
+        self._start()
+        job = Job(run, lane, priority, description)
+        job.sequence = next(self._sequence)
+        self._jobs[job.id] = job
+        self.counts[lane]["submitted"] += 1
+        self._queues[lane].put_nowait((-priority, job.sequence, job))
+        logger.info(f"Queued {lane} job {job.id} (priority {priority}): {description[:60]}")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def position(self, job: Job) -> Optional[int]:
+        """Jobs of the same lane that will start before a queued job (None once it started)"""
+        if job.status != QUEUED:
+            return None
+        key = (-job.priority, job.sequence)
+        return sum(
+            1 for other in self._jobs.values()
+            if other.lane == job.lane and other.status == QUEUED
+            and (-other.priority, other.sequence) < key
+        )
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """A job's status with its queue position, or None if unknown"""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        return {**job.to_dict(), "position": self.position(job)}
+
+    def jobs(self) -> List[Dict[str, Any]]:
+        """Status of every known job, oldest first"""
+        return [self.status(job_id) for job_id in list(self._jobs)]
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a queued or running job
+
+        A queued job is skipped when its turn comes; a running one is
+        cancelled at its next await (an input action already handed to a
+        worker thread still completes).
+
+        Returns:
+            False if the job is unknown or already finished
+        """
+        job = self._jobs.get(job_id)
+        if job is None or job.done:
+            return False
+        if job.status == QUEUED:
+            self._finish(job, CANCELLED)
+        elif job._task is not None:
+            job._task.cancel()
+        logger.info(f"Cancelled job {job.id}")
+        return True
+
+    def _start(self):
+        """Start the lane workers on first use (they need a running loop)"""
+        if self._tasks:
+            return
+        for lane, count in self.workers.items():
+            self._queues[lane] = asyncio.PriorityQueue()
+            self._tasks += [asyncio.ensure_future(self._worker(lane)) for _ in range(count)]
+
+    async def _worker(self, lane: str):
+        queue = self._queues[lane]
+        while True:
+            _, _, job = await queue.get()
+            if job.status != QUEUED:
+                continue  # cancelled while waiting
+            job.status, job.started = RUNNING, time.time()
+            self._started[lane] += 1
+            self._wait_total[lane] += job.started - job.created
+            job._task = asyncio.ensure_future(job.run())
+            try:
+                job.result = await job._task
+                self._finish(job, SUCCEEDED)
+            except asyncio.CancelledError:
+                self._finish(job, CANCELLED)
+                if asyncio.current_task().cancelling():
+                    raise  # the scheduler itself is shutting down
+            except Exception as e:
+                logger.error(f"Job {job.id} failed: {e}")
+                job.error = e
+                self._finish(job, FAILED)
+
+    def _finish(self, job: Job, status: str):
+        job.status, job.finished = status, time.time()
+        self.counts[job.lane][status] += 1
+        if job.started is not None:
+            self._run_total[job.lane] += job.finished - job.started
+        job._done.set()
+        self._history.append(job.id)
+        while len(self._history) > self.max_history:
+            self._jobs.pop(self._history.popleft(), None)
+
+    async def aclose(self):
+        """Cancel queued and running jobs and stop the workers"""
+        for job in list(self._jobs.values()):
+            if job.status == QUEUED:
+                self._finish(job, CANCELLED)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, throughput and average wait/run time per lane, for /health"""
+        lanes = {}
+        for lane, workers in self.workers.items():
+            started = self._started[lane]
+            running = sum(1 for job in self._jobs.values() if job.lane == lane and job.status == RUNNING)
+            ran = started - running
+            lanes[lane] = {
+                "workers": workers,
+                "queued": sum(1 for job in self._jobs.values() if job.lane == lane and job.status == QUEUED),
+                "running": running,
+                **self.counts[lane],
+                "avg_wait": round(self._wait_total[lane] / started, 4) if started else 0.0,
+                "avg_run": round(self._run_total[lane] / ran, 4) if ran else 0.0,
+            }
+        return lanes
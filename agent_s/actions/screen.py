@@ -3,10 +3,14 @@ Screen Capture Action Handler
 Captures screenshots for vision analysis
 """
 import os
+import tempfile
 import time
-from datetime import datetime
 from pathlib import Path
 import logging
+from typing import Optional
+
+from agent_s.vision.frame import Frame
+from agent_s.vision.screenshot_store import ScreenshotStore
 
 try:
     import mss
@@ -17,7 +21,7 @@ except ImportError:
 try:
     import pyautogui
     PYAUTOGUI_AVAILABLE = True
-except ImportError:
+except Exception:  # ImportError, or no display to connect to
     PYAUTOGUI_AVAILABLE = False
 
 logger = logging.getLogger("agent_s.actions.screen")
@@ -26,8 +30,14 @@ logger = logging.getLogger("agent_s.actions.screen")
 class ScreenAction:
     """Handle screen capture operations"""
     
-    def __init__(self):
-        self.screenshot_dir = os.getenv("SCREENSHOT_DIR", "/tmp/agent_screenshots")
+    def __init__(self, store: Optional[ScreenshotStore] = None):
+        """
+        Args:
+            store: Where capture() keeps screenshots (default: plain files
+                in SCREENSHOT_DIR, never cleaned up)
+        """
+        self.store = store
+        self.screenshot_dir = store.directory if store else os.getenv("SCREENSHOT_DIR", "/tmp/agent_screenshots")
         os.makedirs(self.screenshot_dir, exist_ok=True)
         
         # Determine best capture method
@@ -41,74 +51,94 @@ class ScreenAction:
         
         logger.info(f"ScreenAction initialized with method: {self.capture_method}")
     
-    def capture(self, region: tuple = None) -> str:
+    def grab(self, region: tuple = None) -> Frame:
         """
-        Capture screenshot
-        
+        Capture the screen into memory
+
         Args:
             region: Optional (x, y, width, height) to capture specific region
-            
+
         Returns:
-            Path to saved screenshot
+            The captured Frame (nothing is written to disk)
         """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-        filename = f"screen_{timestamp}.png"
-        filepath = os.path.join(self.screenshot_dir, filename)
-        
         try:
             if self.capture_method == "mss":
-                return self._capture_mss(filepath, region)
+                return self._grab_mss(region)
             elif self.capture_method == "pyautogui":
-                return self._capture_pyautogui(filepath, region)
+                return self._grab_pyautogui(region)
             else:
-                return self._capture_scrot(filepath, region)
+                return self._grab_scrot(region)
         except Exception as e:
             logger.error(f"Screenshot capture failed: {e}")
             raise
-    
-    def _capture_mss(self, filepath: str, region: tuple = None) -> str:
+
+    def capture(self, region: tuple = None) -> str:
+        """
+        Capture screenshot to a file
+
+        Args:
+            region: Optional (x, y, width, height) to capture specific region
+
+        Returns:
+            Path to saved screenshot
+        """
+        frame = self.grab(region)
+        if self.store is not None:
+            return self.store.save(frame)
+        return frame.save(self.screenshot_dir)
+
+    def _grab_mss(self, region: tuple = None) -> Frame:
         """Capture using mss (fastest method)"""
         if region:
             x, y, w, h = region
             monitor = {"top": y, "left": x, "width": w, "height": h}
         else:
             monitor = self.sct.monitors[1]  # Primary monitor
-        
+
+        captured_at = time.time()
         screenshot = self.sct.grab(monitor)
-        mss.tools.to_png(screenshot.rgb, screenshot.size, output=filepath)
-        
-        logger.debug(f"Screenshot captured with mss: {filepath}")
-        return filepath
-    
-    def _capture_pyautogui(self, filepath: str, region: tuple = None) -> str:
+        logger.debug(f"Screenshot captured with mss: {screenshot.size}")
+        return Frame.from_bgra(screenshot.bgra, screenshot.size, captured_at)
+
+    def _grab_pyautogui(self, region: tuple = None) -> Frame:
         """Capture using pyautogui"""
+        captured_at = time.time()
         if region:
             screenshot = pyautogui.screenshot(region=region)
         else:
             screenshot = pyautogui.screenshot()
-        
-        screenshot.save(filepath)
-        logger.debug(f"Screenshot captured with pyautogui: {filepath}")
-        return filepath
-    
-    def _capture_scrot(self, filepath: str, region: tuple = None) -> str:
-        """Capture using scrot command line tool"""
+
+        logger.debug(f"Screenshot captured with pyautogui: {screenshot.size}")
+        return Frame(screenshot, captured_at)
+
+    def _grab_scrot(self, region: tuple = None) -> Frame:
+        """Capture using scrot command line tool (which can only write files)"""
         import subprocess
-        
-        if region:
-            x, y, w, h = region
-            cmd = ["scrot", "-a", f"{x},{y},{w},{h}", filepath]
-        else:
-            cmd = ["scrot", filepath]
-        
-        result = subprocess.run(cmd, capture_output=True)
-        
-        if result.returncode != 0:
-            raise RuntimeError(f"scrot failed: {result.stderr.decode()}")
-        
-        logger.debug(f"Screenshot captured with scrot: {filepath}")
-        return filepath
-    
+
+        fd, filepath = tempfile.mkstemp(suffix=".png")
+        os.close(fd)
+        try:
+            if region:
+                x, y, w, h = region
+                cmd = ["scrot", "-o", "-a", f"{x},{y},{w},{h}", filepath]
+            else:
+                cmd = ["scrot", "-o", filepath]
+
+            captured_at = time.time()
+            result = subprocess.run(cmd, capture_output=True)
+
+            if result.returncode != 0:
+                raise RuntimeError(f"scrot failed: {result.stderr.decode()}")
+
+            frame = Frame.open(filepath)
+            frame.path = None
+            frame.captured_at = captured_at
+        finally:
+            os.unlink(filepath)
+
+        logger.debug(f"Screenshot captured with scrot: {frame.size}")
+        return frame
+
     def capture_window(self, window_title: str = None) -> str:
         """Capture specific window (if supported)"""
         # TODO: Implement window-specific capture
@@ -0,0 +1,13 @@
+"""
+MCP bridge: one process serving MCP tools over several front-ends
+
+    rest      POST /tools/{name}, /tools/call (the v1/v2 HTTP bridges)
+    openai    /v1/models, /v1/chat/completions
+    tools     /openapi.json, /tools/{name}/execute, /dashboard
+
+Run with: python -m agent_s.mcp.bridge [--frontends tools openai rest]
+"""
+from agent_s.mcp.bridge.app import FRONTENDS, create_app
+from agent_s.mcp.bridge.core import BridgeCore, http_error
+
+__all__ = ["BridgeCore", "FRONTENDS", "create_app", "http_error"]
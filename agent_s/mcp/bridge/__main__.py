@@ -0,0 +1,36 @@
+"""
+Run the MCP bridge: python -m agent_s.mcp.bridge
+"""
+import argparse
+import logging
+
+import uvicorn
+
+from agent_s.mcp.bridge.app import DEFAULT_FRONTENDS, FRONTENDS, create_app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve MCP tools over REST, OpenAI-compatible and tool server APIs")
+    parser.add_argument("--frontends", nargs="+", choices=list(FRONTENDS), default=list(DEFAULT_FRONTENDS))
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8002)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    print("=" * 70)
+    print("🔌 MCP Bridge")
+    print("=" * 70)
+    print(f"Front-ends: {', '.join(args.frontends)}")
+    if "openai" in args.frontends:
+        print(f"OpenAI API: http://localhost:{args.port}/v1  (OpenWebUI: Connections → OpenAI)")
+    if "tools" in args.frontends:
+        print(f"Tool server: http://localhost:{args.port}/openapi.json  (OpenWebUI: Tools → Tool Server)")
+    if "rest" in args.frontends:
+        print(f"REST: POST http://localhost:{args.port}/tools/{{name}}")
+    print("=" * 70)
+
+    uvicorn.run(create_app(frontends=args.frontends), host=args.host, port=args.port, log_level="info")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+The MCP bridge application
+Mounts the chosen front-ends on one FastAPI app over a single BridgeCore
+"""
+import logging
+import os
+from typing import Callable, Dict, Optional, Sequence
+
+from fastapi import APIRouter, FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+
+from agent_s.mcp.bridge import openai_api, rest, tool_server
+from agent_s.mcp.bridge.core import BridgeCore
+from agent_s.mcp.flow import identify_caller
+
+logger = logging.getLogger("agent_s.mcp.bridge")
+
+FRONTENDS: Dict[str, Callable[[BridgeCore], APIRouter]] = {
+    "tools": tool_server.router,
+    "openai": openai_api.router,
+    "rest": rest.router,
+}
+
+# Where routes overlap (/tools, /openapi.json) the first front-end listed wins
+DEFAULT_FRONTENDS = tuple(
+    f.strip() for f in os.getenv("MCP_BRIDGE_FRONTENDS", "tools,openai,rest").split(",") if f.strip()
+)
+
+
+def create_app(
+    core: Optional[BridgeCore] = None,
+    frontends: Sequence[str] = DEFAULT_FRONTENDS,
+    title: str = "MCP Bridge"
+) -> FastAPI:
+    """
+    Build a bridge app serving the given front-ends
+
+    All front-ends share the core's MCP transport, tool catalog, result
+    cache and metrics, so one process (and one set of MCP workers) serves
+    every surface. The core is started and stopped with the app.
+
+    Args:
+        core: Shared MCP state (default: a new BridgeCore)
+        frontends: Names from FRONTENDS, in route priority order
+        title: OpenAPI title of the app
+
+    Returns:
+        The FastAPI app; the core is available as app.state.core
+    """
+    unknown = [name for name in frontends if name not in FRONTENDS]
+    if unknown:
+        raise ValueError(f"Unknown bridge front-ends: {', '.join(unknown)} (choose from {', '.join(FRONTENDS)})")
+    core = core or BridgeCore()
+
+    app = FastAPI(
+        title=title,
+        description="MCP tools over REST, OpenAI-compatible and OpenAPI tool server front-ends",
+        version="3.0.0",
+        docs_url=None,
+        redoc_url=None,
+        openapi_url=None  # Front-ends serve tool specs from the catalog
+    )
+    app.state.core = core
+
+    # CORS for OpenWebUI
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    app.middleware("http")(identify_caller)
+
+    @app.on_event("startup")
+    async def startup_event():
+        await core.start()
+
+    @app.on_event("shutdown")
+    async def shutdown_event():
+        await core.stop()
+
+    @app.get("/")
+    async def root():
+        return {
+            "service": title,
+            "frontends": list(frontends),
+            "tools_loaded": len(core.tools),
+            "status": "running"
+        }
+
+    @app.get("/health")
+    async def health():
+        return dict(core.health(), frontends=list(frontends))
+
+    @app.get("/metrics")
+    async def prometheus_metrics():
+        """Per-tool MCP call latency and payload metrics (Prometheus format)"""
+        return core.metrics.response()
+
+    for name in frontends:
+        app.include_router(FRONTENDS[name](core))
+    return app
@@ -0,0 +1,213 @@
+"""
+Shared state of the MCP bridge
+One transport (or pool of MCP workers), tool catalog, result cache and
+metrics, used by every front-end mounted in the process
+"""
+import asyncio
+import logging
+import os
+import shlex
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException
+
+from agent_s.mcp.catalog import ToolCatalog
+from agent_s.mcp.metrics import BridgeMetrics
+from agent_s.mcp.pool import MCPTransportPool
+from agent_s.mcp.result_cache import ToolResultCache
+from agent_s.mcp.transport import (
+    MCPOverloadedError, MCPTimeoutError, MCPTransport, MCPTransportError, create_transport
+)
+
+logger = logging.getLogger("agent_s.mcp.bridge")
+
+# MCP server processes shared by all front-ends (stdio servers only)
+DEFAULT_WORKERS = int(os.getenv("MCP_WORKERS", 1))
+
+# Requests arriving while the MCP server starts wait this long for it
+DEFAULT_START_TIMEOUT = float(os.getenv("MCP_START_TIMEOUT", 30.0))
+
+DEFAULT_MANIFEST = str(Path.home() / ".cache" / "agent_s" / "bridge_tools.json")
+
+MCPART_CANDIDATES = (
+    Path(__file__).parent.parent / "mcpart" / "build" / "index.js",
+    Path("/home/stacy/AlphaOmega/mcpart/build/index.js"),
+)
+
+
+def default_command() -> Optional[List[str]]:
+    """MCP server command line (MCP_SERVER_COMMAND overrides the mcpart build)"""
+    if os.getenv("MCP_SERVER_COMMAND"):
+        return shlex.split(os.environ["MCP_SERVER_COMMAND"])
+    for candidate in MCPART_CANDIDATES:
+        if candidate.exists():
+            return ["node", str(candidate)]
+    logger.error(f"MCP server not found at {MCPART_CANDIDATES[-1]}")
+    logger.error("Run: cd /home/stacy/AlphaOmega/mcpart && npm run build")
+    return None
+
+
+def http_error(error: Exception) -> HTTPException:
+    """The HTTP status a transport failure maps to on every front-end"""
+    if isinstance(error, MCPOverloadedError):
+        return HTTPException(status_code=429, detail=str(error), headers={"Retry-After": str(error.retry_after)})
+    if isinstance(error, MCPTimeoutError):
+        return HTTPException(status_code=504, detail="MCP request timeout")
+    if isinstance(error, MCPTransportError):
+        return HTTPException(status_code=503, detail=str(error))
+    return HTTPException(status_code=500, detail=str(error))
+
+
+class BridgeCore:
+    """
+    Everything the bridge front-ends share
+
+    start() serves the persisted tool manifest at once and connects to the
+    MCP server in the background; requests arriving meanwhile wait for the
+    connection (up to start_timeout) instead of failing. With workers > 1
+    and a stdio server, that many MCP processes are started and used as one
+    MCPTransportPool.
+
+    The transport attribute may be replaced (tests use in-process fakes);
+    nothing else holds on to it.
+    """
+
+    def __init__(
+        self,
+        command: Optional[List[str]] = None,
+        url: Optional[str] = None,
+        catalog: Optional[ToolCatalog] = None,
+        result_cache: Optional[ToolResultCache] = None,
+        metrics: Optional[BridgeMetrics] = None,
+        workers: int = DEFAULT_WORKERS,
+        start_timeout: float = DEFAULT_START_TIMEOUT,
+        client_name: str = "mcp-bridge"
+    ):
+        """
+        Args:
+            command: Stdio MCP server command (default: default_command(),
+                resolved at start)
+            url: Streamable HTTP MCP endpoint (default: MCP_SERVER_URL)
+            catalog: Tool catalog (default: one persisted to MCP_TOOL_MANIFEST)
+            result_cache: Tool result cache (default: one over the catalog)
+            metrics: Call metrics (default: a new BridgeMetrics)
+            workers: MCP server processes to pool
+            start_timeout: Seconds requests wait for a starting MCP server
+            client_name: clientInfo name sent on initialize
+        """
+        self.command = command
+        self.url = url
+        self.catalog = catalog or ToolCatalog(None, manifest_path=os.getenv("MCP_TOOL_MANIFEST", DEFAULT_MANIFEST))
+        self.result_cache = result_cache or ToolResultCache(catalog=self.catalog)
+        self.metrics = metrics or BridgeMetrics()
+        self.workers = max(1, workers)
+        self.start_timeout = start_timeout
+        self.client_name = client_name
+        self.transport: Optional[MCPTransport] = None
+        self._starting: Optional[asyncio.Task] = None
+
+    @property
+    def tools(self) -> List[Dict[str, Any]]:
+        """The current tool list"""
+        return self.catalog.tools
+
+    def is_running(self) -> bool:
+        return self.transport is not None and self.transport.is_running()
+
+    def state(self) -> str:
+        """MCP connection state: starting, running or down"""
+        if self._starting is not None and not self._starting.done():
+            return "starting"
+        return "running" if self.is_running() else "down"
+
+    async def start(self):
+        """Serve the persisted tool manifest at once; connect to MCP in the background"""
+        started = time.perf_counter()
+        url = self.url or os.getenv("MCP_SERVER_URL")
+        command = None if url else (self.command or default_command())
+        if not url and command is None:
+            return
+
+        if self.catalog.load_manifest(key=url or " ".join(command)):
+            logger.info(f"✓ Serving {len(self.tools)} tools from manifest while MCP starts")
+        self._starting = asyncio.ensure_future(self._connect(command, url, started))
+
+    async def stop(self):
+        """Stop background work and the MCP server"""
+        if self._starting is not None and not self._starting.done():
+            self._starting.cancel()
+        await self.catalog.close()
+        if self.transport:
+            await self.transport.aclose()
+        self.metrics.close()
+
+    def _create_transport(self, command: Optional[List[str]], url: Optional[str]) -> MCPTransport:
+        if url or self.workers == 1:
+            return create_transport(command, url)
+        return MCPTransportPool([create_transport(command, max_in_flight=0) for _ in range(self.workers)])
+
+    async def _connect(self, command: Optional[List[str]], url: Optional[str], started: float):
+        """Start and initialize the MCP transport, then refresh (and persist) the tool list"""
+        try:
+            logger.info("Starting MCP server...")
+            transport = self._create_transport(command, url)
+            transport.add_call_observer(self.metrics.observe)
+            self.metrics.watch_flow(transport)
+            transport.start()
+            self.transport = transport
+
+            init_response = await transport.initialize(self.client_name, "1.0.0")
+            logger.info(f"MCP initialized: {init_response.get('result', {}).get('serverInfo')}")
+
+            # Keep the tool list in sync with the server from here on
+            self.catalog.watch(transport)
+            await self.catalog.refresh()
+            logger.info(f"✓ MCP ready with {len(self.tools)} tools after {time.perf_counter() - started:.2f}s")
+
+        except Exception as e:
+            logger.error(f"Failed to start MCP: {e}")
+
+    async def request(self, method: str, params: Optional[Dict] = None) -> Dict[str, Any]:
+        """
+        Send a request to MCP and await its matching response
+
+        Raises:
+            MCPTransportError: No MCP server (or it failed); see http_error()
+        """
+        if self._starting is not None and not self._starting.done():
+            await asyncio.wait({self._starting}, timeout=self.start_timeout)
+        if not self.is_running():
+            raise MCPTransportError("MCP server not running")
+        return await self.transport.request(method, params)
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any], meta: Optional[Dict[str, Any]] = None) -> Dict:
+        """tools/call through the result cache"""
+        params = {"name": name, "arguments": arguments}
+        if meta:
+            params["_meta"] = meta
+        return await self.result_cache.call(name, arguments, lambda: self.request("tools/call", params))
+
+    def argument_errors(self, name: str, arguments: Dict[str, Any]) -> List[str]:
+        """Reject malformed calls before they cost an MCP round-trip"""
+        if not self.tools:
+            # Tool list not loaded yet; let the MCP server decide
+            return []
+        if not self.catalog.get(name):
+            return [f"Unknown tool: {name}"]
+        return self.catalog.validate_arguments(name, arguments)
+
+    def health(self) -> Dict[str, Any]:
+        """Status shared by every front-end's /health"""
+        running = self.is_running()
+        return {
+            "status": "healthy" if running else "unhealthy",
+            "mcp": self.state(),
+            "mcp_running": running,
+            "tools": len(self.tools),
+            "tools_source": self.catalog.source,
+            "pid": os.getpid(),
+            "cache": self.result_cache.stats(),
+            "queue": self.metrics.flow_stats()
+        }
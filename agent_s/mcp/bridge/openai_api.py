@@ -0,0 +1,427 @@
+"""
+OpenAI-compatible front-end of the MCP bridge
+/v1/models and /v1/chat/completions: tool_calls from the client are run
+through MCP, and plain chat messages are mapped to a tool by the intent
+rules, optionally streamed as chat.completion.chunk events
+"""
+import asyncio
+import itertools
+import json
+import logging
+import os
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from agent_s.mcp.bridge.core import BridgeCore, http_error
+from agent_s.mcp.intents import BRIDGE_PARSER
+from agent_s.mcp.transport import MCPOverloadedError
+
+logger = logging.getLogger("agent_s.mcp.bridge.openai_api")
+
+# Streaming chat: how long a tool may run before progress is reported
+STREAM_PROGRESS_SECONDS = float(os.getenv("MCP_STREAM_PROGRESS_SECONDS", 1.0))
+_progress_tokens = itertools.count(1)
+
+
+# OpenAI-compatible request models
+
+class Message(BaseModel):
+    role: str
+    content: Optional[str] = None
+    tool_calls: Optional[List[Dict[str, Any]]] = None
+
+
+class ChatCompletionRequest(BaseModel):
+    model: str = "mcp-assistant"
+    messages: List[Message]
+    tools: Optional[List[Dict[str, Any]]] = None
+    tool_choice: Optional[str] = "auto"
+    temperature: Optional[float] = 1.0
+    max_tokens: Optional[int] = None
+    stream: Optional[bool] = False
+
+
+# --------- Simple intent detection for default mode (no native tool calling) ---------
+def _extract_intent_and_args(user_text: str) -> Optional[Dict[str, Any]]:
+    """Map natural asks to MCP tools using the precompiled bridge rules.
+
+    Returns a dict like {"tool": str, "args": dict, "explain": str} or None.
+    """
+    return BRIDGE_PARSER.parse(user_text)
+
+
+def _render_result_lines(tool: str, result: Any) -> Iterator[str]:
+    """Yield the chat rendering of a tool result line by line.
+
+    Yields nothing for tools without a custom format.
+    """
+    if tool == "list_tasks":
+        tasks = result or []
+        if not tasks:
+            yield "You have no tasks today."
+            return
+        yield "Here are your tasks:"
+        for t in tasks:
+            status = "✅" if t.get("completed") else "⬜"
+            due = f" (due {t['due']})" if t.get("due") else ""
+            yield f"- {status} #{t.get('id')}: {t.get('title')}{due}"
+        return
+    if tool == "add_task":
+        yield f"Added task: {result.get('title')} (id: {result.get('id')})"
+        return
+    if tool == "complete_task":
+        yield f"Marked task #{result.get('id')} as complete."
+        return
+    if tool in ("search_notes", "list_notes"):
+        notes = result or []
+        if not notes:
+            yield "No notes found."
+            return
+        yield "Notes:"
+        for n in notes[:10]:
+            yield f"- {n.get('title')}: {n.get('snippet', '')}"
+        return
+    if tool in ("check_inventory", "list_inventory"):
+        items = result if isinstance(result, list) else [result]
+        yield "Inventory:"
+        any_items = False
+        for it in items:
+            if not isinstance(it, dict):
+                continue
+            name = it.get("item") or it.get("name") or it.get("sku")
+            qty = it.get("quantity") or it.get("qty")
+            any_items = True
+            yield f"- {name}: {qty}"
+        if not any_items:
+            yield "No items"
+        return
+    if tool == "list_expenses":
+        exps = result or []
+        if not exps:
+            yield "No expenses recorded."
+            return
+        total = 0.0
+        yield "Recent expenses:"
+        for e in exps[:10]:
+            amt = float(e.get("amount", 0))
+            total += amt
+            yield f"- {e.get('date')}: ${amt:.2f} – {e.get('category')} – {e.get('memo','')}"
+        yield f"Total (top {min(10, len(exps))}): ${total:.2f}"
+
+
+def _format_result_for_chat(tool: str, result: Any) -> str:
+    """Render a compact, readable string response for the chat UI."""
+    try:
+        lines = list(_render_result_lines(tool, result))
+        if lines:
+            return "\n".join(lines)
+    except Exception:
+        # fallback to JSON
+        pass
+    return json.dumps(result, ensure_ascii=False)
+
+
+def _stream_result_for_chat(tool: str, result: Any) -> Iterator[str]:
+    """Same text as _format_result_for_chat, yielded piece by piece as it is rendered."""
+    emitted = False
+    try:
+        for line in _render_result_lines(tool, result):
+            yield ("\n" if emitted else "") + line
+            emitted = True
+    except Exception:
+        # fallback to JSON after whatever was already sent
+        yield ("\n" if emitted else "") + json.dumps(result, ensure_ascii=False)
+        return
+    if not emitted:
+        yield json.dumps(result, ensure_ascii=False)
+
+
+def _tools_summary(tools: List[Dict[str, Any]]) -> str:
+    names = ", ".join(t.get("name") for t in tools[:20])
+    return f"I have access to {len(tools)} tools. A few examples: {names}."
+
+
+def _usage_hint(tools: List[Dict[str, Any]]) -> str:
+    example_tools = [t.get("name") for t in tools[:6]]
+    hint = ", ".join(example_tools)
+    return (
+        "I can use built-in tools on your behalf. Try: 'What tasks do I have today?', "
+        "'Search notes about invoices', or 'Check inventory for canvas'.\n"
+        f"Available tools include: {hint} …"
+    )
+
+
+# --------- Server-sent events streaming (OpenAI chat.completion.chunk format) ---------
+def _sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _sse_chunk(completion_id: str, created: int, model: str,
+               delta: Dict[str, Any], finish_reason: Optional[str] = None) -> str:
+    chunk = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": created,
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+    }
+    return f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+
+
+async def _call_tool_with_progress(core: BridgeCore, name: str, arguments: Dict[str, Any]) -> AsyncIterator[tuple]:
+    """Run a tool call, yielding ("progress", params) / ("waiting", None) while it runs.
+
+    The last event is ("result", result). MCP progress notifications are
+    matched to this call through its progressToken.
+    """
+    token = f"chat-{next(_progress_tokens)}"
+    updates: asyncio.Queue = asyncio.Queue()
+    loop = asyncio.get_running_loop()
+
+    def on_notification(message: Dict[str, Any]):
+        params = message.get("params") or {}
+        if message.get("method") == "notifications/progress" and params.get("progressToken") == token:
+            loop.call_soon_threadsafe(updates.put_nowait, params)
+
+    transport = core.transport
+    if transport:
+        transport.add_notification_handler(on_notification)
+    call = asyncio.ensure_future(core.call_tool(name, arguments, meta={"progressToken": token}))
+    try:
+        while True:
+            try:
+                response = await asyncio.wait_for(asyncio.shield(call), timeout=STREAM_PROGRESS_SECONDS)
+                break
+            except asyncio.TimeoutError:
+                latest = None
+                while not updates.empty():
+                    latest = updates.get_nowait()
+                yield ("progress", latest) if latest else ("waiting", None)
+        yield ("result", response.get("result", {}))
+    finally:
+        if transport:
+            transport.remove_notification_handler(on_notification)
+        if not call.done():
+            call.cancel()
+
+
+def _progress_text(name: str, params: Dict[str, Any]) -> str:
+    if params.get("message"):
+        return f"_⏳ {params['message']}_\n"
+    if params.get("total"):
+        return f"_⏳ {name}: {params.get('progress')}/{params['total']}_\n"
+    return f"_⏳ {name}: {params.get('progress')}_\n"
+
+
+async def _stream_intent_completion(core: BridgeCore, model: str, intent: Optional[Dict[str, Any]]) -> AsyncIterator[str]:
+    """Stream the default-mode reply: role chunk first, then progress, then the formatted result."""
+    completion_id = f"chatcmpl-{int(time.time())}"
+    created = int(time.time())
+
+    yield _sse_chunk(completion_id, created, model, {"role": "assistant", "content": ""})
+
+    if not intent:
+        yield _sse_chunk(completion_id, created, model, {"content": _usage_hint(core.tools)})
+    elif intent["tool"] == "__list_tools__":
+        yield _sse_chunk(completion_id, created, model, {"content": _tools_summary(core.tools)})
+    else:
+        call_name = intent["tool"]
+        call_args = intent.get("args", {})
+        logger.info(f"Auto-executing tool from chat (streaming): {call_name} {call_args}")
+        announced = False
+        try:
+            async for kind, payload in _call_tool_with_progress(core, call_name, call_args):
+                if kind == "result":
+                    if announced:
+                        yield _sse_chunk(completion_id, created, model, {"content": "\n"})
+                    for piece in _stream_result_for_chat(call_name, payload):
+                        yield _sse_chunk(completion_id, created, model, {"content": piece})
+                elif kind == "progress":
+                    announced = True
+                    yield _sse_chunk(completion_id, created, model, {"content": _progress_text(call_name, payload)})
+                elif not announced:
+                    announced = True
+                    yield _sse_chunk(completion_id, created, model, {"content": f"_⏳ Running {call_name}…_\n"})
+                else:
+                    # Keep the connection visibly alive without adding content
+                    yield ": still running\n\n"
+        except Exception as e:
+            logger.exception("Auto tool execution failed")
+            yield _sse_chunk(completion_id, created, model,
+                             {"content": f"I tried to run {call_name} but hit an error: {e}"})
+
+    yield _sse_chunk(completion_id, created, model, {}, "stop")
+    yield "data: [DONE]\n\n"
+
+
+async def _stream_tool_results(model: str, tool_results: List[Dict[str, Any]]) -> AsyncIterator[str]:
+    """Stream an already computed tool_calls reply."""
+    completion_id = f"chatcmpl-{int(time.time())}"
+    created = int(time.time())
+    yield _sse_chunk(completion_id, created, model, {"role": "assistant", "content": None})
+    yield _sse_chunk(completion_id, created, model, {"tool_calls": tool_results})
+    yield _sse_chunk(completion_id, created, model, {}, "tool_calls")
+    yield "data: [DONE]\n\n"
+
+
+def router(core: BridgeCore) -> APIRouter:
+    """OpenAI-compatible routes over a shared BridgeCore"""
+    api = APIRouter()
+
+    @api.get("/v1/models")
+    @api.get("/models")
+    async def list_models():
+        """List available models (OpenAI format)"""
+        return {
+            "object": "list",
+            "data": [
+                {
+                    "id": "mcp-assistant",
+                    "object": "model",
+                    "created": int(time.time()),
+                    "owned_by": "alphaomega",
+                    "permission": [],
+                    "root": "mcp-assistant",
+                    "parent": None
+                }
+            ]
+        }
+
+    @api.post("/v1/chat/completions")
+    @api.post("/chat/completions")
+    async def chat_completions(request: ChatCompletionRequest):
+        """OpenAI-compatible chat completions with function calling"""
+
+        # Check if there are tool calls to execute
+        last_message = request.messages[-1] if request.messages else None
+
+        if last_message and last_message.role == "assistant" and last_message.tool_calls:
+            # Execute the requested tools
+            tool_results = []
+
+            for tool_call in last_message.tool_calls:
+                function = tool_call.get("function", {})
+                tool_name = function.get("name")
+                arguments = json.loads(function.get("arguments", "{}"))
+
+                logger.info(f"Executing tool: {tool_name}")
+
+                errors = core.argument_errors(tool_name, arguments)
+                if errors:
+                    tool_results.append({
+                        "role": "tool",
+                        "tool_call_id": tool_call.get("id"),
+                        "content": json.dumps({"error": "Invalid arguments", "details": errors})
+                    })
+                    continue
+
+                try:
+                    response = await core.call_tool(tool_name, arguments)
+
+                    result = response.get("result", {})
+
+                    tool_results.append({
+                        "role": "tool",
+                        "tool_call_id": tool_call.get("id"),
+                        "content": json.dumps(result)
+                    })
+
+                except MCPOverloadedError as e:
+                    raise http_error(e)
+                except Exception as e:
+                    tool_results.append({
+                        "role": "tool",
+                        "tool_call_id": tool_call.get("id"),
+                        "content": json.dumps({"error": str(e)})
+                    })
+
+            if request.stream:
+                return _sse_response(_stream_tool_results(request.model, tool_results))
+
+            # Return tool results
+            return {
+                "id": f"chatcmpl-{int(time.time())}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.model,
+                "choices": [{
+                    "index": 0,
+                    "message": {
+                        "role": "assistant",
+                        "content": None,
+                        "tool_calls": tool_results
+                    },
+                    "finish_reason": "tool_calls"
+                }],
+                "usage": {
+                    "prompt_tokens": 0,
+                    "completion_tokens": 0,
+                    "total_tokens": 0
+                }
+            }
+        # Default mode: proactively execute tools when intent is detected
+        user_message = next((m.content for m in reversed(request.messages) if m.role == "user"), "")
+
+        intent = _extract_intent_and_args(user_message)
+        if request.stream:
+            return _sse_response(_stream_intent_completion(core, request.model, intent))
+
+        if intent:
+            if intent["tool"] == "__list_tools__":
+                content = _tools_summary(core.tools)
+            else:
+                try:
+                    call_name = intent["tool"]
+                    call_args = intent.get("args", {})
+                    logger.info(f"Auto-executing tool from chat: {call_name} {call_args}")
+                    response = await core.call_tool(call_name, call_args)
+                    result = response.get("result", {})
+                    content = _format_result_for_chat(call_name, result)
+                except MCPOverloadedError as e:
+                    raise http_error(e)
+                except Exception as e:
+                    logger.exception("Auto tool execution failed")
+                    content = f"I tried to run {intent['tool']} but hit an error: {e}"
+
+            tokens = len(user_message.split())
+            return {
+                "id": f"chatcmpl-{int(time.time())}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.model,
+                "choices": [{
+                    "index": 0,
+                    "message": {
+                        "role": "assistant",
+                        "content": content
+                    },
+                    "finish_reason": "stop"
+                }],
+                "usage": {"prompt_tokens": tokens, "completion_tokens": len(content.split()), "total_tokens": tokens + len(content.split())}
+            }
+
+        # If no intent, gently guide user and show a few tools
+        content = _usage_hint(core.tools)
+        tokens = len(user_message.split())
+        return {
+            "id": f"chatcmpl-{int(time.time())}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": tokens, "completion_tokens": len(content.split()), "total_tokens": tokens + len(content.split())}
+        }
+
+    return api
@@ -0,0 +1,155 @@
+"""
+Plain REST front-end of the MCP bridge
+POST /tools/{name} (or /tools/call with a name) runs a tool and answers
+{"success": ..., "result": ...}; the routes the v1 and v2 HTTP bridges served
+"""
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from agent_s.mcp.bridge.core import BridgeCore, http_error
+from agent_s.mcp.streaming import result_response, wants_ndjson
+from agent_s.mcp.transport import MCPTransportError
+
+logger = logging.getLogger("agent_s.mcp.bridge.rest")
+
+
+class ToolRequest(BaseModel):
+    name: str
+    arguments: Optional[Dict[str, Any]] = {}
+
+
+def build_openapi_spec(tools: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Generate OpenAPI spec from cached tools"""
+    paths = {
+        "/health": {
+            "get": {
+                "summary": "Health check",
+                "operationId": "health_check",
+                "responses": {"200": {"description": "OK"}}
+            }
+        },
+        "/tools": {
+            "get": {
+                "summary": "List all tools",
+                "operationId": "list_tools",
+                "responses": {"200": {"description": "List of tools"}}
+            }
+        }
+    }
+    
+    # Add each tool as a separate endpoint
+    for tool in tools:
+        tool_name = tool.get("name", "unknown")
+        paths[f"/tools/{tool_name}"] = {
+            "post": {
+                "summary": tool.get("description", f"Execute {tool_name}"),
+                "description": tool.get("description", ""),
+                "operationId": tool_name,
+                "requestBody": {
+                    "required": True,
+                    "content": {
+                        "application/json": {
+                            "schema": tool.get("inputSchema", {"type": "object"})
+                        }
+                    }
+                },
+                "responses": {
+                    "200": {
+                        "description": "Tool execution result",
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "type": "object",
+                                    "properties": {
+                                        "success": {"type": "boolean"},
+                                        "result": {},
+                                        "error": {"type": "string"}
+                                    }
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    
+    return {
+        "openapi": "3.1.0",
+        "info": {
+            "title": "MCP Art Supply Assistant",
+            "version": "2.0.0",
+            "description": f"Business management tools via MCP ({len(tools)} tools available)"
+        },
+        "servers": [
+            {"url": "http://localhost:8002", "description": "Local MCP bridge"}
+        ],
+        "paths": paths
+    }
+
+
+def router(core: BridgeCore) -> APIRouter:
+    """REST routes over a shared BridgeCore"""
+    api = APIRouter()
+    core.catalog.add_document("openapi-rest", lambda tools: json.dumps(build_openapi_spec(tools)).encode("utf-8"))
+
+    async def execute(tool_name: str, request: Request, arguments: Dict[str, Any]):
+        logger.info(f"Executing tool: {tool_name}")
+        errors = core.argument_errors(tool_name, arguments)
+        if errors:
+            return JSONResponse(
+                status_code=404 if not core.catalog.get(tool_name) else 422,
+                content={"success": False, "error": "; ".join(errors)}
+            )
+
+        try:
+            response = await core.call_tool(tool_name, arguments)
+        except MCPTransportError as e:
+            error = http_error(e)
+            if error.status_code == 429:
+                raise error
+            logger.error(f"Error executing tool: {error.detail}")
+            return {"success": False, "error": str(error.detail)}
+        except Exception as e:
+            logger.error(f"Error executing tool: {e}")
+            return {"success": False, "error": str(e)}
+
+        if "error" in response:
+            return {
+                "success": False,
+                "error": str(response["error"])
+            }
+
+        return await result_response(
+            {"success": True}, response.get("result", {}), ndjson=wants_ndjson(request)
+        )
+
+    @api.get("/tools")
+    async def list_tools():
+        """List all cached tools"""
+        return {
+            "tools": core.tools
+        }
+
+    # Registered before /tools/{tool_name} so "call" is not taken for a tool name
+    @api.post("/tools/call")
+    async def call_tool(tool_request: ToolRequest, request: Request):
+        """OpenWebUI-compatible tool call endpoint"""
+        return await execute(tool_request.name, request, tool_request.arguments or {})
+
+    @api.post("/tools/{tool_name}")
+    async def execute_tool(tool_name: str, request: Request, params: Dict[str, Any] = None):
+        """Execute a tool (large results are streamed; ?format=ndjson for one line per item)"""
+        return await execute(tool_name, request, params or {})
+
+    @api.get("/openapi.json")
+    @api.get("/rest/openapi.json")
+    async def openapi_spec(request: Request):
+        """Serve the OpenAPI spec, rebuilt only when the tool list changes"""
+        return core.catalog.document("openapi-rest").response(request)
+
+    return api
@@ -0,0 +1,263 @@
+"""
+OpenAPI tool server front-end of the MCP bridge
+One POST /tools/{name}/execute operation per MCP tool, described by
+/openapi.json for OpenWebUI's Tool Server integration, plus a browsable
+dashboard
+"""
+import html
+import json
+import logging
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, Request
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
+
+from agent_s.mcp.bridge.core import BridgeCore
+from agent_s.mcp.transport import MCPOverloadedError
+from agent_s.mcp.streaming import result_response, wants_ndjson
+
+logger = logging.getLogger("agent_s.mcp.bridge.tool_server")
+
+
+def build_openapi_spec(tools: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Generate OpenAPI spec for OpenWebUI Tool Server integration"""
+
+    # Build paths for each tool
+    paths = {}
+
+    for tool in tools:
+        tool_name = tool.get("name", "")
+        tool_description = tool.get("description", "")
+        input_schema = tool.get("inputSchema", {"type": "object", "properties": {}})
+
+        # Create path for this tool
+        path = f"/tools/{tool_name}/execute"
+        paths[path] = {
+            "post": {
+                "summary": tool_description,
+                "description": tool_description,
+                "operationId": f"{tool_name}_execute",
+                "requestBody": {
+                    "required": True,
+                    "content": {
+                        "application/json": {
+                            "schema": input_schema
+                        }
+                    }
+                },
+                "responses": {
+                    "200": {
+                        "description": "Successful response",
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "type": "object",
+                                    "properties": {
+                                        "success": {"type": "boolean"},
+                                        "tool": {"type": "string"},
+                                        "result": {"type": "object"}
+                                    }
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        }
+
+    return {
+        "openapi": "3.1.0",
+        "info": {
+            "title": "MCP Art Supply Store Tools",
+            "description": f"Access to {len(tools)} business management tools via MCP",
+            "version": "1.0.0"
+        },
+        "servers": [
+            {
+                "url": "http://localhost:8002",
+                "description": "Local MCP Bridge"
+            }
+        ],
+        "paths": paths,
+        "components": {
+            "schemas": {},
+            "securitySchemes": {
+                "bearerAuth": {
+                    "type": "http",
+                    "scheme": "bearer"
+                }
+            }
+        }
+    }
+
+
+# Dashboard page; tool schemas are fetched from /tools/{name} when a tool is opened
+DASHBOARD_TEMPLATE = """<!doctype html>
+<html><head><meta charset='utf-8'><title>MCP Bridge Dashboard</title>
+<style>
+    body{font-family:system-ui, sans-serif;max-width:960px;margin:24px auto;padding:0 16px}
+    details{margin:8px 0;padding:8px;border:1px solid #ddd;border-radius:6px}
+    pre{background:#f7f7f7;padding:8px;border-radius:4px;overflow:auto;font-size:12px}
+    textarea{width:100%;font-family:monospace}
+    .result{white-space:pre-wrap;font-family:monospace;margin-top:6px}
+</style>
+<script>
+    const tools = {};
+    async function openTool(details){
+        const name = details.dataset.tool;
+        if (!details.open || tools[name]) return;
+        const body = details.querySelector('.body');
+        try {
+            const res = await fetch('/tools/' + encodeURIComponent(name));
+            tools[name] = await res.json();
+        } catch (e) {
+            body.textContent = 'Error: ' + e;
+            return;
+        }
+        body.querySelector('pre').textContent = JSON.stringify(tools[name].inputSchema || {type: 'object'}, null, 2);
+        body.querySelector('form').hidden = false;
+    }
+    async function submitForm(evt, form){
+        evt.preventDefault();
+        const name = form.closest('details').dataset.tool;
+        const resultDiv = form.parentElement.querySelector('.result');
+        resultDiv.textContent = 'Running...';
+        try {
+            const res = await fetch('/tools/' + encodeURIComponent(name) + '/execute', {
+                method: 'POST', headers: {'Content-Type': 'application/json'}, body: form.__json.value || '{}'
+            });
+            resultDiv.textContent = JSON.stringify(await res.json(), null, 2);
+        } catch (e) {
+            resultDiv.textContent = 'Error: ' + e;
+        }
+        return false;
+    }
+    function fillSample(btn){
+        const schema = (tools[btn.closest('details').dataset.tool] || {}).inputSchema;
+        btn.closest('form').__json.value = (schema && schema.example) ? JSON.stringify(schema.example, null, 2) : '{}';
+    }
+</script>
+</head>
+<body>
+    <h1>🧰 MCP Bridge Dashboard</h1>
+    <p><!--TOOL_COUNT--> tools loaded. Use the forms below to test endpoints, or call them from OpenWebUI.</p>
+    <p>Useful endpoints: <a href='/openapi.json'>openapi.json</a> • <a href='/tools'>/tools</a> • <a href='/health'>/health</a></p>
+<!--TOOLS-->
+</body></html>
+"""
+
+DASHBOARD_TOOL = """    <details data-tool='{attr}' ontoggle='openTool(this)'>
+        <summary><b>{name}</b> – {description}</summary>
+        <div class='body'>
+            <p><code>POST /tools/{name}/execute</code></p>
+            <p>Schema:</p><pre>Loading…</pre>
+            <form hidden onsubmit='return submitForm(event, this)'>
+                <textarea name='__json' rows='4' placeholder='{{}}'></textarea>
+                <div style='margin-top:6px;'>
+                    <button type='submit'>Run</button>
+                    <button type='button' onclick='fillSample(this)' style='margin-left:8px;'>Fill sample</button>
+                </div>
+            </form>
+            <div class='result'></div>
+        </div>
+    </details>
+"""
+
+
+def _render_dashboard(tools: List[Dict[str, Any]]) -> bytes:
+    """The dashboard page for a tool list (rendered once per tool list version)"""
+    items = []
+    for t in tools:
+        name = t.get("name", "")
+        items.append(DASHBOARD_TOOL.format(
+            attr=html.escape(name, quote=True),
+            name=html.escape(name),
+            description=html.escape(t.get("description", ""))
+        ))
+    page = DASHBOARD_TEMPLATE.replace("<!--TOOL_COUNT-->", str(len(tools))).replace("<!--TOOLS-->", "".join(items))
+    return page.encode("utf-8")
+
+
+def router(core: BridgeCore) -> APIRouter:
+    """Tool server routes over a shared BridgeCore"""
+    api = APIRouter()
+    core.catalog.add_document("openapi-tools", lambda tools: _encode(build_openapi_spec(tools)))
+    core.catalog.add_document("dashboard", lambda tools: _render_dashboard(tools), "text/html; charset=utf-8")
+
+    @api.get("/openapi.json")
+    async def openapi_spec(request: Request):
+        """Serve the OpenAPI spec, rebuilt only when the tool list changes"""
+        return core.catalog.document("openapi-tools").response(request)
+
+    @api.get("/dashboard", response_class=HTMLResponse)
+    async def dashboard(request: Request):
+        """Tool browser, served from the catalog's cache with ETag and gzip"""
+        return core.catalog.document("dashboard").response(request)
+
+    @api.get("/docs")
+    async def docs_redirect():
+        return RedirectResponse(url="/dashboard")
+
+    @api.get("/v1/tools")
+    @api.get("/tools")
+    async def list_tools():
+        """List all available MCP tools"""
+        return {
+            "tools": core.tools,
+            "count": len(core.tools)
+        }
+
+    @api.get("/tools/{tool_name}")
+    async def get_tool(tool_name: str):
+        t = core.catalog.get(tool_name)
+        if not t:
+            return JSONResponse(status_code=404, content={"detail": "Tool not found"})
+        # Add a sample curl for convenience
+        sample = {
+            "curl": f"curl -s -X POST http://localhost:8002/tools/{tool_name}/execute -H 'Content-Type: application/json' -d '{{}}' | jq ."
+        }
+        out = dict(t)
+        out["sample"] = sample
+        return JSONResponse(out)
+
+    @api.post("/v1/tools/{tool_name}/execute")
+    @api.post("/tools/{tool_name}/execute")
+    async def execute_tool(tool_name: str, request: Request, params: dict = {}):
+        """Execute a specific tool (large results are streamed; ?format=ndjson for one line per item)"""
+        errors = core.argument_errors(tool_name, params)
+        if errors:
+            return JSONResponse(
+                status_code=404 if not core.catalog.get(tool_name) else 422,
+                content={
+                    "success": False,
+                    "tool": tool_name,
+                    "error": "; ".join(errors)
+                }
+            )
+
+        try:
+            logger.info(f"Direct tool execution: {tool_name} with {params}")
+            response = await core.call_tool(tool_name, params)
+            result = response.get("result", {})
+            return await result_response(
+                {"success": True, "tool": tool_name}, result, ndjson=wants_ndjson(request)
+            )
+        except MCPOverloadedError as e:
+            return JSONResponse(
+                status_code=429,
+                headers={"Retry-After": str(e.retry_after)},
+                content={"success": False, "tool": tool_name, "error": str(e)}
+            )
+        except Exception as e:
+            logger.error(f"Tool execution error: {e}")
+            return {
+                "success": False,
+                "tool": tool_name,
+                "error": str(e)
+            }
+
+    return api
+
+
+def _encode(spec: Dict[str, Any]) -> bytes:
+    return json.dumps(spec).encode("utf-8")
@@ -0,0 +1,321 @@
+"""
+Tool catalog for the MCP bridges
+Caches the MCP tool list and the documents derived from it (OpenAPI spec),
+rebuilding them only when the server's tool list actually changes
+"""
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi import Request, Response
+
+from agent_s.mcp.transport import MCPTransportError
+
+try:
+    import jsonschema
+    JSONSCHEMA_AVAILABLE = True
+except ImportError:
+    JSONSCHEMA_AVAILABLE = False
+
+logger = logging.getLogger("agent_s.mcp.catalog")
+
+# Bodies smaller than this are not worth compressing
+GZIP_MIN_SIZE = 1024
+
+
+def tools_fingerprint(tools: List[Dict[str, Any]]) -> str:
+    """Stable hash of a tool list, independent of dict key order"""
+    canonical = json.dumps(tools, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class CachedDocument:
+    """
+    A pre-serialized HTTP body with its ETag and gzip variant
+
+    The body is encoded and compressed once in set(); serving it is just a
+    header comparison and a bytes copy into the response.
+    """
+
+    def __init__(self, media_type: str = "application/json"):
+        self.media_type = media_type
+        self.body: bytes = b""
+        self.gzipped: Optional[bytes] = None
+        self.etag: str = ""
+
+    def set(self, body: bytes):
+        """Replace the document body"""
+        self.body = body
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        self.gzipped = gzip.compress(body, compresslevel=6) if len(body) >= GZIP_MIN_SIZE else None
+
+    def response(self, request: Request) -> Response:
+        """Serve the document, honouring If-None-Match and Accept-Encoding"""
+        headers = {"ETag": self.etag, "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+
+        if self._etag_matches(request.headers.get("if-none-match", "")):
+            return Response(status_code=304, headers=headers)
+
+        if self.gzipped is not None and "gzip" in request.headers.get("accept-encoding", ""):
+            headers["Content-Encoding"] = "gzip"
+            return Response(content=self.gzipped, media_type=self.media_type, headers=headers)
+
+        return Response(content=self.body, media_type=self.media_type, headers=headers)
+
+    def _etag_matches(self, if_none_match: str) -> bool:
+        if not if_none_match or not self.etag:
+            return False
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag == "*" or tag.removeprefix("W/") == self.etag:
+                return True
+        return False
+
+
+class ToolCatalog:
+    """
+    Cached MCP tool list plus the documents built from it
+
+    The tool list is refreshed when the server sends
+    notifications/tools/list_changed, and periodically as a fallback for
+    servers that never announce changes. The OpenAPI document, and any other
+    document registered with add_document(), is rendered at most once per
+    distinct tool list, on the first request after a change.
+
+    With a manifest path, tool lists fetched from the server are persisted
+    so the next process can serve them before its MCP child is up.
+    """
+
+    def __init__(
+        self,
+        spec_builder: Optional[Callable[[List[Dict[str, Any]]], Dict[str, Any]]],
+        refresh_interval: Optional[float] = None,
+        manifest_path: Optional[str] = None
+    ):
+        """
+        Args:
+            spec_builder: Builds the OpenAPI spec dict from a tool list (None
+                registers no "openapi" document; front-ends add their own)
+            refresh_interval: Seconds between periodic tool list checks (0 disables)
+            manifest_path: File the server's tool list is persisted to
+        """
+        self.spec_builder = spec_builder
+        if refresh_interval is None:
+            refresh_interval = float(os.getenv("MCP_TOOLS_REFRESH_SECONDS", 300))
+        self.refresh_interval = refresh_interval
+        self.manifest_path = manifest_path
+        self.manifest_key: Optional[str] = None
+        # Where the current list came from: "empty", "manifest" or "server"
+        self.source = "empty"
+
+        # Mutated in place so module-level aliases stay valid
+        self.tools: List[Dict[str, Any]] = []
+        self.version: Optional[str] = tools_fingerprint(self.tools)
+        self._by_name: Dict[str, Dict[str, Any]] = {}
+        self._validators: Dict[str, Any] = {}
+        self._documents: Dict[str, Any] = {}
+        if spec_builder is not None:
+            self.add_document("openapi", lambda tools: json.dumps(self.spec_builder(tools)).encode("utf-8"))
+
+        self._transport = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: set = set()
+        self._refresh_lock = asyncio.Lock()
+
+    def update(self, tools: List[Dict[str, Any]]) -> bool:
+        """
+        Install a new tool list
+
+        Returns:
+            True if the list changed (derived documents become stale)
+        """
+        fingerprint = tools_fingerprint(tools)
+        if fingerprint == self.version:
+            return False
+
+        self.tools[:] = tools
+        self.version = fingerprint
+        self._by_name = {t.get("name"): t for t in self.tools}
+        self._validators = {}
+        logger.info(f"Tool catalog updated: {len(self.tools)} tools (version {fingerprint[:12]})")
+        return True
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        """Look up a tool by name"""
+        return self._by_name.get(name)
+
+    def validate_arguments(self, name: str, arguments: Dict[str, Any]) -> List[str]:
+        """
+        Check tool arguments against the tool's inputSchema
+
+        Each schema is compiled on first use and reused until the tool list
+        changes. Tools without a usable schema are not checked.
+
+        Returns:
+            List of human-readable problems (empty if the arguments are valid)
+        """
+        if name not in self._validators:
+            self._validators[name] = self._compile_validator(self._by_name.get(name))
+        validator = self._validators[name]
+        if validator is None:
+            return []
+
+        errors = sorted(validator.iter_errors(arguments), key=lambda e: list(e.absolute_path))
+        return [
+            f"{'.'.join(str(p) for p in e.absolute_path) or '(root)'}: {e.message}"
+            for e in errors
+        ]
+
+    def _compile_validator(self, tool: Optional[Dict[str, Any]]):
+        if not JSONSCHEMA_AVAILABLE or not tool or not tool.get("inputSchema"):
+            return None
+        schema = tool["inputSchema"]
+        try:
+            validator_cls = jsonschema.validators.validator_for(schema)
+            validator_cls.check_schema(schema)
+            return validator_cls(schema)
+        except jsonschema.SchemaError as e:
+            logger.warning(f"Skipping argument validation for {tool.get('name')}: invalid schema ({e.message})")
+            return None
+
+    def add_document(
+        self,
+        name: str,
+        render: Callable[[List[Dict[str, Any]]], bytes],
+        media_type: str = "application/json"
+    ):
+        """
+        Register a document derived from the tool list
+
+        Args:
+            name: Key for document()
+            render: Builds the document body from a tool list
+            media_type: Content type it is served with
+        """
+        self._documents[name] = [render, CachedDocument(media_type), None]
+
+    def document(self, name: str) -> CachedDocument:
+        """A registered document, re-rendered if the tool list changed since"""
+        entry = self._documents[name]
+        render, document, version = entry
+        if version != self.version:
+            document.set(render(self.tools))
+            entry[2] = self.version
+        return document
+
+    @property
+    def openapi(self) -> CachedDocument:
+        """The OpenAPI spec for the current tool list"""
+        return self.document("openapi")
+
+    def load_manifest(self, key: Optional[str] = None) -> bool:
+        """
+        Install the persisted tool list, if there is one for this server
+
+        Args:
+            key: Identifies the MCP server (e.g. its command line); a
+                manifest written for another server is ignored
+
+        Returns:
+            True if tools were loaded
+        """
+        self.manifest_key = key
+        if not self.manifest_path:
+            return False
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable tool manifest {self.manifest_path}: {e}")
+            return False
+        if not isinstance(manifest, dict) or manifest.get("key") != key or not isinstance(manifest.get("tools"), list):
+            logger.info(f"Tool manifest {self.manifest_path} is for another server, ignoring it")
+            return False
+        self.update(manifest["tools"])
+        self.source = "manifest"
+        logger.info(f"Loaded {len(self.tools)} tools from manifest saved at {manifest.get('saved_at')}")
+        return True
+
+    def save_manifest(self):
+        """Persist the current tool list (atomically replacing the old file)"""
+        if not self.manifest_path:
+            return
+        manifest = {
+            "key": self.manifest_key,
+            "version": self.version,
+            "saved_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "tools": self.tools
+        }
+        directory = os.path.dirname(os.path.abspath(self.manifest_path))
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(prefix=".tools-", dir=directory)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+            os.replace(tmp, self.manifest_path)
+        except OSError as e:
+            logger.warning(f"Could not save tool manifest {self.manifest_path}: {e}")
+
+    async def refresh(self) -> bool:
+        """Fetch the tool list from the server and apply it if it changed"""
+        if not self._transport or not self._transport.is_running():
+            return False
+        async with self._refresh_lock:
+            try:
+                tools = await self._transport.list_tools()
+            except MCPTransportError as e:
+                # Keep serving (and persisting) the last good tool list
+                logger.warning(f"Tool list refresh failed, keeping {len(self.tools)} tools: {e}")
+                return False
+            changed = self.update(tools)
+            if changed or self.source != "server":
+                self.source = "server"
+                self.save_manifest()
+            return changed
+
+    def watch(self, transport):
+        """
+        Keep the catalog in sync with a running transport
+
+        Must be called from the event loop that serves requests.
+        """
+        self._transport = transport
+        self._loop = asyncio.get_running_loop()
+        transport.add_notification_handler(self._on_notification)
+        if self.refresh_interval > 0:
+            self._spawn(self._periodic_refresh())
+
+    async def close(self):
+        """Stop background refresh tasks"""
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _on_notification(self, message: Dict[str, Any]):
+        # Runs on the transport reader thread
+        if message.get("method") == "notifications/tools/list_changed" and self._loop:
+            self._loop.call_soon_threadsafe(self._spawn, self._refresh_logged())
+
+    async def _refresh_logged(self):
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.warning(f"Tool list refresh failed: {e}")
+
+    async def _periodic_refresh(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            await self._refresh_logged()
+
+    def _spawn(self, coro):
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
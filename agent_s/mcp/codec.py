@@ -0,0 +1,95 @@
+"""
+JSON codecs for the MCP stdio transport
+Uses orjson or msgspec when installed and the standard library otherwise.
+All codecs encode to bytes and decode from any bytes-like object, including
+memoryview slices of the transport's read buffer.
+"""
+import json
+import logging
+import os
+from typing import Any, Dict, Optional
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
+logger = logging.getLogger("agent_s.mcp.codec")
+
+
+class JSONCodec:
+    """Standard library codec (always available)"""
+
+    name = "json"
+
+    def encode(self, obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    def decode(self, data) -> Any:
+        """Raises ValueError on malformed input"""
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    name = "orjson"
+
+    def encode(self, obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+    def decode(self, data) -> Any:
+        # orjson.JSONDecodeError subclasses ValueError
+        return orjson.loads(data)
+
+
+class MsgspecCodec(JSONCodec):
+    name = "msgspec"
+
+    def __init__(self):
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+
+    def encode(self, obj: Any) -> bytes:
+        return self._encoder.encode(obj)
+
+    def decode(self, data) -> Any:
+        try:
+            return self._decoder.decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+
+def available_codecs() -> Dict[str, JSONCodec]:
+    """Codecs usable in this environment, fastest first"""
+    codecs: Dict[str, JSONCodec] = {}
+    if ORJSON_AVAILABLE:
+        codecs["orjson"] = OrjsonCodec()
+    if MSGSPEC_AVAILABLE:
+        codecs["msgspec"] = MsgspecCodec()
+    codecs["json"] = JSONCodec()
+    return codecs
+
+
+def get_codec(name: Optional[str] = None) -> JSONCodec:
+    """
+    Pick a codec by name
+
+    Args:
+        name: "orjson", "msgspec", "json" or "auto" (default: MCP_JSON_CODEC
+              env, then auto). Unavailable choices fall back to auto.
+    """
+    name = (name or os.getenv("MCP_JSON_CODEC", "auto")).lower()
+    codecs = available_codecs()
+    if name in codecs:
+        return codecs[name]
+    if name != "auto":
+        logger.warning(f"JSON codec {name!r} not available, using {next(iter(codecs))}")
+    return next(iter(codecs.values()))
@@ -0,0 +1,145 @@
+"""
+Flow control between the HTTP bridges and an MCP child process
+Limits how many requests are in flight on one stdio pipe and queues the
+rest fairly across callers, rejecting new work once the queue is full
+"""
+import concurrent.futures
+import contextvars
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, Optional
+
+# Who a request is made on behalf of (set per HTTP request by the bridges)
+current_caller: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("mcp_caller", default=None)
+
+
+def caller_id(request) -> str:
+    """Identify the caller of an HTTP request: OpenWebUI user, else client address"""
+    user = request.headers.get("x-openwebui-user-id") or request.headers.get("x-user-id")
+    if user:
+        return f"user:{user}"
+    return f"addr:{request.client.host}" if request.client else "anonymous"
+
+
+class QueueFullError(Exception):
+    """Raised when a request cannot even be queued"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"MCP request queue full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class FairLimiter:
+    """
+    In-flight window with round-robin queueing per caller
+
+    acquire() grants a slot immediately when one is free. Otherwise the
+    request waits in its caller's queue, and freed slots go to callers in
+    turn, so one client's burst cannot starve the others. Waiters are
+    concurrent.futures.Future objects, usable from threads and (wrapped)
+    from any event loop.
+    """
+
+    def __init__(self, limit: int, max_queue: int):
+        """
+        Args:
+            limit: Maximum requests in flight (0 disables limiting)
+            max_queue: Maximum requests waiting for a slot
+        """
+        self.limit = limit
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self.queued = 0
+        self.rejected = 0
+        self._queues: "OrderedDict[Any, deque]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Smoothed seconds a slot is held, for Retry-After estimates
+        self._hold_seconds = 0.5
+
+    def acquire(self, caller: Any = None) -> Optional[concurrent.futures.Future]:
+        """
+        Take a slot
+
+        Returns:
+            None if the slot was granted, else a future resolved on grant
+
+        Raises:
+            QueueFullError: The queue is at max_queue
+        """
+        with self._lock:
+            if not self.limit or self.in_flight < self.limit and not self.queued:
+                self.in_flight += 1
+                return None
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                raise QueueFullError(self._retry_after())
+            waiter: concurrent.futures.Future = concurrent.futures.Future()
+            waiter.caller = caller
+            self._queues.setdefault(caller, deque()).append(waiter)
+            self.queued += 1
+            return waiter
+
+    def finish(self, waiter: Optional[concurrent.futures.Future], held_since: Optional[float] = None):
+        """
+        Give back what acquire() returned, whether or not it was granted
+
+        Args:
+            waiter: The value acquire() returned
+            held_since: perf_counter() when the slot started being used
+        """
+        if waiter is not None:
+            waiter.cancel()  # No-op if it was already granted
+        with self._lock:
+            if waiter is not None and waiter.cancelled():
+                # Never granted: just leave the queue
+                queue = self._queues.get(waiter.caller)
+                if queue is not None and waiter in queue:
+                    queue.remove(waiter)
+                    self.queued -= 1
+                    if not queue:
+                        del self._queues[waiter.caller]
+                return
+            if held_since is not None:
+                self._hold_seconds = 0.8 * self._hold_seconds + 0.2 * (time.perf_counter() - held_since)
+            self.in_flight -= 1
+            self._grant_next()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "in_flight": self.in_flight,
+                "queued": self.queued,
+                "max_queue": self.max_queue,
+                "callers_waiting": len(self._queues),
+                "rejected": self.rejected
+            }
+
+    def _grant_next(self):
+        # Caller must hold self._lock
+        while self._queues and (not self.limit or self.in_flight < self.limit):
+            caller, queue = next(iter(self._queues.items()))
+            waiter = queue.popleft()
+            self.queued -= 1
+            # Move the caller to the back of the rotation
+            del self._queues[caller]
+            if queue:
+                self._queues[caller] = queue
+            if waiter.set_running_or_notify_cancel():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def _retry_after(self) -> int:
+        per_slot = self._hold_seconds / max(self.limit, 1)
+        return max(1, math.ceil(per_slot * (self.queued + 1)))
+
+
+async def identify_caller(request, call_next):
+    """HTTP middleware: queue MCP requests under the caller that made them"""
+    token = current_caller.set(caller_id(request))
+    try:
+        return await call_next(request)
+    finally:
+        current_caller.reset(token)
@@ -0,0 +1,318 @@
+"""
+MCP streamable HTTP transport
+Talks to a remote (or load-balanced) MCP server over MCP's HTTP transport:
+every JSON-RPC request is a POST answered with JSON or an SSE stream, sent
+over a pool of keep-alive connections
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+import httpx
+
+from agent_s.mcp.codec import JSONCodec
+from agent_s.mcp.transport import (
+    DEFAULT_MAX_IN_FLIGHT, DEFAULT_MAX_QUEUE, PROTOCOL_VERSION,
+    CallTiming, MCPTimeoutError, MCPTransport, MCPTransportError
+)
+
+logger = logging.getLogger("agent_s.mcp.http_transport")
+
+# Keep-alive connections to the MCP server (one is held by the event stream)
+DEFAULT_POOL_SIZE = int(os.getenv("MCP_HTTP_POOL_SIZE", 16))
+
+SESSION_HEADER = "Mcp-Session-Id"
+PROTOCOL_HEADER = "MCP-Protocol-Version"
+EVENT_STREAM = "text/event-stream"
+
+
+class MCPSessionExpired(MCPTransportError):
+    """The server no longer knows the session a request was sent with"""
+
+
+class MCPHTTPTransport(MCPTransport):
+    """
+    JSON-RPC transport to a streamable HTTP MCP server
+
+    Each request is POSTed to the server's MCP endpoint. The server answers
+    with a single JSON response, or with an SSE stream carrying progress
+    notifications followed by the response. The session id handed out on
+    initialize is sent with every later request; when the server expires it
+    (HTTP 404), the handshake is repeated once and the request retried.
+    After initialize, a GET event stream receives server-initiated
+    notifications (tools/list_changed), reconnecting with backoff when it
+    drops.
+
+    The httpx client is created on first use, on the event loop that serves
+    requests, so its connection pool belongs to that loop.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        timeout: float = 10.0,
+        codec: Optional[JSONCodec] = None,
+        headers: Optional[Dict[str, str]] = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        listen: bool = True
+    ):
+        """
+        Args:
+            url: The server's MCP endpoint (e.g. https://host/mcp)
+            timeout: Default seconds to wait for a response
+            codec: JSON codec (default: get_codec(), orjson/msgspec if installed)
+            headers: Extra headers for every request (default: a bearer
+                token from MCP_SERVER_TOKEN, if set)
+            pool_size: Maximum connections kept open to the server
+            max_in_flight: Outstanding requests allowed (0 for no limit)
+            max_queue: Requests allowed to wait for a slot
+            listen: Open the GET event stream after initialize
+        """
+        super().__init__(timeout, codec, max_in_flight, max_queue)
+        self.url = url
+        if headers is None:
+            token = os.getenv("MCP_SERVER_TOKEN")
+            headers = {"Authorization": f"Bearer {token}"} if token else {}
+        self.headers = headers
+        self.pool_size = pool_size
+        self.listen = listen
+        self.session_id: Optional[str] = None
+        self.protocol_version: Optional[str] = None
+
+        self._running = False
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listener: Optional[asyncio.Task] = None
+        self._last_event_id: Optional[str] = None
+        self._client_info: Optional[Dict[str, str]] = None
+        self._session_lock = asyncio.Lock()
+
+    def start(self):
+        """Accept requests; connections are opened on first use"""
+        logger.info(f"Using MCP server at {self.url} (codec: {self.codec.name}, pool: {self.pool_size})")
+        self._running = True
+
+    def stop(self):
+        """Stop accepting requests and close the session in the background"""
+        if not self._running:
+            return
+        self._running = False
+        if self._loop is not None and self._loop.is_running():
+            asyncio.run_coroutine_threadsafe(self._close(), self._loop)
+
+    async def aclose(self):
+        """End the session and close pooled connections"""
+        self._running = False
+        await self._close()
+
+    def is_running(self) -> bool:
+        """Whether requests are accepted (the server itself may still be down)"""
+        return self._running
+
+    def notify(self, method: str, params: Optional[Dict] = None):
+        """Send a JSON-RPC notification (no response expected)"""
+        if not self._running:
+            raise MCPTransportError("MCP server not running")
+        if self._loop is None:
+            raise MCPTransportError("MCP session not initialized")
+        asyncio.run_coroutine_threadsafe(self._post_notification(method, params), self._loop)
+
+    async def initialize(self, client_name: str, client_version: str) -> Dict[str, Any]:
+        """Perform the MCP initialize handshake and open the event stream"""
+        self._client_info = {"name": client_name, "version": client_version}
+        response = await self.request("initialize", self._initialize_params())
+        await self._initialized(response)
+        if self.listen and self._listener is None:
+            self._listener = asyncio.ensure_future(self._listen())
+        return response
+
+    def _initialize_params(self) -> Dict[str, Any]:
+        return {"protocolVersion": PROTOCOL_VERSION, "capabilities": {}, "clientInfo": self._client_info}
+
+    async def _initialized(self, response: Dict[str, Any]):
+        self.protocol_version = response.get("result", {}).get("protocolVersion", PROTOCOL_VERSION)
+        await self._post_notification("notifications/initialized")
+
+    async def _reinitialize(self, timeout: float):
+        """Open a new session after the server expired ours (once for all waiting callers)"""
+        async with self._session_lock:
+            if self.session_id is not None:
+                # Another caller already has
+                return
+            logger.info("MCP session expired, initializing a new one")
+            response = await self._send("initialize", self._initialize_params(), time.perf_counter(), timeout)
+            await self._initialized(response)
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._loop = asyncio.get_running_loop()
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+            )
+        return self._client
+
+    def _request_headers(self, accept: str = f"application/json, {EVENT_STREAM}") -> Dict[str, str]:
+        headers = {"Accept": accept, "Content-Type": "application/json", **self.headers}
+        if self.session_id:
+            headers[SESSION_HEADER] = self.session_id
+        if self.protocol_version:
+            headers[PROTOCOL_HEADER] = self.protocol_version
+        return headers
+
+    async def _roundtrip(self, method: str, params: Optional[Dict], started: float, timeout: float) -> Dict[str, Any]:
+        deadline = time.perf_counter() + timeout
+        try:
+            return await self._send(method, params, started, timeout)
+        except MCPSessionExpired:
+            if method == "initialize" or self._client_info is None:
+                raise
+        await self._reinitialize(max(0.0, deadline - time.perf_counter()))
+        return await self._send(method, params, started, max(0.0, deadline - time.perf_counter()))
+
+    async def _send(self, method: str, params: Optional[Dict], started: float, timeout: float) -> Dict[str, Any]:
+        request_id = next(self._ids)
+        timing = CallTiming(method, params, started)
+        body = self.codec.encode({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params or {}})
+        timing.request_bytes = len(body)
+        try:
+            return await asyncio.wait_for(self._post(request_id, body, timing), timeout=timeout)
+        except asyncio.TimeoutError:
+            timing.outcome = "timeout"
+            self._observe(timing)
+            raise MCPTimeoutError(f"MCP request timeout: {method}")
+        except (httpx.HTTPError, MCPTransportError) as e:
+            timing.outcome = "error"
+            self._observe(timing)
+            if isinstance(e, MCPTransportError):
+                raise
+            raise MCPTransportError(f"MCP HTTP request failed: {e}")
+
+    async def _post(self, request_id: int, body: bytes, timing: CallTiming) -> Dict[str, Any]:
+        client = self._get_client()
+        timing.write_start = timing.write_end = time.perf_counter()
+        async with client.stream("POST", self.url, content=body, headers=self._request_headers()) as response:
+            self._check_response(response)
+            if response.headers.get("content-type", "").startswith(EVENT_STREAM):
+                async for message, size, received in self._events(response):
+                    if message.get("id") == request_id and ("result" in message or "error" in message):
+                        self._complete(timing, message, received, size)
+                        self._observe(timing)
+                        return message
+                    self._dispatch(message)
+                raise MCPTransportError("MCP event stream ended without a response")
+
+            raw = await response.aread()
+            received = time.perf_counter()
+            try:
+                message = self.codec.decode(raw)
+            except ValueError:
+                raise MCPTransportError(f"MCP server sent invalid JSON: {raw[:200]!r}")
+            self._complete(timing, message, received, len(raw))
+            self._observe(timing)
+            return message
+
+    def _check_response(self, response: httpx.Response):
+        session_id = response.headers.get(SESSION_HEADER)
+        if session_id:
+            self.session_id = session_id
+        sent = response.request.headers.get(SESSION_HEADER)
+        if response.status_code == 404 and sent:
+            # Only forget the session if no other request has renewed it yet
+            if self.session_id == sent:
+                self.session_id = None
+            raise MCPSessionExpired("MCP session expired")
+        if response.status_code >= 400:
+            raise MCPTransportError(f"MCP server returned HTTP {response.status_code}")
+
+    async def _post_notification(self, method: str, params: Optional[Dict] = None):
+        body = self.codec.encode({"jsonrpc": "2.0", "method": method, "params": params or {}})
+        try:
+            response = await self._get_client().post(self.url, content=body, headers=self._request_headers())
+            self._check_response(response)
+        except (httpx.HTTPError, MCPTransportError) as e:
+            logger.warning(f"MCP notification {method} failed: {e}")
+
+    async def _events(self, response: httpx.Response) -> AsyncIterator[Tuple[Dict[str, Any], int, float]]:
+        """Decoded JSON-RPC messages from an SSE body, with their size and arrival time"""
+        data = []
+        async for line in response.aiter_lines():
+            if line:
+                if line.startswith(":"):
+                    continue
+                field, _, value = line.partition(":")
+                value = value[1:] if value.startswith(" ") else value
+                if field == "data":
+                    data.append(value)
+                elif field == "id":
+                    self._last_event_id = value
+                continue
+            if not data:
+                continue
+            payload = "\n".join(data).encode("utf-8")
+            data = []
+            received = time.perf_counter()
+            try:
+                message = self.codec.decode(payload)
+            except ValueError:
+                logger.warning(f"Ignoring non-JSON event from MCP server: {payload[:200]!r}")
+                continue
+            if isinstance(message, dict):
+                yield message, len(payload), received
+
+    def _dispatch(self, message: Dict[str, Any]):
+        if "method" in message:
+            self._handle_notification(message)
+
+    async def _listen(self):
+        """Receive server-initiated messages on the GET event stream"""
+        delay = 1.0
+        while self._running:
+            headers = self._request_headers(accept=EVENT_STREAM)
+            if self._last_event_id:
+                headers["Last-Event-ID"] = self._last_event_id
+            try:
+                async with self._get_client().stream(
+                    "GET", self.url, headers=headers, timeout=httpx.Timeout(self.timeout, read=None)
+                ) as response:
+                    if response.status_code == 405:
+                        logger.info("MCP server offers no event stream; server notifications disabled")
+                        return
+                    self._check_response(response)
+                    delay = 1.0
+                    async for message, _, _ in self._events(response):
+                        self._dispatch(message)
+            except asyncio.CancelledError:
+                raise
+            except MCPSessionExpired:
+                try:
+                    await self._reinitialize(self.timeout)
+                except Exception as e:
+                    logger.warning(f"MCP event stream lost its session: {e}")
+            except Exception as e:
+                logger.warning(f"MCP event stream dropped: {e}")
+            if not self._running:
+                return
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+    async def _close(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        if self._client is None:
+            return
+        if self.session_id:
+            try:
+                await self._client.delete(self.url, headers=self._request_headers(), timeout=2.0)
+            except httpx.HTTPError:
+                pass
+            self.session_id = None
+        await self._client.aclose()
+        self._client = None
+        logger.info(f"Closed MCP session with {self.url}")
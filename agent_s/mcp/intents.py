@@ -0,0 +1,234 @@
+"""
+Intent parser for chat messages that should run an MCP tool
+Compiles a table of categories and rules once at import; parsing a message is
+one keyword scan to pick candidate categories plus a few anchored regexes.
+Only depends on the standard library so the router pipeline can import it.
+"""
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+class _Missing(dict):
+    """format_map helper: unknown placeholders render as empty strings"""
+
+    def __missing__(self, key):
+        return ""
+
+
+class Rule:
+    """
+    Maps a message to a tool call
+
+    `pattern` is searched in the lowercased message; named groups become tool
+    arguments taken from the original text (so titles keep their case) and
+    converted with `types` (str by default). A rule without a pattern always
+    matches and is used as its category's fallback.
+    """
+
+    def __init__(
+        self,
+        tool: str,
+        pattern: Optional[str] = None,
+        types: Optional[Dict[str, Callable[[str], Any]]] = None,
+        args: Optional[Dict[str, Any]] = None,
+        explain: str = ""
+    ):
+        """
+        Args:
+            tool: MCP tool name to call
+            pattern: Lowercase regex searched in the lowercased message
+            types: Converters for captured groups (e.g. {"id": int})
+            args: Constant arguments added to every match
+            explain: Human-readable summary, formatted with the arguments
+        """
+        self.tool = tool
+        self.regex = re.compile(pattern) if pattern else None
+        self.types = types or {}
+        self.args = args or {}
+        self.explain = explain
+
+    def apply(self, lowered: str, original: str) -> Optional[Dict[str, Any]]:
+        """
+        Return {"tool", "args", "explain"} if the rule matches
+
+        Args:
+            lowered: The message, lowercased
+            original: The message as written, aligned character by character
+        """
+        args = dict(self.args)
+        if self.regex is not None:
+            match = self.regex.search(lowered)
+            if not match:
+                return None
+            for name in self.regex.groupindex:
+                start, end = match.span(name)
+                if start < 0:
+                    continue
+                try:
+                    args[name] = self.types.get(name, str)(original[start:end].strip())
+                except ValueError:
+                    return None
+        return {"tool": self.tool, "args": args, "explain": self.explain.format_map(_Missing(args))}
+
+
+class Category:
+    """A group of rules selected by keywords; earlier categories win"""
+
+    def __init__(self, name: str, keywords: Iterable[str], rules: List[Rule]):
+        """
+        Args:
+            name: Category name (for debugging and benchmarks)
+            keywords: Lowercase regex fragments that select this category,
+                matched at the start of a word ("note" also matches "notes")
+            rules: Tried in order; if none match, later categories are tried
+        """
+        self.name = name
+        self.keywords = list(keywords)
+        self.rules = rules
+
+
+class IntentParser:
+    """
+    Compiled intent rules
+
+    All category keywords are merged into one alternation, so finding
+    candidate categories is a single scan of the message regardless of how
+    many categories there are. The alternation has a single leading word
+    boundary and no capture groups and runs case-sensitively on the
+    lowercased message, which keeps the regex engine on its fast path; the
+    category of each distinct matched word is looked up once and
+    memoized.
+    """
+
+    def __init__(self, categories: List[Category]):
+        self.categories = categories
+        self._scan = re.compile(r"\b(?:%s)" % "|".join(k for c in categories for k in c.keywords))
+        self._matchers = [re.compile("|".join(c.keywords)) for c in categories]
+        self._word_category: Dict[str, int] = {}
+
+    def categories_for(self, lowered: str) -> List[Category]:
+        """Categories whose keywords occur in a lowercased message, highest priority first"""
+        found = set()
+        for word in self._scan.findall(lowered):
+            index = self._word_category.get(word)
+            if index is None:
+                index = next(i for i, m in enumerate(self._matchers) if m.fullmatch(word))
+                self._word_category[word] = index
+            found.add(index)
+        return [self.categories[i] for i in sorted(found)]
+
+    def parse(self, text: str) -> Optional[Dict[str, Any]]:
+        """
+        Map a message to a tool call
+
+        Returns:
+            {"tool": str, "args": dict, "explain": str} or None
+        """
+        if not text:
+            return None
+        text = " ".join(text.split())
+        lowered = text.lower()
+        # A few characters change length when lowercased; then capture from the lowered text
+        original = text if len(text) == len(lowered) else lowered
+        for category in self.categories_for(lowered):
+            for rule in category.rules:
+                intent = rule.apply(lowered, original)
+                if intent is not None:
+                    return intent
+        return None
+
+
+# Rules for the OpenAI bridge's default (no native tool calling) mode
+BRIDGE_PARSER = IntentParser([
+    Category("tasks", [r"tasks?\b", r"todos?\b", r"to-dos?\b"], [
+        Rule("complete_task", r"\b(?:complete|finish|done)\s+(?:(?:the\s+)?task\s+)?#?(?P<id>\d+)",
+             types={"id": int}, explain="Completing task #{id}"),
+        Rule("complete_task", r"\btask\s+#?(?P<id>\d+)\s+(?:is\s+|as\s+)?(?:done|complete|completed|finished)\b",
+             types={"id": int}, explain="Completing task #{id}"),
+        Rule("add_task",
+             r"\b(?:add|create|new)\s+(?:a\s+)?(?:new\s+)?(?:(?:task|todo|to-do)s?\b)?\s*:?\s*"
+             r"(?!(?:task|todo|to-do)s?\b)(?P<title>\w.*?)(?:\s+by\s+(?P<due>[\w\-/: ]+?))?[.!]*$",
+             explain="Adding task '{title}'"),
+        Rule("list_tasks", explain="Listing tasks"),
+    ]),
+    Category("notes", [r"notes?\b"], [
+        Rule("search_notes", r"\bnotes?\s+(?:about|on|for|mentioning)\s+(?P<query>\w.*?)[?.!]*$",
+             explain="Searching notes for '{query}'"),
+        Rule("list_notes", explain="Listing notes"),
+    ]),
+    Category("inventory", ["inventory", "stock", "restock", r"skus?\b", "quantity"], [
+        Rule("check_inventory",
+             r"\b(?:check|qty|quantity|stock|inventory|how\s+many|how\s+much)\b.*?\b(?:for|of|on)\s+"
+             r"(?P<item>\w[\w\- ]*?)(?:\s+(?:in\s+stock|left))?[?.!]*$",
+             explain="Checking inventory for '{item}'"),
+        Rule("check_inventory",
+             r"\bhow\s+(?:many|much)\s+(?P<item>\w[\w\- ]*?)\s+(?:are\s+|is\s+|do\s+we\s+have\s+)?(?:in\s+stock|left)\b",
+             explain="Checking inventory for '{item}'"),
+        Rule("list_inventory", explain="Listing inventory"),
+    ]),
+    Category("expenses", ["expense", "spen[dt]", "purchases"], [
+        Rule("list_expenses", explain="Listing expenses"),
+    ]),
+    Category("customers", ["customer", "client"], [
+        Rule("list_customers", explain="Listing customers"),
+    ]),
+    Category("tools", [r"tools?\b"], [
+        Rule("__list_tools__", explain="Showing available tools"),
+    ]),
+])
+
+
+# Rules for pipelines/alphaomega_router.py's MCP route
+ROUTER_PARSER = IntentParser([
+    Category("tasks", ["task", "todo", "to-do"], [
+        Rule("create_task", r"^(?=.*\b(?:create|add|new)\b).*(?:task|todo|to-do)s?\W*(?P<title>.*?)\s*$",
+             args={"priority": "medium"}, explain="Creating task '{title}'"),
+        Rule("list_tasks", r"\b(?:list|show|my|what|do i have|get|see|today|tomorrow)\b", explain="Listing tasks"),
+        # Short asks ("tasks please") are queries too
+        Rule("list_tasks", r"^\W*(?:\S+\s+){0,4}\S+\W*$", explain="Listing tasks"),
+    ]),
+    Category("inventory", ["inventory", "stock"], [
+        Rule("get_low_stock_items", r"\blow\s+stock\b", explain="Listing low stock items"),
+        Rule("check_inventory", r"\bfor\s+(?P<product_name>\w.*?)[?.!]*$", explain="Checking inventory for '{product_name}'"),
+        Rule("check_inventory", explain="Checking inventory"),
+    ]),
+    Category("customers", ["customer", "client"], [
+        Rule("list_customers", r"\b(?:list|show|all)\b", explain="Listing customers"),
+        Rule("add_customer", r"\badd\b", explain="Adding customer"),
+        Rule("list_customers", r"\bvip\b", explain="Listing customers"),
+    ]),
+    Category("notes", ["note"], [
+        Rule("create_note", r"\b(?:create|add)\b.*notes?\W*(?P<content>.*?)\s*$",
+             args={"title": "Note"}, explain="Creating note"),
+        Rule("search_notes", r"\bsearch\b.*?\bnotes?\b\W*(?:for\s+|about\s+)?(?P<query>.*?)[?.!]*$",
+             explain="Searching notes for '{query}'"),
+        Rule("list_notes", explain="Listing notes"),
+    ]),
+    Category("sales", ["sale", "revenue"], [
+        Rule("get_sales_report", r"\b(?:report|last|month)", explain="Getting sales report"),
+        Rule("record_sale", r"\b(?:record|add)\b", explain="Recording sale"),
+        Rule("get_sales_report", explain="Getting sales report"),
+    ]),
+    Category("expenses", ["expense", "cost", "spending"], [
+        Rule("list_expenses", r"\b(?:list|show)\b", explain="Listing expenses"),
+        Rule("add_expense", r"\badd\b[^:]*:\s*(?P<description>.*?)\s*$", explain="Adding expense"),
+        Rule("add_expense", r"\badd\b", args={"description": ""}, explain="Adding expense"),
+        Rule("list_expenses", explain="Listing expenses"),
+    ]),
+    Category("appointments", ["appointment", "schedule", "calendar", "meeting"], [
+        Rule("list_appointments", r"\b(?:list|show|my)\b", explain="Listing appointments"),
+        Rule("create_appointment", r"\b(?:add|create|schedule)\b", explain="Creating appointment"),
+        Rule("list_appointments", explain="Listing appointments"),
+    ]),
+    Category("instagram", ["instagram"], [
+        Rule("post_to_instagram", r"\bpost\b[^:]*:\s*(?P<content>.*?)\s*$", explain="Posting to Instagram"),
+        Rule("post_to_instagram", r"\bpost\b", args={"content": ""}, explain="Posting to Instagram"),
+        Rule("get_instagram_messages", r"\b(?:messages?|dms?)\b", explain="Getting Instagram messages"),
+        Rule("get_instagram_notifications", explain="Getting Instagram notifications"),
+    ]),
+    Category("facebook", ["facebook"], [
+        Rule("post_to_facebook", r"\bpost\b[^:]*:\s*(?P<content>.*?)\s*$", explain="Posting to Facebook"),
+        Rule("post_to_facebook", r"\bpost\b", args={"content": ""}, explain="Posting to Facebook"),
+        Rule("get_facebook_messages", r"\bmessages?\b", explain="Getting Facebook messages"),
+        Rule("get_facebook_notifications", explain="Getting Facebook notifications"),
+    ]),
+])
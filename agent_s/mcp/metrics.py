@@ -0,0 +1,214 @@
+"""
+Per-call metrics for the MCP bridges
+Turns the transport's CallTiming records into Prometheus histograms, a
+slow-call log with redacted arguments and, optionally, JSON span lines
+"""
+import json
+import logging
+import os
+import secrets
+import threading
+from typing import Any, Dict, Optional
+
+from fastapi import Response
+
+from agent_s.mcp.transport import CallTiming
+
+try:
+    from prometheus_client import CollectorRegistry, Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
+    from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+logger = logging.getLogger("agent_s.mcp.metrics")
+slow_logger = logging.getLogger("agent_s.mcp.slow")
+
+# Phases of a call are sub-millisecond to seconds; sizes are bytes to megabytes
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (128, 512, 2048, 8192, 32768, 131072, 524288, 2097152, 8388608)
+
+
+def redact(value: Any) -> Any:
+    """Keep the shape of tool arguments but none of their values"""
+    if isinstance(value, dict):
+        return {str(k): redact(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [redact(v) for v in value[:5]] + ([f"<+{len(value) - 5}>"] if len(value) > 5 else [])
+    if isinstance(value, str):
+        return f"<str:{len(value)}>"
+    if value is None or isinstance(value, bool):
+        return value
+    return f"<{type(value).__name__}>"
+
+
+class BridgeMetrics:
+    """
+    Collects CallTiming records from an MCPStdioTransport
+
+    Register with transport.add_call_observer(metrics.observe). Histograms are
+    labelled by tool (or JSON-RPC method for non tools/call requests), which
+    stays bounded by the server's tool list.
+    """
+
+    def __init__(
+        self,
+        slow_seconds: Optional[float] = None,
+        span_file: Optional[str] = None
+    ):
+        """
+        Args:
+            slow_seconds: Calls slower than this are logged (0 disables)
+            span_file: Append one JSON span per call phase to this file
+        """
+        if slow_seconds is None:
+            slow_seconds = float(os.getenv("MCP_SLOW_CALL_SECONDS", 1.0))
+        self.slow_seconds = slow_seconds
+        self.span_file = span_file if span_file is not None else os.getenv("MCP_TRACE_FILE")
+        self._span_lock = threading.Lock()
+        self._span_out = None
+        self._flow_source = None
+
+        if not PROMETHEUS_AVAILABLE:
+            logger.warning("prometheus_client not installed; /metrics disabled")
+            return
+
+        # Own registry so several bridges (or tests) can live in one process
+        self.registry = CollectorRegistry()
+        self.calls = Counter(
+            "mcp_calls", "MCP requests by tool and outcome",
+            ["tool", "outcome"], registry=self.registry
+        )
+        self.phase_seconds = Histogram(
+            "mcp_call_phase_seconds", "Time spent per call phase (queue, write, server, decode)",
+            ["tool", "phase"], buckets=LATENCY_BUCKETS, registry=self.registry
+        )
+        self.total_seconds = Histogram(
+            "mcp_call_seconds", "End-to-end MCP request latency",
+            ["tool"], buckets=LATENCY_BUCKETS, registry=self.registry
+        )
+        self.payload_bytes = Histogram(
+            "mcp_payload_bytes", "Serialized JSON-RPC message sizes",
+            ["tool", "direction"], buckets=SIZE_BUCKETS, registry=self.registry
+        )
+
+    def watch_flow(self, transport):
+        """
+        Export the transport's in-flight window and queue depth
+
+        Values are read at scrape time; calling again (after a restart)
+        switches to the new transport.
+        """
+        first = self._flow_source is None
+        self._flow_source = transport
+        if PROMETHEUS_AVAILABLE and first:
+            self.registry.register(_FlowCollector(self))
+
+    def flow_stats(self) -> Optional[Dict[str, Any]]:
+        """The watched transport's flow_stats(), if any"""
+        return self._flow_source.flow_stats() if self._flow_source is not None else None
+
+    def observe(self, timing: CallTiming):
+        """Record one finished request (transport call observer)"""
+        name = timing.name
+        phases = timing.phases()
+        total = timing.total
+
+        if PROMETHEUS_AVAILABLE:
+            self.calls.labels(name, timing.outcome).inc()
+            self.total_seconds.labels(name).observe(total)
+            for phase, seconds in phases.items():
+                self.phase_seconds.labels(name, phase).observe(seconds)
+            self.payload_bytes.labels(name, "request").observe(timing.request_bytes)
+            if timing.response_bytes:
+                self.payload_bytes.labels(name, "response").observe(timing.response_bytes)
+
+        if self.slow_seconds > 0 and total >= self.slow_seconds:
+            self._log_slow(timing, phases, total)
+        if self.span_file:
+            self._export_spans(timing, phases, total)
+
+    def response(self) -> Response:
+        """Prometheus text exposition for /metrics"""
+        if not PROMETHEUS_AVAILABLE:
+            return Response("prometheus_client not installed\n", status_code=503, media_type="text/plain")
+        return Response(generate_latest(self.registry), media_type=CONTENT_TYPE_LATEST)
+
+    def close(self):
+        """Close the span file"""
+        with self._span_lock:
+            if self._span_out:
+                self._span_out.close()
+                self._span_out = None
+
+    def _log_slow(self, timing: CallTiming, phases: Dict[str, float], total: float):
+        breakdown = " ".join(f"{phase}={seconds * 1000:.1f}ms" for phase, seconds in phases.items())
+        arguments = (timing.params or {}).get("arguments") if timing.method == "tools/call" else timing.params
+        slow_logger.warning(
+            f"Slow MCP call {timing.name}: {total * 1000:.1f}ms ({timing.outcome}) {breakdown} "
+            f"request={timing.request_bytes}B response={timing.response_bytes}B "
+            f"args={json.dumps(redact(arguments or {}))}"
+        )
+
+    def _export_spans(self, timing: CallTiming, phases: Dict[str, float], total: float):
+        """Write an OpenTelemetry-style span for the call plus one child per phase"""
+        trace_id = secrets.token_hex(16)
+        root_id = secrets.token_hex(8)
+        start = timing.started_ns
+        spans = [{
+            "traceId": trace_id,
+            "spanId": root_id,
+            "name": f"{timing.method} {timing.name}" if timing.name != timing.method else timing.method,
+            "startTimeUnixNano": start,
+            "endTimeUnixNano": start + int(total * 1e9),
+            "attributes": {
+                "mcp.tool": timing.name,
+                "mcp.outcome": timing.outcome,
+                "mcp.request_bytes": timing.request_bytes,
+                "mcp.response_bytes": timing.response_bytes
+            }
+        }]
+        offset = 0.0
+        for phase, seconds in phases.items():
+            spans.append({
+                "traceId": trace_id,
+                "spanId": secrets.token_hex(8),
+                "parentSpanId": root_id,
+                "name": phase,
+                "startTimeUnixNano": start + int(offset * 1e9),
+                "endTimeUnixNano": start + int((offset + seconds) * 1e9)
+            })
+            offset += seconds
+
+        lines = "".join(json.dumps(span) + "\n" for span in spans)
+        try:
+            with self._span_lock:
+                if self._span_out is None:
+                    self._span_out = open(self.span_file, "a", encoding="utf-8")
+                self._span_out.write(lines)
+                self._span_out.flush()
+        except OSError as e:
+            logger.warning(f"Span export to {self.span_file} failed: {e}")
+
+
+class _FlowCollector:
+    """Scrape-time gauges over BridgeMetrics.flow_stats()"""
+
+    def __init__(self, metrics: BridgeMetrics):
+        self.metrics = metrics
+
+    def describe(self):
+        return []
+
+    def collect(self):
+        stats = self.metrics.flow_stats()
+        if stats is None:
+            return
+        for name, key, doc in (
+            ("mcp_in_flight", "in_flight", "MCP requests written and awaiting a response"),
+            ("mcp_in_flight_limit", "limit", "Maximum MCP requests in flight (0 = unlimited)"),
+            ("mcp_queue_depth", "queued", "MCP requests waiting for an in-flight slot"),
+            ("mcp_queue_callers", "callers_waiting", "Distinct callers with queued MCP requests"),
+        ):
+            yield GaugeMetricFamily(name, doc, value=stats[key])
+        yield CounterMetricFamily("mcp_queue_rejected", "MCP requests rejected with a full queue", value=stats["rejected"])
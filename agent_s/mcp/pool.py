@@ -0,0 +1,108 @@
+"""
+Pool of MCP transports behind one MCPTransport
+Spreads requests over several MCP server processes so one slow or
+single-threaded child does not serialize every bridge front-end
+"""
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+from agent_s.mcp.transport import DEFAULT_MAX_IN_FLIGHT, DEFAULT_MAX_QUEUE, MCPTransport, MCPTransportError
+
+logger = logging.getLogger("agent_s.mcp.pool")
+
+
+class MCPTransportPool(MCPTransport):
+    """
+    Several MCP connections used as one
+
+    Admission (the in-flight window and per-caller queues) happens once, in
+    the pool; each admitted request goes to the running worker with the
+    fewest requests outstanding. Worker notifications and call timings are
+    forwarded to the pool's own handlers and observers, so catalogs and
+    metrics register with the pool exactly as with a single transport.
+
+    Workers should be created with max_in_flight=0: the pool's limiter is
+    the only one that applies.
+    """
+
+    def __init__(
+        self,
+        workers: List[MCPTransport],
+        max_in_flight: Optional[int] = None,
+        max_queue: int = DEFAULT_MAX_QUEUE
+    ):
+        """
+        Args:
+            workers: Transports to spread requests over (not yet started)
+            max_in_flight: Outstanding requests allowed across the pool
+                (default: DEFAULT_MAX_IN_FLIGHT per worker, 0 for no limit)
+            max_queue: Requests allowed to wait for a slot
+        """
+        if not workers:
+            raise ValueError("MCPTransportPool needs at least one worker")
+        if max_in_flight is None:
+            max_in_flight = DEFAULT_MAX_IN_FLIGHT * len(workers)
+        super().__init__(workers[0].timeout, workers[0].codec, max_in_flight, max_queue)
+        self.workers = workers
+        self._load = [0] * len(workers)
+        for worker in workers:
+            worker.add_notification_handler(self._handle_notification)
+            worker.add_call_observer(self._observe)
+
+    def start(self):
+        """Start every worker"""
+        for worker in self.workers:
+            worker.start()
+        logger.info(f"Started MCP pool with {len(self.workers)} workers")
+
+    def stop(self):
+        """Stop every worker"""
+        for worker in self.workers:
+            worker.stop()
+
+    async def aclose(self):
+        """Stop every worker from async code"""
+        await asyncio.gather(*(worker.aclose() for worker in self.workers), return_exceptions=True)
+
+    def is_running(self) -> bool:
+        """Whether any worker can take requests"""
+        return any(worker.is_running() for worker in self.workers)
+
+    def notify(self, method: str, params: Optional[Dict] = None):
+        """Send a notification to every running worker"""
+        for worker in self.workers:
+            if worker.is_running():
+                worker.notify(method, params)
+
+    async def initialize(self, client_name: str, client_version: str) -> Dict[str, Any]:
+        """Initialize all workers concurrently; returns the first worker's response"""
+        responses = await asyncio.gather(
+            *(worker.initialize(client_name, client_version) for worker in self.workers),
+            return_exceptions=True
+        )
+        for index, response in enumerate(responses):
+            if isinstance(response, Exception):
+                logger.error(f"MCP worker {index} failed to initialize: {response}")
+                self.workers[index].stop()
+        ok = [r for r in responses if not isinstance(r, Exception)]
+        if not ok:
+            raise responses[0]
+        return ok[0]
+
+    def flow_stats(self) -> Dict[str, Any]:
+        """Pool-wide flow stats plus the requests outstanding on each worker"""
+        stats = self.limiter.stats()
+        stats["workers"] = list(self._load)
+        return stats
+
+    async def _roundtrip(self, method: str, params: Optional[Dict], started: float, timeout: float) -> Dict[str, Any]:
+        running = [i for i, worker in enumerate(self.workers) if worker.is_running()]
+        if not running:
+            raise MCPTransportError("MCP server not running")
+        index = min(running, key=self._load.__getitem__)
+        self._load[index] += 1
+        try:
+            return await self.workers[index]._roundtrip(method, params, started, timeout)
+        finally:
+            self._load[index] -= 1
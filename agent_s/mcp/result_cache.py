@@ -0,0 +1,260 @@
+"""
+Tool result cache for the MCP bridges
+Serves repeated read-only tool calls (list_tasks, list_inventory, ...) from
+memory and drops the affected entries when a write tool succeeds
+"""
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple
+
+logger = logging.getLogger("agent_s.mcp.result_cache")
+
+READ = "read"
+WRITE = "write"
+UNKNOWN = "unknown"
+
+READ_PREFIXES = ("list_", "get_", "search_", "check_", "read_", "find_", "show_", "count_", "view_")
+WRITE_PREFIXES = (
+    "add_", "create_", "update_", "delete_", "remove_", "complete_", "record_", "set_",
+    "post_", "write_", "save_", "send_", "mark_", "edit_", "cancel_", "schedule_", "move_"
+)
+
+# Words that say nothing about which data a tool touches
+_NOISE_WORDS = {"all", "by", "for", "details", "detail", "info", "report", "summary", "low", "new", "my"}
+
+
+def _parse_ttls(spec: str) -> Dict[str, float]:
+    """Parse "list_tasks=60,list_inventory=10" into a dict"""
+    ttls = {}
+    for part in spec.split(","):
+        if "=" in part:
+            name, value = part.split("=", 1)
+            ttls[name.strip()] = float(value)
+    return ttls
+
+
+def _resource_words(name: str) -> Set[str]:
+    """Data words in a tool name: list_tasks -> {task}, get_sales_report -> {sale}"""
+    for prefix in READ_PREFIXES + WRITE_PREFIXES:
+        if name.startswith(prefix):
+            name = name[len(prefix):]
+            break
+    words = set()
+    for word in re.split(r"[_\-]+", name.lower()):
+        if not word or word in _NOISE_WORDS:
+            continue
+        if word.endswith("ies"):
+            word = word[:-3] + "y"
+        elif word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.add(word)
+    return words
+
+
+class _LeaderCancelled(Exception):
+    """Tells coalesced callers that the call they waited on was cancelled"""
+
+
+def _is_success(response: Dict[str, Any]) -> bool:
+    if "error" in response:
+        return False
+    result = response.get("result")
+    return not (isinstance(result, dict) and result.get("isError"))
+
+
+class ToolResultCache:
+    """
+    TTL cache of MCP tools/call responses with write-driven invalidation
+
+    Tools are classified as read or write from MCP tool annotations
+    (readOnlyHint / destructiveHint) when the server provides them, otherwise
+    from their name. Only read tools are cached. When a write tool succeeds,
+    every cached read tool that shares a data word with it is dropped
+    (add_task -> list_tasks), plus any explicit `invalidates` entries.
+    Tools that cannot be classified are never cached, and a successful call
+    to one clears the whole cache.
+    """
+
+    def __init__(
+        self,
+        catalog=None,
+        default_ttl: Optional[float] = None,
+        ttls: Optional[Dict[str, float]] = None,
+        invalidates: Optional[Dict[str, Iterable[str]]] = None,
+        max_entries: int = 512
+    ):
+        """
+        Args:
+            catalog: ToolCatalog used to read tool annotations (optional)
+            default_ttl: Seconds a read result stays fresh (0 disables caching)
+            ttls: Per-tool TTL overrides
+            invalidates: Extra write tool -> read tools dependencies
+            max_entries: Upper bound on cached responses (LRU eviction)
+        """
+        self.catalog = catalog
+        if default_ttl is None:
+            default_ttl = float(os.getenv("MCP_CACHE_TTL", 30))
+        self.default_ttl = default_ttl
+        self.ttls = _parse_ttls(os.getenv("MCP_CACHE_TTLS", ""))
+        self.ttls.update(ttls or {})
+        self.invalidates = {k: set(v) for k, v in (invalidates or {}).items()}
+        self.max_entries = max_entries
+
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._generation: Dict[str, int] = {}
+        self._kinds: Dict[str, str] = {}
+        self._kinds_version: Optional[str] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def classify(self, name: str) -> str:
+        """Return READ, WRITE or UNKNOWN for a tool"""
+        version = getattr(self.catalog, "version", None)
+        if version != self._kinds_version:
+            self._kinds = {}
+            self._kinds_version = version
+        if name not in self._kinds:
+            self._kinds[name] = self._classify(name)
+        return self._kinds[name]
+
+    def _classify(self, name: str) -> str:
+        tool = self.catalog.get(name) if self.catalog else None
+        annotations = (tool or {}).get("annotations") or {}
+        if annotations.get("readOnlyHint") is True:
+            return READ
+        if annotations.get("readOnlyHint") is False or annotations.get("destructiveHint") is True:
+            return WRITE
+        if name.startswith(READ_PREFIXES):
+            return READ
+        if name.startswith(WRITE_PREFIXES):
+            return WRITE
+        return UNKNOWN
+
+    def ttl_for(self, name: str) -> float:
+        return self.ttls.get(name, self.default_ttl)
+
+    async def call(
+        self,
+        name: str,
+        arguments: Dict[str, Any],
+        fetch: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        Return a tools/call response, from cache when possible
+
+        Args:
+            name: Tool name
+            arguments: Tool arguments (part of the cache key)
+            fetch: Performs the real MCP call and returns its response
+        """
+        kind = self.classify(name)
+        ttl = self.ttl_for(name)
+
+        if kind != READ or ttl <= 0:
+            response = await fetch()
+            if kind != READ and _is_success(response):
+                self.invalidate_for_write(name)
+            return response
+
+        key = (name, json.dumps(arguments or {}, sort_keys=True, separators=(",", ":")))
+        while True:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            # Identical reads already on their way share one MCP round-trip
+            if key not in self._inflight:
+                break
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(self._inflight[key])
+            except _LeaderCancelled:
+                # The caller doing the fetch went away; fetch again (one of
+                # the waiting callers leads the retry)
+                continue
+
+        self.misses += 1
+        generation = self._generation.get(name, 0)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            response = await fetch()
+        except asyncio.CancelledError:
+            # Followers must not inherit the leader's cancellation
+            future.set_exception(_LeaderCancelled())
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so a failure nobody else awaited is not logged
+            future.exception()
+            raise
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+        future.set_result(response)
+
+        # Skip storing if a write invalidated this tool while we were fetching
+        if _is_success(response) and self._generation.get(name, 0) == generation:
+            self._store(key, response, ttl)
+        return response
+
+    def invalidate_for_write(self, name: str):
+        """Drop cached reads that a successful call to `name` may have changed"""
+        if self.classify(name) == UNKNOWN:
+            self.invalidate()
+            return
+        words = _resource_words(name)
+        targets = {tool for tool in self._known_tools() if words & _resource_words(tool)}
+        self.invalidate(targets | self.invalidates.get(name, set()))
+
+    def invalidate(self, tools: Optional[Iterable[str]] = None):
+        """Drop cached results for the given tools (all tools if None)"""
+        tools = self._known_tools() if tools is None else set(tools)
+        keys = [key for key in self._entries if key[0] in tools]
+        for key in keys:
+            del self._entries[key]
+        # Reads still in flight must neither be stored nor shared with new callers
+        for key in [key for key in self._inflight if key[0] in tools]:
+            del self._inflight[key]
+        for tool in tools:
+            self._generation[tool] = self._generation.get(tool, 0) + 1
+        if keys:
+            self.invalidations += len(keys)
+            logger.debug(f"Invalidated {len(keys)} cached tool results")
+
+    def _known_tools(self) -> Set[str]:
+        return {key[0] for key in self._entries} | {key[0] for key in self._inflight}
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for /health"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+            "default_ttl": self.default_ttl
+        }
+
+    def _store(self, key: Tuple[str, str], response: Dict[str, Any], ttl: float):
+        self._entries[key] = (time.monotonic() + ttl, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
@@ -0,0 +1,232 @@
+"""
+Streaming HTTP responses for large MCP tool results
+Encodes the response body incrementally on a worker thread. Encoded bytes
+wait in memory up to a limit and spill to a temporary file beyond it, so
+the decoded result can be released as soon as it is encoded, however slowly
+the client reads.
+"""
+import asyncio
+import logging
+import os
+import tempfile
+import threading
+from collections import deque
+from typing import Any, Dict, Iterator, Optional
+
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+
+from agent_s.mcp.codec import JSONCodec, get_codec
+
+logger = logging.getLogger("agent_s.mcp.streaming")
+
+CHUNK_BYTES = int(os.getenv("MCP_STREAM_CHUNK_BYTES", 64 * 1024))
+MAX_MEMORY_BYTES = int(os.getenv("MCP_STREAM_MAX_MEMORY_BYTES", 8 * 1024 * 1024))
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+class StreamCancelled(Exception):
+    """The client went away; stop encoding"""
+
+
+def list_items(result: Any) -> Optional[list]:
+    """The list inside a list-shaped result (a list, or MCP {"content": [...]})"""
+    if isinstance(result, list):
+        return result
+    if isinstance(result, dict) and isinstance(result.get("content"), list):
+        return result["content"]
+    return None
+
+
+def wants_ndjson(request: Request) -> bool:
+    """NDJSON via ?format=ndjson or an Accept header"""
+    return (
+        request.query_params.get("format") == "ndjson"
+        or NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+    )
+
+
+def iter_json(envelope: Dict[str, Any], result: Any, codec: JSONCodec, chunk_size: int) -> Iterator[bytes]:
+    """
+    Encode {**envelope, "result": result} as chunks of about chunk_size bytes
+
+    Lists (top level or one level down, e.g. MCP "content") are encoded item
+    by item so no single encode call sees the whole result.
+    """
+    pending = bytearray()
+    head = codec.encode(envelope)[:-1]
+    pending += head + (b',"result":' if len(head) > 1 else b'"result":')
+    for piece in _iter_value(result, codec, depth=2):
+        pending += piece
+        if len(pending) >= chunk_size:
+            yield bytes(pending)
+            pending.clear()
+    pending += b"}"
+    yield bytes(pending)
+
+
+def iter_ndjson(result: Any, codec: JSONCodec, chunk_size: int) -> Iterator[bytes]:
+    """One line per item of a list-shaped result (one line total otherwise)"""
+    items = list_items(result)
+    pending = bytearray()
+    for item in (items if items is not None else [result]):
+        pending += codec.encode(item) + b"\n"
+        if len(pending) >= chunk_size:
+            yield bytes(pending)
+            pending.clear()
+    if pending:
+        yield bytes(pending)
+
+
+def _iter_value(value: Any, codec: JSONCodec, depth: int) -> Iterator[bytes]:
+    if depth and isinstance(value, list):
+        yield b"["
+        for i, item in enumerate(value):
+            yield (b"," if i else b"") + codec.encode(item)
+        yield b"]"
+    elif depth and isinstance(value, dict) and any(isinstance(v, list) for v in value.values()):
+        yield b"{"
+        for i, (key, item) in enumerate(value.items()):
+            yield (b"," if i else b"") + codec.encode(str(key)) + b":"
+            yield from _iter_value(item, codec, depth - 1)
+        yield b"}"
+    else:
+        yield codec.encode(value)
+
+
+class SpillBuffer:
+    """
+    Single-producer, single-consumer byte queue with a memory cap
+
+    Chunks are kept in memory until max_memory bytes are waiting; from then
+    on they are appended to a temporary file and read back in order.
+    """
+
+    def __init__(self, max_memory: int = MAX_MEMORY_BYTES):
+        self.max_memory = max_memory
+        self.spilled_bytes = 0
+        self._chunks: deque = deque()
+        self._memory = 0
+        self._file = None
+        self._write_pos = 0
+        self._read_pos = 0
+        self._closed = False
+        self._cancelled = False
+        self._error: Optional[BaseException] = None
+        self._cond = threading.Condition()
+
+    def write(self, chunk: bytes):
+        with self._cond:
+            if self._cancelled:
+                raise StreamCancelled()
+            if self._file is None and self._memory + len(chunk) <= self.max_memory:
+                self._chunks.append(chunk)
+                self._memory += len(chunk)
+            else:
+                if self._file is None:
+                    self._file = tempfile.TemporaryFile(prefix="mcp-result-")
+                    logger.info(f"Tool result exceeds {self.max_memory} bytes in memory, spilling to disk")
+                self._file.seek(self._write_pos)
+                self._file.write(chunk)
+                self._write_pos += len(chunk)
+                self.spilled_bytes += len(chunk)
+            self._cond.notify()
+
+    def close(self, error: Optional[BaseException] = None):
+        """Producer is done (error is re-raised to the reader)"""
+        with self._cond:
+            self._closed = True
+            self._error = error
+            self._cond.notify()
+
+    def cancel(self):
+        """Consumer is gone; release the temporary file"""
+        with self._cond:
+            self._cancelled = True
+            self._chunks.clear()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def read(self, size: int) -> bytes:
+        """Block until bytes are available; b"" at the end"""
+        with self._cond:
+            while True:
+                if self._chunks:
+                    chunk = self._chunks.popleft()
+                    self._memory -= len(chunk)
+                    return chunk
+                if self._file is not None and self._read_pos < self._write_pos:
+                    self._file.seek(self._read_pos)
+                    chunk = self._file.read(min(size, self._write_pos - self._read_pos))
+                    self._read_pos += len(chunk)
+                    return chunk
+                if self._closed:
+                    if self._error is not None:
+                        raise self._error
+                    return b""
+                self._cond.wait()
+
+    def __iter__(self) -> Iterator[bytes]:
+        try:
+            while True:
+                chunk = self.read(CHUNK_BYTES)
+                if not chunk:
+                    return
+                yield chunk
+        finally:
+            self.cancel()
+
+
+def _produce(chunks: Iterator[bytes], buffer: SpillBuffer):
+    try:
+        for chunk in chunks:
+            buffer.write(chunk)
+    except StreamCancelled:
+        return
+    except Exception as e:
+        logger.error(f"Encoding tool result failed: {e}")
+        buffer.close(e)
+        return
+    buffer.close()
+
+
+async def result_response(
+    envelope: Dict[str, Any],
+    result: Any,
+    ndjson: bool = False,
+    codec: Optional[JSONCodec] = None,
+    chunk_size: int = CHUNK_BYTES,
+    max_memory: int = MAX_MEMORY_BYTES
+) -> Response:
+    """
+    Build the HTTP response for a tool result
+
+    Results that fit in one chunk are sent as a plain response. Larger ones
+    are streamed while a worker thread keeps encoding ahead of the client.
+
+    Args:
+        envelope: Fields sent alongside "result" (e.g. {"success": True})
+        result: The MCP tool result
+        ndjson: One JSON line per item of a list-shaped result instead
+        codec: JSON codec (default: get_codec())
+        chunk_size: Target size of each streamed chunk
+        max_memory: Encoded bytes held in memory before spilling to disk
+    """
+    codec = codec or get_codec()
+    if ndjson:
+        chunks, media_type = iter_ndjson(result, codec, chunk_size), NDJSON_MEDIA_TYPE
+    else:
+        chunks, media_type = iter_json(envelope, result, codec, chunk_size), "application/json"
+
+    loop = asyncio.get_running_loop()
+    first = await loop.run_in_executor(None, next, chunks, b"")
+    second = await loop.run_in_executor(None, next, chunks, None) if len(first) >= chunk_size else None
+    if second is None:
+        return Response(content=first, media_type=media_type)
+
+    buffer = SpillBuffer(max_memory)
+    buffer.write(first)
+    buffer.write(second)
+    loop.run_in_executor(None, _produce, chunks, buffer)
+    return StreamingResponse(iter(buffer), media_type=media_type)
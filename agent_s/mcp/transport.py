@@ -0,0 +1,526 @@
+"""
+MCP stdio transport - shared by the HTTP bridges
+Runs an MCP server as a child process and multiplexes JSON-RPC requests
+over its stdin/stdout, matching responses to callers by request id
+"""
+import asyncio
+import concurrent.futures
+import itertools
+import logging
+import os
+import shlex
+import subprocess
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from agent_s.mcp.codec import JSONCodec, get_codec
+from agent_s.mcp.flow import FairLimiter, QueueFullError, current_caller
+
+logger = logging.getLogger("agent_s.mcp.transport")
+
+PROTOCOL_VERSION = "2024-11-05"
+
+# Pipe buffer size; large tool results arrive in few reads
+DEFAULT_BUFFER_SIZE = int(os.getenv("MCP_PIPE_BUFFER_BYTES", 1 << 20))
+
+# Requests in flight on one child, and requests allowed to wait for a slot
+DEFAULT_MAX_IN_FLIGHT = int(os.getenv("MCP_MAX_IN_FLIGHT", 16))
+DEFAULT_MAX_QUEUE = int(os.getenv("MCP_MAX_QUEUE", 256))
+
+
+class MCPTransportError(Exception):
+    """Raised when the MCP child is unavailable or the pipe breaks"""
+
+
+class MCPTimeoutError(MCPTransportError):
+    """Raised when the MCP child does not answer within the timeout"""
+
+
+class MCPOverloadedError(MCPTransportError):
+    """Raised when the request queue is full; retry_after is a hint in seconds"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CallTiming:
+    """
+    Where the time of one request went
+
+    Timestamps are time.perf_counter() values; started_ns is wall-clock
+    nanoseconds for exporting spans.
+    """
+
+    __slots__ = (
+        "method", "params", "outcome", "started_ns", "started", "write_start",
+        "write_end", "received", "decoded", "request_bytes", "response_bytes"
+    )
+
+    def __init__(self, method: str, params: Optional[Dict], started: Optional[float] = None):
+        self.method = method
+        self.params = params
+        self.outcome = "pending"
+        now = time.perf_counter()
+        self.started = started if started is not None else now
+        self.started_ns = time.time_ns() - int((now - self.started) * 1e9)
+        self.write_start = self.write_end = self.received = self.decoded = None
+        self.request_bytes = self.response_bytes = 0
+
+    @property
+    def name(self) -> str:
+        """Tool name for tools/call, otherwise the method"""
+        if self.method == "tools/call" and self.params:
+            return self.params.get("name", self.method)
+        return self.method
+
+    def phases(self) -> Dict[str, float]:
+        """Seconds spent queued, writing, waiting on the server and decoding"""
+        phases = {}
+        if self.write_start is not None:
+            phases["queue"] = self.write_start - self.started
+            phases["write"] = self.write_end - self.write_start
+        if self.received is not None:
+            phases["server"] = self.received - self.write_end
+            phases["decode"] = self.decoded - self.received
+        return phases
+
+    @property
+    def total(self) -> float:
+        end = self.decoded if self.decoded is not None else time.perf_counter()
+        return end - self.started
+
+
+class MCPTransport:
+    """
+    What the bridges need from an MCP connection, whatever carries it
+
+    Subclasses implement start/stop/is_running, notify and _roundtrip (one
+    request in, its JSON-RPC response out). The base class handles
+    admission: at most max_in_flight requests are outstanding at once.
+    Further requests wait in per-caller queues served round-robin (the
+    caller defaults to flow.current_caller), and fail with
+    MCPOverloadedError once max_queue are waiting. Time spent waiting
+    counts toward the request timeout and is reported as the "queue" phase.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 10.0,
+        codec: Optional[JSONCodec] = None,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        max_queue: int = DEFAULT_MAX_QUEUE
+    ):
+        """
+        Args:
+            timeout: Default seconds to wait for a response
+            codec: JSON codec (default: get_codec(), orjson/msgspec if installed)
+            max_in_flight: Outstanding requests allowed (0 for no limit)
+            max_queue: Requests allowed to wait for a slot
+        """
+        self.timeout = timeout
+        self.codec = codec or get_codec()
+        self.limiter = FairLimiter(max_in_flight, max_queue)
+
+        self._ids = itertools.count(1)
+        self._notification_handlers: List[Callable[[Dict[str, Any]], None]] = []
+        self._call_observers: List[Callable[[CallTiming], None]] = []
+
+    def start(self):
+        raise NotImplementedError
+
+    def stop(self):
+        raise NotImplementedError
+
+    async def aclose(self):
+        """Stop from async code (lets subclasses end remote sessions cleanly)"""
+        self.stop()
+
+    def is_running(self) -> bool:
+        raise NotImplementedError
+
+    def notify(self, method: str, params: Optional[Dict] = None):
+        raise NotImplementedError
+
+    def add_notification_handler(self, handler: Callable[[Dict[str, Any]], None]):
+        """
+        Register a callback for server-initiated notifications
+
+        Handlers may run on a transport thread and must not block.
+        """
+        self._notification_handlers.append(handler)
+
+    def remove_notification_handler(self, handler: Callable[[Dict[str, Any]], None]):
+        """Unregister a callback added with add_notification_handler"""
+        try:
+            self._notification_handlers.remove(handler)
+        except ValueError:
+            pass
+
+    def add_call_observer(self, observer: Callable[[CallTiming], None]):
+        """
+        Register a callback that receives the CallTiming of every finished request
+
+        Observers may run on a transport thread (or the caller's thread on
+        timeout) and must not block.
+        """
+        self._call_observers.append(observer)
+
+    def flow_stats(self) -> Dict[str, Any]:
+        """In-flight and queued request counts"""
+        return self.limiter.stats()
+
+    async def request(
+        self,
+        method: str,
+        params: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+        caller: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Send a request and await its response without blocking the event loop"""
+        timeout = timeout or self.timeout
+        started = time.perf_counter()
+        waiter = self._admit(method, caller)
+        granted = None
+        try:
+            if waiter is not None:
+                try:
+                    await asyncio.wait_for(asyncio.wrap_future(waiter), timeout=timeout)
+                except asyncio.TimeoutError:
+                    raise MCPTimeoutError(f"MCP request timeout while queued: {method}")
+            granted = time.perf_counter()
+            return await self._roundtrip(method, params, started, max(0.0, started + timeout - granted))
+        finally:
+            self.limiter.finish(waiter, granted)
+
+    async def initialize(self, client_name: str, client_version: str) -> Dict[str, Any]:
+        """Perform the MCP initialize handshake"""
+        response = await self.request("initialize", {
+            "protocolVersion": PROTOCOL_VERSION,
+            "capabilities": {},
+            "clientInfo": {"name": client_name, "version": client_version}
+        })
+        self.notify("notifications/initialized")
+        return response
+
+    async def list_tools(self) -> List[Dict[str, Any]]:
+        """
+        Fetch the server's tool list
+
+        Raises:
+            MCPTransportError: The server answered with an error (an empty
+                list here would wipe the catalog)
+        """
+        response = await self.request("tools/list", {})
+        if "error" in response or not isinstance(response.get("result"), dict):
+            error = response.get("error") or {}
+            raise MCPTransportError(f"tools/list failed: {error.get('message', 'no result')}")
+        return response["result"].get("tools", [])
+
+    async def _roundtrip(self, method: str, params: Optional[Dict], started: float, timeout: float) -> Dict[str, Any]:
+        """Send one admitted request; started is when it was first queued"""
+        raise NotImplementedError
+
+    def _admit(self, method: str, caller: Optional[str]) -> Optional[concurrent.futures.Future]:
+        if not self.is_running():
+            raise MCPTransportError("MCP server not running")
+        try:
+            return self.limiter.acquire(caller if caller is not None else current_caller.get())
+        except QueueFullError as e:
+            logger.warning(f"MCP request queue full, rejecting {method}")
+            raise MCPOverloadedError(str(e), e.retry_after)
+
+    def _complete(self, timing: CallTiming, message: Dict[str, Any], received: float, size: int):
+        """Fill in the response side of a timing"""
+        timing.received = received
+        timing.decoded = time.perf_counter()
+        timing.response_bytes = size
+        result = message.get("result")
+        failed = "error" in message or (isinstance(result, dict) and result.get("isError"))
+        timing.outcome = "error" if failed else "ok"
+
+    def _handle_notification(self, message: Dict[str, Any]):
+        for handler in list(self._notification_handlers):
+            try:
+                handler(message)
+            except Exception as e:
+                logger.error(f"MCP notification handler failed: {e}")
+
+    def _observe(self, timing: CallTiming):
+        for observer in list(self._call_observers):
+            try:
+                observer(timing)
+            except Exception as e:
+                logger.error(f"MCP call observer failed: {e}")
+
+
+class MCPStdioTransport(MCPTransport):
+    """
+    Concurrent JSON-RPC transport to a stdio MCP server
+
+    A single reader thread owns the child's stdout. Every request registers a
+    future under its own id before it is written, and the reader resolves the
+    future whose id matches the incoming response, so concurrent callers never
+    see each other's replies. Messages without an id (server notifications)
+    are handed to the registered notification handlers.
+
+    The pipes are binary. The reader splits stdout into lines inside one
+    growing buffer and decodes each line from a memoryview slice, so a
+    multi-megabyte result is not copied into a str first.
+    """
+
+    def __init__(
+        self,
+        command: List[str],
+        timeout: float = 10.0,
+        codec: Optional[JSONCodec] = None,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        max_queue: int = DEFAULT_MAX_QUEUE
+    ):
+        """
+        Args:
+            command: Command line used to spawn the MCP server
+            timeout: Default seconds to wait for a response
+            codec: JSON codec (default: get_codec(), orjson/msgspec if installed)
+            buffer_size: Pipe buffer and read chunk size in bytes
+            max_in_flight: Outstanding requests allowed (0 for no limit)
+            max_queue: Requests allowed to wait for a slot
+        """
+        super().__init__(timeout, codec, max_in_flight, max_queue)
+        self.command = command
+        self.buffer_size = buffer_size
+        self.process: Optional[subprocess.Popen] = None
+
+        self._pending: Dict[Any, concurrent.futures.Future] = {}
+        self._timings: Dict[Any, CallTiming] = {}
+        self._pending_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._reader_thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Spawn the MCP server and start the response reader"""
+        logger.info(f"Starting MCP server: {' '.join(self.command)} (codec: {self.codec.name})")
+        self.process = subprocess.Popen(
+            self.command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=None,  # Inherit so server logs land in the bridge log
+            bufsize=self.buffer_size
+        )
+        self._reader_thread = threading.Thread(
+            target=self._read_loop,
+            name="mcp-stdio-reader",
+            daemon=True
+        )
+        self._reader_thread.start()
+
+    def stop(self):
+        """Terminate the MCP server and fail any outstanding requests"""
+        if self.process:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+            logger.info("MCP server stopped")
+        self._fail_pending(MCPTransportError("MCP server stopped"))
+
+    def is_running(self) -> bool:
+        """Whether the MCP child process is alive"""
+        return self.process is not None and self.process.poll() is None
+
+    def send(self, method: str, params: Optional[Dict] = None) -> concurrent.futures.Future:
+        """
+        Write a request and return a future for its response
+
+        Args:
+            method: JSON-RPC method name
+            params: Method parameters
+
+        Returns:
+            Future resolved with the full JSON-RPC response dict
+        """
+        return self._send(method, params)[1]
+
+    def _send(self, method: str, params: Optional[Dict] = None, started: Optional[float] = None):
+        if not self.is_running():
+            raise MCPTransportError("MCP server not running")
+
+        current_id = next(self._ids)
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        timing = CallTiming(method, params, started)
+        with self._pending_lock:
+            self._pending[current_id] = future
+            self._timings[current_id] = timing
+
+        request = {
+            "jsonrpc": "2.0",
+            "id": current_id,
+            "method": method,
+            "params": params or {}
+        }
+        try:
+            self._write(request, timing)
+        except Exception:
+            with self._pending_lock:
+                self._pending.pop(current_id, None)
+                self._timings.pop(current_id, None)
+            raise
+        return current_id, future
+
+    def notify(self, method: str, params: Optional[Dict] = None):
+        """Send a JSON-RPC notification (no response expected)"""
+        if not self.is_running():
+            raise MCPTransportError("MCP server not running")
+        self._write({"jsonrpc": "2.0", "method": method, "params": params or {}})
+
+    def request_sync(
+        self,
+        method: str,
+        params: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+        caller: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Send a request and block the calling thread until it is answered"""
+        timeout = timeout or self.timeout
+        started = time.perf_counter()
+        waiter = self._admit(method, caller)
+        granted = None
+        try:
+            if waiter is not None:
+                try:
+                    waiter.result(timeout=timeout)
+                except concurrent.futures.TimeoutError:
+                    raise MCPTimeoutError(f"MCP request timeout while queued: {method}")
+            granted = time.perf_counter()
+            current_id, future = self._send(method, params, started)
+            try:
+                return future.result(timeout=max(0.0, started + timeout - granted))
+            except concurrent.futures.TimeoutError:
+                self._forget(current_id, timed_out=True)
+                raise MCPTimeoutError(f"MCP request timeout: {method}")
+        finally:
+            self.limiter.finish(waiter, granted)
+
+    async def _roundtrip(self, method: str, params: Optional[Dict], started: float, timeout: float) -> Dict[str, Any]:
+        current_id, future = self._send(method, params, started)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout)
+        except asyncio.TimeoutError:
+            self._forget(current_id, timed_out=True)
+            raise MCPTimeoutError(f"MCP request timeout: {method}")
+
+    def _write(self, message: Dict[str, Any], timing: Optional[CallTiming] = None):
+        data = self.codec.encode(message) + b"\n"
+        try:
+            with self._write_lock:
+                if timing:
+                    timing.request_bytes = len(data)
+                    timing.write_start = time.perf_counter()
+                self.process.stdin.write(data)
+                self.process.stdin.flush()
+                if timing:
+                    timing.write_end = time.perf_counter()
+        except (BrokenPipeError, OSError, ValueError) as e:
+            raise MCPTransportError(f"Failed to write to MCP server: {e}")
+
+    def _read_loop(self):
+        """Reader thread: route every stdout line to its waiting future"""
+        stdout = self.process.stdout
+        buffer = bytearray()
+        scanned = 0  # Bytes of the buffer already known to hold no newline
+        try:
+            while True:
+                chunk = stdout.read1(self.buffer_size)
+                if not chunk:
+                    break
+                received = time.perf_counter()
+                buffer += chunk
+                start = 0
+                end = buffer.find(b"\n", scanned)
+                with memoryview(buffer) as view:
+                    while end != -1:
+                        self._handle_line(view, start, end, received)
+                        start = end + 1
+                        end = buffer.find(b"\n", start)
+                del buffer[:start]
+                scanned = len(buffer)
+        except Exception as e:
+            logger.error(f"Error reading MCP response: {e}")
+        finally:
+            self._fail_pending(MCPTransportError("MCP server closed its output"))
+
+    def _handle_line(self, view: memoryview, start: int, end: int, received: float):
+        with view[start:end] as line:
+            if end - start < 4 and not line.tobytes().strip():
+                return
+            try:
+                message = self.codec.decode(line)
+            except ValueError:
+                preview = line[:200].tobytes().decode("utf-8", errors="replace")
+                logger.warning(f"Ignoring non-JSON line from MCP server: {preview}")
+                return
+        if isinstance(message, dict):
+            self._dispatch(message, received, end - start)
+
+    def _dispatch(self, message: Dict[str, Any], received: Optional[float] = None, size: int = 0):
+        if "id" in message and ("result" in message or "error" in message):
+            with self._pending_lock:
+                future = self._pending.pop(message["id"], None)
+                timing = self._timings.pop(message["id"], None)
+            if future is None:
+                logger.warning(f"Dropping MCP response with unknown id: {message.get('id')}")
+                return
+            if timing and received is not None:
+                self._complete(timing, message, received, size)
+            if timing:
+                # Before resolving, so the caller sees its own call recorded
+                self._observe(timing)
+            if not future.done():
+                future.set_result(message)
+            return
+
+        if "method" in message:
+            self._handle_notification(message)
+
+    def _forget(self, request_id: int, timed_out: bool = False):
+        with self._pending_lock:
+            self._pending.pop(request_id, None)
+            timing = self._timings.pop(request_id, None)
+        if timing and timed_out:
+            timing.outcome = "timeout"
+            self._observe(timing)
+
+    def _fail_pending(self, error: Exception):
+        with self._pending_lock:
+            pending = list(self._pending.values())
+            self._pending.clear()
+            self._timings.clear()
+        for future in pending:
+            if not future.done():
+                future.set_exception(error)
+
+
+def create_transport(command: Optional[List[str]] = None, url: Optional[str] = None, **kwargs) -> MCPTransport:
+    """
+    Transport for the configured MCP server
+
+    Args:
+        command: Command line for a local stdio server (MCP_SERVER_COMMAND
+            overrides it)
+        url: Streamable HTTP endpoint (default: MCP_SERVER_URL); takes
+            precedence over command
+        **kwargs: Passed to the transport constructor
+    """
+    url = url or os.getenv("MCP_SERVER_URL")
+    if url:
+        from agent_s.mcp.http_transport import MCPHTTPTransport
+        return MCPHTTPTransport(url, **kwargs)
+    if os.getenv("MCP_SERVER_COMMAND"):
+        command = shlex.split(os.environ["MCP_SERVER_COMMAND"])
+    if not command:
+        raise ValueError("No MCP server command or URL configured")
+    return MCPStdioTransport(command, **kwargs)
@@ -0,0 +1,217 @@
+"""
+LLM action planner for Agent-S
+Turns a request plus the vision analysis of the screen into a validated
+list of mouse, keyboard, wait and MCP tool actions
+"""
+import asyncio
+import copy
+import json
+import logging
+import os
+import re
+from typing import Any, Dict, List, Optional
+
+import ollama
+
+from agent_s.planning.schema import MAX_ACTIONS, PLAN_SCHEMA, PlanError, validate_plan
+from agent_s.vision.frame import Frame
+from agent_s.vision.screen_cache import ScreenCache
+
+logger = logging.getLogger("agent_s.planning")
+
+DEFAULT_TIMEOUT = float(os.getenv("PLANNER_TIMEOUT", 60))
+# Chat history turns included in the planning prompt
+HISTORY_TURNS = 6
+
+# Requests that only ask what is on the screen need no plan (and no LLM call)
+_OBSERVE_ONLY = re.compile(
+    r"^(?!.*\b(click|type|press|open|close|scroll|drag|select|enter|write|run|launch|save)\b)"
+    r"\s*(take a screenshot|screenshot|what'?s on|what is on|describe|look at|show me)\b",
+    re.IGNORECASE
+)
+
+SYSTEM_PROMPT = f"""You plan computer-use actions for a desktop automation agent.
+Answer with one JSON object {{"actions": [...]}} and nothing else. Use at most {MAX_ACTIONS} actions,
+in the order they must run, and an empty list if the request needs no action.
+
+Action types:
+- mouse: {{"type": "mouse", "params": {{"action": "click"|"double_click"|"right_click"|"move"|"drag"|"scroll",
+  "x": int, "y": int, "button": "left"|"right"|"middle", "clicks": int}}, "description": str}}
+  x and y are screen pixels; scroll needs clicks (positive = up).
+- keyboard: {{"type": "keyboard", "params": {{"action": "type"|"press"|"hotkey", "text": str, "key": str,
+  "keys": [str]}}, "description": str}}  type needs text, press needs key, hotkey needs keys.
+- wait: {{"type": "wait", "params": {{"duration": seconds}}, "description": str}}
+- mcp_tool: {{"type": "mcp_tool", "tool": str, "params": {{...}}, "description": str}}
+
+A mouse or keyboard action may add "expect": {{"region": [x, y, width, height]}}, the screen area
+where its effect will appear (a menu that opens, a field that fills), so the agent moves on as soon
+as it changes.
+
+Only act on elements the screen analysis mentions; estimate coordinates from their positions.
+Each description is a short, human-readable summary of the step."""
+
+
+def _decode(content: str) -> Any:
+    """JSON from a model answer, tolerating a fenced code block around it"""
+    content = content.strip()
+    fenced = re.match(r"^```(?:json)?\s*(.*?)\s*```$", content, re.DOTALL)
+    return json.loads(fenced.group(1) if fenced else content)
+
+
+class ActionPlanner:
+    """
+    Plan actions with the reasoning model
+
+    The model is asked for JSON constrained to PLAN_SCHEMA; its answer is
+    validated against the per-action schemas (and the screen bounds), and
+    an invalid plan is sent back once with the errors before giving up.
+    Valid plans are cached by (normalized prompt, screen hash), so a
+    repeated workflow on the same screen skips the LLM.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        model: Optional[str] = None,
+        cache: Optional[ScreenCache] = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        retries: int = 1
+    ):
+        """
+        Args:
+            client: Object with an async chat(model, messages, format, options)
+                (default: ollama.AsyncClient on OLLAMA_REASONING_HOST)
+            model: Reasoning model (default: REASONING_MODEL)
+            cache: Plan cache (default: exact screen-hash matches, PLAN_CACHE_TTL)
+            timeout: Seconds per LLM call (PLANNER_TIMEOUT)
+            retries: Extra attempts after an invalid plan
+        """
+        if client is None:
+            host = os.getenv("OLLAMA_REASONING_HOST", os.getenv("OLLAMA_VISION_HOST", "http://localhost:11434"))
+            client = ollama.AsyncClient(host=host)
+        if cache is None:
+            cache = ScreenCache(ttl=float(os.getenv("PLAN_CACHE_TTL", 600)), max_distance=0)
+        self.client = client
+        self.model = model or os.getenv("REASONING_MODEL", "mistral")
+        self.cache = cache
+        self.timeout = timeout
+        self.retries = retries
+
+        self.llm_calls = 0
+        self.invalid_plans = 0
+
+        logger.info(f"ActionPlanner initialized with {self.model}")
+
+    async def plan(
+        self,
+        prompt: str,
+        vision_analysis: str,
+        messages: Optional[List[Dict[str, Any]]] = None,
+        frame: Optional[Frame] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Plan the actions for a request
+
+        Args:
+            prompt: The user's request
+            vision_analysis: What the vision model saw on the screen
+            messages: Chat history for context
+            frame: The analysed capture (screen size and plan cache key)
+
+        Returns:
+            Validated actions, possibly empty
+
+        Raises:
+            PlanError: The model did not produce a valid plan
+            asyncio.TimeoutError: The model did not answer in time
+        """
+        if self.observe_only(prompt):
+            return []
+
+        fingerprint = None
+        if frame is not None and self.cache.enabled:
+            fingerprint = await asyncio.to_thread(self.cache.fingerprint, frame.image)
+            cached = self.cache.get(fingerprint, prompt)
+            if cached is not None:
+                logger.info("Using cached action plan")
+                return copy.deepcopy(cached)
+
+        screen_size = frame.size if frame is not None else None
+        chat = [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": self._request(prompt, vision_analysis, messages, screen_size)},
+        ]
+
+        for attempt in range(self.retries + 1):
+            content = await self._complete(chat)
+            try:
+                actions = validate_plan(_decode(content), screen_size)
+            except ValueError as e:
+                # PlanError lists schema problems; anything else is bad JSON
+                errors = getattr(e, "errors", None) or [f"Not valid JSON: {e}"]
+                self.invalid_plans += 1
+                logger.warning(f"Invalid plan (attempt {attempt + 1}): {errors[0]}")
+                if attempt == self.retries:
+                    raise PlanError(f"No valid plan after {attempt + 1} attempts: {errors[0]}", errors)
+                chat += [
+                    {"role": "assistant", "content": content},
+                    {"role": "user", "content": "That plan is invalid:\n- " + "\n- ".join(errors[:10])
+                        + "\nReply with the corrected JSON plan only."},
+                ]
+                continue
+
+            logger.info(f"Planned {len(actions)} actions")
+            if fingerprint is not None:
+                self.cache.put(fingerprint, prompt, copy.deepcopy(actions))
+            return actions
+
+    def observe_only(self, prompt: str) -> bool:
+        """Whether a request only asks about the screen (no plan, no input)"""
+        return bool(_OBSERVE_ONLY.match(prompt))
+
+    async def _complete(self, chat: List[Dict[str, str]]) -> str:
+        self.llm_calls += 1
+        response = await asyncio.wait_for(
+            self.client.chat(
+                model=self.model,
+                messages=chat,
+                format=PLAN_SCHEMA,
+                options={"temperature": 0}
+            ),
+            self.timeout
+        )
+        return response["message"]["content"]
+
+    def _request(
+        self,
+        prompt: str,
+        vision_analysis: str,
+        messages: Optional[List[Dict[str, Any]]],
+        screen_size
+    ) -> str:
+        parts = []
+        if screen_size:
+            parts.append(f"Screen size: {screen_size[0]}x{screen_size[1]} pixels")
+        parts.append(f"Screen analysis:\n{vision_analysis}")
+        history = [m for m in (messages or []) if isinstance(m, dict) and m.get("content")][-HISTORY_TURNS:]
+        if history:
+            parts.append("Conversation so far:\n" + "\n".join(
+                f"{m.get('role', 'user')}: {str(m['content'])[:500]}" for m in history
+            ))
+        parts.append(f"Request: {prompt}")
+        return "\n\n".join(parts)
+
+    async def aclose(self):
+        """Close the LLM client's connection, if it holds one"""
+        close = getattr(self.client, "close", None)
+        if close is not None:
+            await close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for /health"""
+        return {
+            "model": self.model,
+            "llm_calls": self.llm_calls,
+            "invalid_plans": self.invalid_plans,
+            "cache": self.cache.stats()
+        }
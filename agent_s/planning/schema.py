@@ -0,0 +1,204 @@
+"""
+Action plan schema
+The JSON shapes MouseAction, KeyboardAction, the wait step and MCP tool
+calls accept, and validation of model-written plans against them
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+from jsonschema import Draft7Validator
+
+MAX_ACTIONS = 20
+
+_DESCRIPTION = {"type": "string", "minLength": 1, "maxLength": 200}
+_COORDINATE = {"type": "integer", "minimum": 0}
+# Where the action's effect should show up; the engine stops waiting once it does
+_EXPECT = {
+    "type": "object",
+    "required": ["region"],
+    "additionalProperties": False,
+    "properties": {
+        "region": {"type": "array", "items": _COORDINATE, "minItems": 4, "maxItems": 4}
+    }
+}
+
+MOUSE_ACTION = {
+    "type": "object",
+    "required": ["type", "params", "description"],
+    "additionalProperties": False,
+    "properties": {
+        "type": {"const": "mouse"},
+        "description": _DESCRIPTION,
+        "expect": _EXPECT,
+        "params": {
+            "type": "object",
+            "required": ["action"],
+            "additionalProperties": False,
+            "properties": {
+                "action": {"enum": ["click", "double_click", "right_click", "move", "drag", "scroll"]},
+                "x": _COORDINATE,
+                "y": _COORDINATE,
+                "button": {"enum": ["left", "right", "middle"]},
+                "duration": {"type": "number", "minimum": 0, "maximum": 5},
+                "clicks": {"type": "integer", "minimum": -50, "maximum": 50}
+            },
+            "allOf": [
+                {
+                    "if": {"properties": {"action": {"enum": ["move", "drag"]}}},
+                    "then": {"required": ["x", "y"]}
+                },
+                {
+                    "if": {"properties": {"action": {"const": "scroll"}}},
+                    "then": {"required": ["clicks"]}
+                }
+            ]
+        }
+    }
+}
+
+KEYBOARD_ACTION = {
+    "type": "object",
+    "required": ["type", "params", "description"],
+    "additionalProperties": False,
+    "properties": {
+        "type": {"const": "keyboard"},
+        "description": _DESCRIPTION,
+        "expect": _EXPECT,
+        "params": {
+            "type": "object",
+            "required": ["action"],
+            "additionalProperties": False,
+            "properties": {
+                "action": {"enum": ["type", "write", "press", "hotkey"]},
+                "text": {"type": "string", "minLength": 1},
+                "key": {"type": "string", "minLength": 1},
+                "keys": {
+                    "oneOf": [
+                        {"type": "array", "items": {"type": "string", "minLength": 1}, "minItems": 1},
+                        {"type": "string", "minLength": 1}
+                    ]
+                },
+                "interval": {"type": "number", "minimum": 0, "maximum": 1},
+                "presses": {"type": "integer", "minimum": 1, "maximum": 50}
+            },
+            "allOf": [
+                {
+                    "if": {"properties": {"action": {"enum": ["type", "write"]}}},
+                    "then": {"required": ["text"]}
+                },
+                {
+                    "if": {"properties": {"action": {"const": "press"}}},
+                    "then": {"required": ["key"]}
+                },
+                {
+                    "if": {"properties": {"action": {"const": "hotkey"}}},
+                    "then": {"required": ["keys"]}
+                }
+            ]
+        }
+    }
+}
+
+WAIT_ACTION = {
+    "type": "object",
+    "required": ["type", "params", "description"],
+    "additionalProperties": False,
+    "properties": {
+        "type": {"const": "wait"},
+        "description": _DESCRIPTION,
+        "params": {
+            "type": "object",
+            "required": ["duration"],
+            "additionalProperties": False,
+            "properties": {"duration": {"type": "number", "minimum": 0, "maximum": 30}}
+        }
+    }
+}
+
+MCP_TOOL_ACTION = {
+    "type": "object",
+    "required": ["type", "tool", "params", "description"],
+    "additionalProperties": False,
+    "properties": {
+        "type": {"const": "mcp_tool"},
+        "description": _DESCRIPTION,
+        "tool": {"type": "string", "pattern": "^[A-Za-z0-9_.-]+$"},
+        "params": {"type": "object"}
+    }
+}
+
+ACTION_SCHEMAS = {
+    "mouse": MOUSE_ACTION,
+    "keyboard": KEYBOARD_ACTION,
+    "wait": WAIT_ACTION,
+    "mcp_tool": MCP_TOOL_ACTION,
+}
+
+PLAN_SCHEMA = {
+    "type": "object",
+    "required": ["actions"],
+    "properties": {
+        "actions": {
+            "type": "array",
+            "maxItems": MAX_ACTIONS,
+            "items": {"oneOf": list(ACTION_SCHEMAS.values())}
+        }
+    }
+}
+
+_PLAN_VALIDATOR = Draft7Validator(PLAN_SCHEMA)
+_ACTION_VALIDATORS = {name: Draft7Validator(schema) for name, schema in ACTION_SCHEMAS.items()}
+
+
+class PlanError(ValueError):
+    """A plan that does not match the action schemas"""
+
+    def __init__(self, message: str, errors: Optional[List[str]] = None):
+        super().__init__(message)
+        self.errors = errors or [message]
+
+
+def plan_errors(plan: Any, screen_size: Optional[Tuple[int, int]] = None) -> List[str]:
+    """
+    Everything wrong with a plan, as short messages a model can act on
+
+    Each action is checked against the schema for its own type (oneOf
+    errors alone do not say which field is wrong), and mouse coordinates
+    against the screen size when it is known.
+    """
+    if not isinstance(plan, dict) or not isinstance(plan.get("actions"), list):
+        return ['The plan must be a JSON object {"actions": [...]}']
+    if len(plan["actions"]) > MAX_ACTIONS:
+        return [f"A plan may have at most {MAX_ACTIONS} actions"]
+
+    errors = []
+    for i, action in enumerate(plan["actions"], 1):
+        kind = action.get("type") if isinstance(action, dict) else None
+        validator = _ACTION_VALIDATORS.get(kind)
+        if validator is None:
+            errors.append(f"Action {i}: type must be one of {', '.join(ACTION_SCHEMAS)}")
+            continue
+        for error in validator.iter_errors(action):
+            where = "/".join(str(p) for p in error.absolute_path) or "action"
+            errors.append(f"Action {i} ({kind}) {where}: {error.message}")
+        if kind == "mouse" and screen_size and isinstance(action.get("params"), dict):
+            width, height = screen_size
+            x, y = action["params"].get("x"), action["params"].get("y")
+            if isinstance(x, int) and isinstance(y, int) and (x >= width or y >= height):
+                errors.append(f"Action {i} (mouse): ({x}, {y}) is outside the {width}x{height} screen")
+    if not errors and not _PLAN_VALIDATOR.is_valid(plan):
+        errors.append("The plan does not match the action schema")
+    return errors
+
+
+def validate_plan(plan: Any, screen_size: Optional[Tuple[int, int]] = None) -> List[Dict[str, Any]]:
+    """
+    The plan's actions, or PlanError listing what is wrong
+
+    Args:
+        plan: Decoded model output, {"actions": [...]}
+        screen_size: (width, height) mouse coordinates must fall inside
+    """
+    errors = plan_errors(plan, screen_size)
+    if errors:
+        raise PlanError(f"Invalid action plan: {errors[0]}", errors)
+    return plan["actions"]
@@ -3,13 +3,15 @@ Agent-S Server - Computer Use Automation for AlphaOmega
 Coordinates vision analysis, action planning, and execution
 """
 from fastapi import FastAPI, HTTPException, BackgroundTasks
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Literal
 import asyncio
+import json
 import os
 import sys
+import time
 from pathlib import Path
 from datetime import datetime
 import logging
@@ -23,11 +25,20 @@ except Exception:
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from agent_s.vision.analyzer import VisionAnalyzer
+from agent_s.vision.differ import FrameDiffer
+from agent_s.vision.screen_cache import ScreenCache
+from agent_s.vision.screenshot_store import ScreenshotStore
 from agent_s.actions.screen import ScreenAction
 from agent_s.actions.mouse import MouseAction
 from agent_s.actions.keyboard import KeyboardAction
+from agent_s.actions.backend import DEFAULT_PROFILE, get_backend
+from agent_s.actions.engine import ExecutionEngine
+from agent_s.actions.scheduler import ANALYSIS, CONTROL, JobCancelled, JobScheduler
+from agent_s.planning.planner import ActionPlanner
+from agent_s.planning.schema import PlanError
 from agent_s.safety.validator import SafetyValidator
 from agent_s.mcp.client import MCPClient
+from agent_s.mcp.streaming import NDJSON_MEDIA_TYPE
 
 # Load environment
 load_dotenv()
@@ -65,18 +76,26 @@ app.add_middleware(
 
 # Initialize components
 vision_analyzer = None
+action_planner = None
 mcp_client = None
 safety_validator = None
 screen_action = None
 mouse_action = None
 keyboard_action = None
+execution_engine = None
+job_scheduler = None
+screenshot_store = None
+
+# Prefix of each step in actions_taken
+ACTION_ICONS = {"mouse": "🖱️  ", "keyboard": "⌨️  ", "wait": "⏱️  ", "mcp_tool": "🔧 "}
 
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize all components on startup"""
-    global vision_analyzer, mcp_client, safety_validator
-    global screen_action, mouse_action, keyboard_action
+    global vision_analyzer, action_planner, mcp_client, safety_validator
+    global screen_action, mouse_action, keyboard_action, execution_engine, job_scheduler
+    global screenshot_store
     
     logger.info("Starting Agent-S server...")
     
@@ -99,10 +118,15 @@ async def startup_event():
         # Initialize vision analyzer
         vision_analyzer = VisionAnalyzer(
             ollama_host=os.getenv("OLLAMA_VISION_HOST", "http://localhost:11434"),
-            model=os.getenv("VISION_MODEL", "llava:34b")
+            model=os.getenv("VISION_MODEL", "llava:34b"),
+            cache=ScreenCache(),
+            differ=FrameDiffer()
         )
         logger.info(f"Vision analyzer initialized with {os.getenv('VISION_MODEL', 'llava:34b')}")
         
+        # Initialize action planner (reasoning model)
+        action_planner = ActionPlanner()
+        
         # Initialize MCP client
         mcp_client = MCPClient(
             server_url=os.getenv("MCP_SERVER_URL", "http://localhost:8002")
@@ -113,15 +137,21 @@ async def startup_event():
         safety_validator = SafetyValidator()
         logger.info("Safety validator initialized")
         
+        # Screenshot directory, bounded in size and age
+        screenshot_store = ScreenshotStore()
+        logger.info(f"Screenshot store initialized in {screenshot_store.directory}")
+        
         # Initialize action handlers
-        screen_action = ScreenAction()
-        mouse_action = MouseAction()
-        keyboard_action = KeyboardAction()
+        screen_action = ScreenAction(store=screenshot_store)
+        # pyautogui, or AGENT_INPUT_BACKEND=mock to record input without a display
+        input_backend = get_backend()
+        mouse_action = MouseAction(input_backend)
+        keyboard_action = KeyboardAction(input_backend)
+        execution_engine = ExecutionEngine(screen_action, mouse_action, keyboard_action, mcp_client)
         logger.info("Action handlers initialized")
         
-        # Create screenshot directory
-        screenshot_dir = os.getenv("SCREENSHOT_DIR", "/tmp/agent_screenshots")
-        os.makedirs(screenshot_dir, exist_ok=True)
+        # One request at a time drives the mouse and keyboard
+        job_scheduler = JobScheduler()
         
         logger.info("Agent-S startup complete ✓")
         
@@ -130,12 +160,27 @@ async def startup_event():
         raise
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop queued jobs and release the connections to Ollama"""
+    if job_scheduler is not None:
+        await job_scheduler.aclose()
+    if vision_analyzer is not None:
+        await vision_analyzer.aclose()
+    if action_planner is not None:
+        await action_planner.aclose()
+
+
 class ActionRequest(BaseModel):
     """Request model for computer use actions"""
     prompt: str = Field(..., description="User request describing the action")
     messages: Optional[List[Dict[str, Any]]] = Field(default=[], description="Chat history for context")
     safe_mode: bool = Field(default=True, description="Enable safety validation")
     include_screenshot: bool = Field(default=True, description="Include screenshot in response")
+    priority: int = Field(default=0, description="Higher runs first among queued desktop-control requests")
+    speed: Optional[Literal["instant", "human", "demo"]] = Field(
+        default=None, description="Input speed profile (default: AGENT_INPUT_PROFILE)"
+    )
 
 
 class ActionResponse(BaseModel):
@@ -144,6 +189,7 @@ class ActionResponse(BaseModel):
     screenshot: Optional[str] = None
     actions_taken: List[str] = []
     artifacts: List[str] = []
+    steps: List[Dict[str, Any]] = Field(default=[], description="Per-step results and timings (seconds)")
     success: bool = True
     error: Optional[str] = None
 
@@ -157,102 +203,230 @@ async def execute_action(request: ActionRequest):
     logger.info(f"Received action request: {request.prompt[:100]}...")
     
     try:
-        # Step 1: Capture screenshot
-        logger.info("Capturing screenshot...")
-        screenshot_path = screen_action.capture()
-        
-        if not screenshot_path or not os.path.exists(screenshot_path):
-            raise HTTPException(status_code=500, detail="Failed to capture screenshot")
-        
-        # Step 2: Analyze screen with vision model
-        logger.info("Analyzing screenshot with vision model...")
-        vision_analysis = await vision_analyzer.analyze(
-            image_path=screenshot_path,
-            prompt=f"Analyze this screen to help with: {request.prompt}"
-        )
-        
-        logger.info(f"Vision analysis complete: {vision_analysis[:100]}...")
-        
-        # Step 3: Plan actions based on request and vision
-        logger.info("Planning actions...")
-        action_plan = await _plan_actions(
-            prompt=request.prompt,
-            vision_result=vision_analysis,
-            messages=request.messages
-        )
-        
-        # Step 4: Validate actions for safety
-        if request.safe_mode:
-            logger.info("Validating action safety...")
-            validation_result = safety_validator.validate(action_plan)
-            
-            if not validation_result["safe"]:
-                logger.warning(f"Action blocked: {validation_result['reason']}")
-                return ActionResponse(
-                    response=f"❌ Action blocked for safety: {validation_result['reason']}",
-                    screenshot=screenshot_path if request.include_screenshot else None,
-                    actions_taken=[],
-                    success=False,
-                    error=validation_result["reason"]
-                )
-        
-        # Step 5: Execute approved actions
-        logger.info(f"Executing {len(action_plan)} actions...")
-        executed_actions = []
-        artifacts = []
-        
-        for i, action in enumerate(action_plan):
+        return await _submit(request).wait()
+    except HTTPException:
+        raise
+    except JobCancelled as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in action execution: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/action/stream")
+async def stream_action(request: ActionRequest):
+    """
+    /action with progress: NDJSON events, one object per line, as each
+    stage happens - "queued" (job id, lane and queue position), "captured",
+    "analysis_token" (vision model output as it is generated), "analysis",
+    "plan", one "step" per executed action, then "done" with the
+    ActionResponse, or "error". Every event carries the seconds elapsed
+    since the request arrived.
+    """
+    logger.info(f"Received streaming action request: {request.prompt[:100]}...")
+    started = time.monotonic()
+    events: asyncio.Queue = asyncio.Queue()
+    
+    def emit(event: Dict[str, Any]):
+        events.put_nowait({**event, "elapsed": round(time.monotonic() - started, 3)})
+    
+    job = _submit(request, emit)
+    emit({"event": "queued", "job_id": job.id, "lane": job.lane, "position": job_scheduler.position(job)})
+    waiter = asyncio.ensure_future(job.wait())
+    # Queued after every event the pipeline emitted
+    waiter.add_done_callback(lambda _: events.put_nowait(None))
+    
+    async def lines():
+        try:
+            while (event := await events.get()) is not None:
+                yield _ndjson(event)
             try:
-                logger.info(f"Executing action {i+1}/{len(action_plan)}: {action.get('type')}")
-                
-                if action["type"] == "mouse":
-                    mouse_action.execute(action["params"])
-                    executed_actions.append(f"🖱️  {action['description']}")
-                    
-                elif action["type"] == "keyboard":
-                    keyboard_action.execute(action["params"])
-                    executed_actions.append(f"⌨️  {action['description']}")
-                    
-                elif action["type"] == "wait":
-                    await asyncio.sleep(action["params"].get("duration", 1))
-                    executed_actions.append(f"⏱️  {action['description']}")
-                    
-                elif action["type"] == "mcp_tool":
-                    result = await mcp_client.execute_tool(
-                        tool_name=action["tool"],
-                        params=action["params"]
-                    )
-                    executed_actions.append(f"🔧 {action['description']}")
-                    if "artifact_url" in result:
-                        artifacts.append(result["artifact_url"])
-                
-                # Small delay between actions
-                await asyncio.sleep(0.5)
-                
+                result = waiter.result()
+                yield _ndjson({"event": "done", "result": result.model_dump(), "elapsed": round(time.monotonic() - started, 3)})
             except Exception as e:
-                logger.error(f"Error executing action {i+1}: {e}")
-                executed_actions.append(f"❌ Failed: {action['description']} - {str(e)}")
-        
-        # Step 6: Generate natural language response
-        response_text = await _generate_response(
+                logger.error(f"Error in action execution: {e}", exc_info=True)
+                yield _ndjson({"event": "error", "detail": getattr(e, "detail", None) or str(e)})
+        finally:
+            # The client went away mid-run: drop the job too
+            job_scheduler.cancel(job.id)
+            waiter.cancel()
+    
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
+
+
+@app.post("/jobs", status_code=202)
+async def submit_job(request: ActionRequest):
+    """Queue an action request and return its job id right away; poll GET /jobs/{job_id}"""
+    job = _submit(request)
+    return job_scheduler.status(job.id)
+
+
+@app.get("/jobs")
+async def list_jobs():
+    """Queued, running and recently finished jobs, with per-lane queue metrics"""
+    return {"jobs": job_scheduler.jobs(), "lanes": job_scheduler.stats()}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status of a job, with its ActionResponse once it succeeded"""
+    status = job_scheduler.status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return status
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job"""
+    if job_scheduler.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not job_scheduler.cancel(job_id):
+        raise HTTPException(status_code=409, detail="Job already finished")
+    return job_scheduler.status(job_id)
+
+
+def _submit(request: ActionRequest, emit: Optional[Callable[[Dict[str, Any]], None]] = None):
+    """
+    Queue a request on the scheduler: requests that only ask about the
+    screen share the analysis lane, everything else waits its turn for the
+    mouse and keyboard
+    """
+    lane = ANALYSIS if action_planner.observe_only(request.prompt) else CONTROL
+    return job_scheduler.submit(
+        lambda: _run_action(request, emit),
+        lane=lane,
+        priority=request.priority,
+        description=request.prompt[:100]
+    )
+
+
+def _ndjson(event: Dict[str, Any]) -> bytes:
+    return (json.dumps(event, default=str) + "\n").encode()
+
+
+async def _run_action(
+    request: ActionRequest,
+    emit: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> ActionResponse:
+    """
+    Capture, analyze, plan, validate and execute one request
+    
+    Args:
+        request: The action request
+        emit: Called with a progress event as each stage happens (the
+            vision analysis is streamed token by token only when given)
+    """
+    on_token = None
+    if emit is not None:
+        on_token = lambda text: emit({"event": "analysis_token", "text": text})
+    else:
+        emit = lambda event: None
+    
+    # Step 1: Capture screenshot into memory
+    logger.info("Capturing screenshot...")
+    frame = screen_action.grab()
+    
+    if frame is None:
+        raise HTTPException(status_code=500, detail="Failed to capture screenshot")
+    emit({"event": "captured", "width": frame.size[0], "height": frame.size[1]})
+    
+    # The PNG is only written when the caller wants the screenshot back,
+    # on a worker thread while the vision model runs
+    saving = None
+    if request.include_screenshot:
+        saving = asyncio.ensure_future(asyncio.to_thread(screenshot_store.save, frame))
+    
+    # Step 2: Analyze screen with vision model
+    logger.info("Analyzing screenshot with vision model...")
+    vision_analysis = await vision_analyzer.analyze(
+        image_path=frame,
+        prompt=f"Analyze this screen to help with: {request.prompt}",
+        on_token=on_token
+    )
+    
+    logger.info(f"Vision analysis complete: {vision_analysis[:100]}...")
+    emit({"event": "analysis", "text": vision_analysis})
+    
+    # Step 3: Plan actions based on request and vision
+    logger.info("Planning actions...")
+    try:
+        action_plan = await action_planner.plan(
             prompt=request.prompt,
             vision_analysis=vision_analysis,
-            actions_taken=executed_actions
+            messages=request.messages,
+            frame=frame
         )
-        
-        logger.info("Action execution complete")
-        
+    except (PlanError, asyncio.TimeoutError) as e:
+        reason = str(e) or "planner timed out"
+        logger.warning(f"Planning failed: {reason}")
         return ActionResponse(
-            response=response_text,
-            screenshot=screenshot_path if request.include_screenshot else None,
-            actions_taken=executed_actions,
-            artifacts=artifacts,
-            success=True
+            response=f"I can see your screen but could not plan the actions: {reason}\n\n{vision_analysis}",
+            screenshot=await saving if saving else None,
+            actions_taken=[],
+            success=False,
+            error=reason
         )
+    emit({
+        "event": "plan",
+        "steps": [{"type": a["type"], "description": a.get("description", a["type"])} for a in action_plan]
+    })
+    
+    # Step 4: Validate actions for safety
+    if request.safe_mode:
+        logger.info("Validating action safety...")
+        validation_result = safety_validator.validate(action_plan)
         
-    except Exception as e:
-        logger.error(f"Error in action execution: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=str(e))
+        if not validation_result["safe"]:
+            logger.warning(f"Action blocked: {validation_result['reason']}")
+            return ActionResponse(
+                response=f"❌ Action blocked for safety: {validation_result['reason']}",
+                screenshot=await saving if saving else None,
+                actions_taken=[],
+                success=False,
+                error=validation_result["reason"]
+            )
+    
+    # Step 5: Execute approved actions
+    logger.info(f"Executing {len(action_plan)} actions...")
+    executed_actions = []
+    artifacts = []
+    
+    # Each step waits for the UI to react and settle, not a fixed delay
+    steps = await execution_engine.run(
+        action_plan,
+        on_step=lambda report: emit({"event": "step", **report}),
+        profile=request.speed
+    )
+    for step in steps:
+        if step["success"]:
+            executed_actions.append(f"{ACTION_ICONS.get(step['type'], '')}{step['description']}")
+        else:
+            executed_actions.append(f"❌ Failed: {step['description']} - {step['error']}")
+        if "artifact_url" in step:
+            artifacts.append(step["artifact_url"])
+    
+    # Input may change the screen below what the screen hash sees
+    if any(step["type"] != "wait" for step in steps) and vision_analyzer.cache is not None:
+        vision_analyzer.cache.invalidate()
+    
+    # Step 6: Generate natural language response
+    response_text = await _generate_response(
+        prompt=request.prompt,
+        vision_analysis=vision_analysis,
+        actions_taken=executed_actions
+    )
+    
+    logger.info("Action execution complete")
+    
+    return ActionResponse(
+        response=response_text,
+        screenshot=await saving if saving else None,
+        actions_taken=executed_actions,
+        artifacts=artifacts,
+        steps=steps,
+        success=True
+    )
 
 
 @app.post("/screenshot")
@@ -268,13 +442,13 @@ async def take_screenshot():
 @app.get("/screenshot/{filename}")
 async def get_screenshot(filename: str):
     """Serve screenshot files"""
-    screenshot_dir = os.getenv("SCREENSHOT_DIR", "/tmp/agent_screenshots")
-    file_path = os.path.join(screenshot_dir, filename)
+    # Only names in the store's index: no filesystem probe, no path traversal
+    file_path = screenshot_store.path(filename) if screenshot_store else None
     
-    if not os.path.exists(file_path):
+    if file_path is None:
         raise HTTPException(status_code=404, detail="Screenshot not found")
     
-    return FileResponse(file_path, media_type="image/png")
+    return FileResponse(file_path, media_type=screenshot_store.media_type(filename))
 
 
 @app.get("/health")
@@ -295,10 +469,17 @@ async def health_check():
                 "mcp": mcp_connected,
                 "screen_capture": can_capture,
                 "mouse": mouse_action is not None,
-                "keyboard": keyboard_action is not None
+                "keyboard": keyboard_action is not None,
+                "input_backend": keyboard_action.backend.name if keyboard_action else None
             },
+            "vision_cache": vision_analyzer.cache.stats() if vision_analyzer and vision_analyzer.cache else None,
+            "planner": action_planner.stats() if action_planner else None,
+            "execution": execution_engine.stats() if execution_engine else None,
+            "jobs": job_scheduler.stats() if job_scheduler else None,
+            "screenshots": screenshot_store.stats() if screenshot_store else None,
             "config": {
                 "vision_model": os.getenv("VISION_MODEL", "llava:34b"),
+                "input_profile": DEFAULT_PROFILE,
                 "safe_mode": os.getenv("AGENT_SAFE_MODE", "true"),
                 "ollama_host": os.getenv("OLLAMA_VISION_HOST", "http://localhost:11434")
             }
@@ -310,41 +491,6 @@ async def health_check():
         )
 
 
-async def _plan_actions(
-    prompt: str,
-    vision_result: str,
-    messages: List[Dict]
-) -> List[Dict[str, Any]]:
-    """
-    Plan actions based on user prompt and vision analysis
-    Returns list of actions to execute
-    """
-    # For now, return simple action based on keywords
-    # TODO: Use reasoning model to intelligently plan multi-step actions
-    
-    actions = []
-    prompt_lower = prompt.lower()
-    
-    # Simple keyword-based planning (will be replaced with LLM planning)
-    if "screenshot" in prompt_lower or "what's on" in prompt_lower:
-        # Just analyze, no actions needed
-        actions.append({
-            "type": "wait",
-            "params": {"duration": 0},
-            "description": "Screen analysis only"
-        })
-    
-    elif "click" in prompt_lower:
-        # Extract coordinates or element (simplified)
-        actions.append({
-            "type": "mouse",
-            "params": {"action": "click", "x": 500, "y": 500},
-            "description": "Click at detected location"
-        })
-    
-    return actions
-
-
 async def _generate_response(
     prompt: str,
     vision_analysis: str,
@@ -352,7 +498,7 @@ async def _generate_response(
 ) -> str:
     """Generate natural language response to user"""
     
-    if not actions_taken or actions_taken[0].startswith("⏱️  Screen analysis"):
+    if not actions_taken:
         # No actions, just vision analysis
         return f"I can see your screen. Here's what I found:\n\n{vision_analysis}"
     
@@ -3,15 +3,22 @@ Vision Analysis using Ollama + LLaVA
 Optimized for AMD MI50 GPU
 """
 import ollama
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Union, AsyncIterator, Tuple, Callable, List
 from pathlib import Path
+import asyncio
 import logging
-from PIL import Image
-import io
-import base64
+import os
+
+from agent_s.vision.differ import FrameDiffer, luma
+from agent_s.vision.frame import Frame
+from agent_s.vision.screen_cache import ScreenCache
 
 logger = logging.getLogger("agent_s.vision")
 
+# Upper bound on one vision call, end to end (seconds); a stuck model must
+# not hold a request forever
+DEFAULT_TIMEOUT = float(os.getenv("VISION_TIMEOUT", 120))
+
 
 class VisionAnalyzer:
     """Analyze screenshots and images using LLaVA vision model via Ollama"""
@@ -19,7 +26,10 @@ class VisionAnalyzer:
     def __init__(
         self,
         ollama_host: str = "http://localhost:11434",
-        model: str = "devstral-vision"
+        model: str = "devstral-vision",
+        timeout: float = DEFAULT_TIMEOUT,
+        cache: Optional[ScreenCache] = None,
+        differ: Optional[FrameDiffer] = None
     ):
         """
         Initialize vision analyzer
@@ -27,102 +37,249 @@ class VisionAnalyzer:
         Args:
             ollama_host: Ollama API endpoint (GPU1 MI50)
             model: Vision model to use (default: devstral-vision)
+            timeout: Default per-call timeout in seconds (VISION_TIMEOUT)
+            cache: Screen-state cache consulted for captured Frames (optional)
+            differ: Enables incremental analysis of changed regions (optional)
         """
         self.ollama_host = ollama_host
         self.model = model
-        self.client = ollama.Client(host=ollama_host)
+        self.timeout = timeout
+        self.cache = cache
+        self.differ = differ
+        # (prompt key, luma of the frame, description, incremental steps) of
+        # the last analysis a captured frame was diffed against
+        self._baseline = None
+        # Async client over one pooled httpx connection: inference never
+        # blocks the event loop, and cancelling the awaiting task aborts
+        # the HTTP request
+        self.client = ollama.AsyncClient(host=ollama_host)
         
         logger.info(f"VisionAnalyzer initialized with {model} at {ollama_host}")
     
     async def analyze(
         self,
-        image_path: str,
+        image_path: Union[str, Frame],
         prompt: str,
         context: Optional[str] = None,
-        preprocess: bool = True
+        preprocess: bool = True,
+        timeout: Optional[float] = None,
+        on_token: Optional[Callable[[str], None]] = None
     ) -> str:
         """
         Analyze image with vision model
         
+        Captured Frames are answered from the screen cache when possible and,
+        with a differ, by re-describing only what changed since the previous
+        full analysis for the same prompt.
+        
         Args:
-            image_path: Path to screenshot or image file
+            image_path: Path to screenshot or image file, or a captured Frame
             prompt: What to analyze or look for
             context: Additional context to help analysis
-            preprocess: Whether to resize/optimize image first
+            preprocess: Whether to resize/encode image first (otherwise a
+                file is sent as-is)
+            timeout: Seconds before the call is abandoned (default: self.timeout)
+            on_token: Called with each piece of the answer as the model
+                generates it (not called for answers from the caches)
             
         Returns:
             Analysis result as string
         """
         try:
-            # Preprocess image if requested
-            if preprocess:
-                image_path = self._preprocess_image(image_path)
-            
-            # Build vision prompt
-            vision_prompt = self._build_prompt(prompt, context)
+            key = self._cache_prompt(prompt, context)
             
-            logger.debug(f"Analyzing image: {image_path}")
-            logger.debug(f"Prompt: {vision_prompt[:100]}...")
+            # A Frame of a screen already analysed for this prompt is
+            # answered from the screen cache
+            fingerprint = None
+            if self.cache is not None and self.cache.enabled and isinstance(image_path, Frame):
+                fingerprint = await asyncio.to_thread(self.cache.fingerprint, image_path.image)
+                cached = self.cache.get(fingerprint, key)
+                if cached is not None:
+                    return cached
             
-            # Call Ollama with image
-            response = self.client.chat(
-                model=self.model,
-                messages=[{
-                    'role': 'user',
-                    'content': vision_prompt,
-                    'images': [image_path]
-                }]
-            )
-            
-            result = response['message']['content']
-            logger.debug(f"Analysis result: {result[:100]}...")
+            if self.differ is not None and isinstance(image_path, Frame):
+                result = await self._analyze_changes(image_path, prompt, context, key, timeout, on_token)
+            else:
+                result = await self._chat(image_path, prompt, context, preprocess, timeout, on_token)
             
+            if fingerprint is not None:
+                self.cache.put(fingerprint, key, result)
             return result
             
+        except asyncio.TimeoutError:
+            logger.error(f"Vision analysis timed out after {timeout or self.timeout}s")
+            return f"Error analyzing image: timed out after {timeout or self.timeout}s"
         except Exception as e:
             logger.error(f"Error in vision analysis: {e}")
             return f"Error analyzing image: {str(e)}"
     
-    def analyze_region(
+    async def _chat(
+        self,
+        image_path: Union[str, Frame],
+        prompt: str,
+        context: Optional[str],
+        preprocess: bool,
+        timeout: Optional[float],
+        on_token: Optional[Callable[[str], None]] = None
+    ) -> str:
+        """One vision model call; raises on failure"""
+        messages = await self._messages(image_path, prompt, context, preprocess)
+        
+        if on_token is not None:
+            pieces = []
+            async for piece in self._stream_chat(messages, timeout):
+                on_token(piece)
+                pieces.append(piece)
+            return "".join(pieces)
+        
+        # Call Ollama with image
+        response = await asyncio.wait_for(
+            self.client.chat(model=self.model, messages=messages),
+            timeout or self.timeout
+        )
+        
+        result = response['message']['content']
+        logger.debug(f"Analysis result: {result[:100]}...")
+        return result
+    
+    async def _analyze_changes(
+        self,
+        frame: Frame,
+        prompt: str,
+        context: Optional[str],
+        key: str,
+        timeout: Optional[float],
+        on_token: Optional[Callable[[str], None]] = None
+    ) -> str:
+        """
+        Analyze a frame against the last full analysis for the same prompt:
+        unchanged screens reuse its description, small changes are analysed
+        region by region and appended to it, anything else is analysed whole
+        """
+        pixels = await asyncio.to_thread(luma, frame)
+        regions = None
+        baseline = self._baseline
+        if baseline is not None and baseline[0] == key and baseline[3] < self.differ.max_steps:
+            regions = await asyncio.to_thread(self.differ.regions, baseline[1], pixels)
+        
+        if regions is None:
+            result, steps = await self._chat(frame, prompt, context, True, timeout, on_token), 0
+        elif not regions:
+            result, steps = baseline[2], baseline[3]
+        else:
+            logger.debug(f"Analyzing {len(regions)} changed regions instead of the full frame")
+            answers = await asyncio.gather(*(
+                self._analyze_region(frame, box, prompt, timeout) for box in regions
+            ))
+            changes = "\n".join(
+                f"- Region at ({x}, {y}), {w}x{h}: {answer}"
+                for (x, y, w, h), answer in zip(regions, answers)
+            )
+            result = f"{baseline[2]}\n\nChanged since the previous capture:\n{changes}"
+            steps = baseline[3] + 1
+        
+        self._baseline = (key, pixels, result, steps)
+        return result
+    
+    async def analyze_stream(
         self,
-        image_path: str,
+        image_path: Union[str, Frame],
+        prompt: str,
+        context: Optional[str] = None,
+        preprocess: bool = True,
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[str]:
+        """
+        Analyze image with vision model, yielding the answer as it is generated
+        
+        Same arguments as analyze(). The timeout covers the whole stream.
+        Closing the generator (or cancelling its consumer) closes the HTTP
+        stream, which stops generation on the Ollama side.
+        
+        Raises:
+            asyncio.TimeoutError: The stream did not finish in time
+            ollama.ResponseError: Ollama rejected the request
+        """
+        messages = await self._messages(image_path, prompt, context, preprocess)
+        pieces = self._stream_chat(messages, timeout)
+        try:
+            async for piece in pieces:
+                yield piece
+        finally:
+            await pieces.aclose()
+    
+    async def _stream_chat(self, messages: List[Dict[str, Any]], timeout: Optional[float]) -> AsyncIterator[str]:
+        """Stream one chat call's content under a deadline for the whole answer"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (timeout or self.timeout)
+        
+        stream = await asyncio.wait_for(
+            self.client.chat(model=self.model, messages=messages, stream=True),
+            deadline - loop.time()
+        )
+        try:
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(anext(stream), deadline - loop.time())
+                except StopAsyncIteration:
+                    return
+                if chunk['message']['content']:
+                    yield chunk['message']['content']
+        finally:
+            await stream.aclose()
+    
+    async def aclose(self):
+        """Close the pooled HTTP connection to Ollama"""
+        await self.client.close()
+    
+    async def analyze_region(
+        self,
+        image_path: Union[str, Frame],
         x: int, y: int, w: int, h: int,
-        prompt: str
+        prompt: str,
+        timeout: Optional[float] = None
     ) -> str:
         """
         Analyze specific region of screenshot for better accuracy
         
         Args:
-            image_path: Path to full screenshot
+            image_path: Path to full screenshot, or a captured Frame
             x, y: Top-left coordinates of region
             w, h: Width and height of region
             prompt: What to analyze in this region
+            timeout: Seconds before the call is abandoned (default: self.timeout)
             
         Returns:
             Analysis of the specific region
         """
         try:
-            # Crop to region
-            img = Image.open(image_path)
-            region = img.crop((x, y, x+w, y+h))
-            
-            # Save temporary region file
-            region_path = f"/tmp/region_{x}_{y}_{w}_{h}.png"
-            region.save(region_path, optimize=True)
-            
-            # Analyze cropped region
-            result = self.analyze(
-                image_path=region_path,
-                prompt=prompt,
-                preprocess=False  # Already cropped
-            )
-            
-            return result
+            frame = image_path if isinstance(image_path, Frame) else await asyncio.to_thread(Frame.open, image_path)
+            return await self._analyze_region(frame, (x, y, w, h), prompt, timeout)
             
+        except asyncio.TimeoutError:
+            logger.error(f"Region analysis timed out after {timeout or self.timeout}s")
+            return f"Error analyzing region: timed out after {timeout or self.timeout}s"
         except Exception as e:
             logger.error(f"Error analyzing region: {e}")
             return f"Error analyzing region: {str(e)}"
     
+    async def _analyze_region(
+        self,
+        frame: Frame,
+        box: Tuple[int, int, int, int],
+        prompt: str,
+        timeout: Optional[float]
+    ) -> str:
+        """Crop in memory and analyze the region; raises on failure"""
+        x, y, w, h = box
+        region = frame.crop((x, y, x + w, y + h))
+        context = f"This image is the {w}x{h} region at ({x}, {y}) of the screen."
+        return await self._chat(region, prompt, context, True, timeout)
+    
+    def _cache_prompt(self, prompt: str, context: Optional[str]) -> str:
+        """Everything besides the screen that decides the answer"""
+        return f"{self.model}\n{context or ''}\n{prompt}"
+    
     def _build_prompt(self, prompt: str, context: Optional[str] = None) -> str:
         """Build effective vision prompt"""
         
@@ -143,47 +300,61 @@ Be specific about:
         
         return base_prompt
     
-    def _preprocess_image(self, image_path: str) -> str:
+    async def _messages(
+        self,
+        image_path: Union[str, Frame],
+        prompt: str,
+        context: Optional[str],
+        preprocess: bool
+    ) -> list:
+        """The chat messages for one vision call"""
+        # Encode in memory, off the event loop; the model gets bytes, never
+        # a temporary file
+        image = await asyncio.to_thread(self._image_bytes, image_path, preprocess)
+        
+        # Build vision prompt
+        vision_prompt = self._build_prompt(prompt, context)
+        
+        logger.debug(f"Analyzing image: {image_path} ({len(image)} bytes)")
+        logger.debug(f"Prompt: {vision_prompt[:100]}...")
+        
+        return [{
+            'role': 'user',
+            'content': vision_prompt,
+            'images': [image]
+        }]
+    
+    def _image_bytes(self, image: Union[str, Frame], preprocess: bool = True) -> bytes:
+        """The image as sent to the model"""
+        if isinstance(image, Frame):
+            return image.encode() if preprocess else image.encode("PNG", max_size=image.size)
+        if preprocess:
+            return self._preprocess_image(image)
+        return Path(image).read_bytes()
+    
+    def _preprocess_image(self, image_path: str) -> bytes:
         """
         Preprocess image for better analysis
         - Resize if too large (faster inference)
-        - Optimize quality
+        - Encode once, in memory, in the format the model prefers
+          (VISION_IMAGE_FORMAT at VISION_IMAGE_QUALITY)
         """
         try:
-            import os
-            
-            img = Image.open(image_path)
-            original_size = img.size
-            
-            # Get max dimensions from env or defaults
-            max_width = int(os.getenv("SCREENSHOT_MAX_WIDTH", 1280))
-            max_height = int(os.getenv("SCREENSHOT_MAX_HEIGHT", 720))
-            
-            # Resize if needed
-            if img.width > max_width or img.height > max_height:
-                img.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
-                logger.debug(f"Resized image from {original_size} to {img.size}")
-            
-            # Save optimized version
-            optimized_path = image_path.replace(".png", "_optimized.png")
-            img.save(optimized_path, optimize=True, quality=85)
-            
-            return optimized_path
-            
+            return Frame.open(image_path).encode()
         except Exception as e:
             logger.warning(f"Image preprocessing failed, using original: {e}")
-            return image_path
+            return Path(image_path).read_bytes()
     
     async def identify_ui_elements(
         self,
-        image_path: str,
+        image_path: Union[str, Frame],
         element_type: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Identify UI elements in screenshot
         
         Args:
-            image_path: Path to screenshot
+            image_path: Path to screenshot, or a captured Frame
             element_type: Optional filter (e.g., "buttons", "text_fields", "menus")
             
         Returns:
@@ -229,14 +400,14 @@ Format as a structured list."""
     
     async def find_element(
         self,
-        image_path: str,
+        image_path: Union[str, Frame],
         element_description: str
     ) -> Dict[str, Any]:
         """
         Find specific UI element in screenshot
         
         Args:
-            image_path: Path to screenshot
+            image_path: Path to screenshot, or a captured Frame
             element_description: Description of element to find (e.g., "Close button")
             
         Returns:
@@ -0,0 +1,157 @@
+"""
+Frame differ for incremental screen analysis
+Finds the bounding boxes of what changed between two captures, so only
+those regions need to go back through the vision model
+"""
+import logging
+import os
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from agent_s.vision.frame import Frame
+
+logger = logging.getLogger("agent_s.vision.differ")
+
+# (x, y, width, height) in screen pixels
+Box = Tuple[int, int, int, int]
+
+
+def luma(frame: Frame) -> np.ndarray:
+    """Grayscale pixels of a frame as a (height, width) uint8 array"""
+    return np.asarray(frame.image.convert("L"))
+
+
+def changed_regions(
+    before: np.ndarray,
+    after: np.ndarray,
+    block: int = 16,
+    threshold: int = 24,
+    gap: int = 1
+) -> List[Box]:
+    """
+    Bounding boxes of the areas that differ between two grayscale frames
+
+    Pixels are compared exactly (no downscaling, so a single typed
+    character shows up); the changed pixels are gathered into block x block
+    tiles, tiles within `gap` tiles of each other are joined, and each
+    connected group becomes one box, tight around its changed tiles.
+
+    Args:
+        before, after: luma() arrays of the same shape
+        block: Tile size in pixels
+        threshold: Smallest gray-level change that counts (ignores dithering)
+        gap: Tiles of unchanged space still bridged into one region
+
+    Returns:
+        Boxes sorted top-to-bottom, left-to-right (empty if nothing changed)
+    """
+    if before.shape != after.shape:
+        raise ValueError(f"Frame sizes differ: {before.shape} vs {after.shape}")
+    height, width = after.shape
+    # |after - before| without widening to int16
+    changed = (np.maximum(before, after) - np.minimum(before, after)) > threshold
+
+    rows, cols = -(-height // block), -(-width // block)
+    padded = np.zeros((rows * block, cols * block), dtype=bool)
+    padded[:height, :width] = changed
+    tiles = padded.reshape(rows, block, cols, block).any(axis=(1, 3))
+    if not tiles.any():
+        return []
+
+    # Grow by `gap` tiles so nearby changes are labelled together
+    grown = tiles.copy()
+    for _ in range(gap):
+        step = grown.copy()
+        step[1:, :] |= grown[:-1, :]
+        step[:-1, :] |= grown[1:, :]
+        step[:, 1:] |= grown[:, :-1]
+        step[:, :-1] |= grown[:, 1:]
+        grown = step
+
+    labels = np.zeros(grown.shape, dtype=np.int32)
+    boxes = []
+    for start in zip(*np.nonzero(tiles)):
+        if labels[start]:
+            continue
+        label = len(boxes) + 1
+        labels[start] = label
+        stack, members = [start], []
+        while stack:
+            r, c = stack.pop()
+            if tiles[r, c]:
+                members.append((r, c))
+            for nr, nc in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+                if 0 <= nr < rows and 0 <= nc < cols and grown[nr, nc] and not labels[nr, nc]:
+                    labels[nr, nc] = label
+                    stack.append((nr, nc))
+        top, left = min(r for r, _ in members), min(c for _, c in members)
+        bottom, right = max(r for r, _ in members) + 1, max(c for _, c in members) + 1
+        x, y = int(left) * block, int(top) * block
+        boxes.append((x, y, min(int(right) * block, width) - x, min(int(bottom) * block, height) - y))
+    return sorted(boxes, key=lambda box: (box[1], box[0]))
+
+
+class FrameDiffer:
+    """
+    Decides whether a new capture can be analysed incrementally
+
+    Holds the changed_regions() settings and the limits beyond which a
+    change is treated as a new screen (full analysis) rather than a few
+    regions worth re-describing.
+    """
+
+    def __init__(
+        self,
+        block: int = 16,
+        threshold: int = 24,
+        gap: int = 1,
+        max_regions: Optional[int] = None,
+        max_fraction: Optional[float] = None,
+        max_steps: Optional[int] = None,
+        padding: int = 8
+    ):
+        """
+        Args:
+            block, threshold, gap: See changed_regions()
+            max_regions: Most regions analysed separately (VISION_DIFF_MAX_REGIONS)
+            max_fraction: Largest changed share of the screen, by box area
+                (VISION_DIFF_MAX_FRACTION)
+            max_steps: Incremental updates before a full re-analysis
+                (VISION_DIFF_MAX_STEPS)
+            padding: Context pixels added around each region
+        """
+        if max_regions is None:
+            max_regions = int(os.getenv("VISION_DIFF_MAX_REGIONS", 4))
+        if max_fraction is None:
+            max_fraction = float(os.getenv("VISION_DIFF_MAX_FRACTION", 0.25))
+        if max_steps is None:
+            max_steps = int(os.getenv("VISION_DIFF_MAX_STEPS", 3))
+        self.block = block
+        self.threshold = threshold
+        self.gap = gap
+        self.max_regions = max_regions
+        self.max_fraction = max_fraction
+        self.max_steps = max_steps
+        self.padding = padding
+
+    def regions(self, before: np.ndarray, after: np.ndarray) -> Optional[List[Box]]:
+        """
+        Padded changed regions, or None if too much changed to go incremental
+        (an empty list means nothing changed)
+        """
+        if before.shape != after.shape:
+            return None
+        boxes = changed_regions(before, after, self.block, self.threshold, self.gap)
+        height, width = after.shape
+        area = sum(w * h for _, _, w, h in boxes)
+        if len(boxes) > self.max_regions or area > self.max_fraction * width * height:
+            logger.debug(f"{len(boxes)} changed regions covering {area / (width * height):.0%}: full analysis")
+            return None
+        return [self._pad(box, width, height) for box in boxes]
+
+    def _pad(self, box: Box, width: int, height: int) -> Box:
+        x, y, w, h = box
+        left, top = max(x - self.padding, 0), max(y - self.padding, 0)
+        right, bottom = min(x + w + self.padding, width), min(y + h + self.padding, height)
+        return (left, top, right - left, bottom - top)
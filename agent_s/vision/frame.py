@@ -0,0 +1,139 @@
+"""
+In-memory screen frames
+A capture is kept as a PIL image; the copy sent to the vision model is
+resized and encoded once, and the PNG on disk is only written when the
+screenshot is asked for
+"""
+import io
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from PIL import Image
+
+logger = logging.getLogger("agent_s.vision.frame")
+
+# What the vision model receives: JPEG is smallest to encode and to upload;
+# WEBP is smaller on disk but several times slower to encode
+MODEL_IMAGE_FORMAT = os.getenv("VISION_IMAGE_FORMAT", "JPEG").upper()
+MODEL_IMAGE_QUALITY = int(os.getenv("VISION_IMAGE_QUALITY", 85))
+
+RESAMPLE_FILTERS = {
+    "nearest": Image.Resampling.NEAREST,
+    "bilinear": Image.Resampling.BILINEAR,
+    "bicubic": Image.Resampling.BICUBIC,
+    "lanczos": Image.Resampling.LANCZOS,
+}
+# Bilinear after an integer box reduction looks as sharp as Lanczos on
+# screen content at a fraction of the cost
+RESAMPLE = RESAMPLE_FILTERS.get(os.getenv("SCREENSHOT_RESAMPLE", "bilinear").lower(), Image.Resampling.BILINEAR)
+
+
+def max_model_size() -> Tuple[int, int]:
+    """Largest image handed to the vision model (SCREENSHOT_MAX_WIDTH/HEIGHT)"""
+    return (int(os.getenv("SCREENSHOT_MAX_WIDTH", 1280)), int(os.getenv("SCREENSHOT_MAX_HEIGHT", 720)))
+
+
+class Frame:
+    """
+    One screen capture held in memory
+
+    Encodings are cached per (format, quality, size), so analysing the same
+    frame twice encodes it once. save() writes a PNG the first time it is
+    called and returns the same path afterwards. Frames are safe to share
+    between the event loop and worker threads.
+    """
+
+    def __init__(self, image: Image.Image, captured_at: Optional[float] = None, path: Optional[str] = None):
+        """
+        Args:
+            image: The captured pixels (RGB)
+            captured_at: time.time() of the capture (default: now)
+            path: File the frame was loaded from, if any
+        """
+        self.image = image if image.mode == "RGB" else image.convert("RGB")
+        self.captured_at = captured_at if captured_at is not None else time.time()
+        self.path = path
+        self._encoded: Dict[Tuple[str, int, Tuple[int, int]], bytes] = {}
+        # Separate locks: a slow save() on a worker thread must not hold up encode()
+        self._encode_lock = threading.Lock()
+        self._save_lock = threading.Lock()
+
+    @classmethod
+    def from_bgra(cls, data: bytes, size: Tuple[int, int], captured_at: Optional[float] = None) -> "Frame":
+        """Wrap a raw BGRA capture (mss) without an intermediate copy"""
+        return cls(Image.frombuffer("RGB", size, data, "raw", "BGRX", 0, 1), captured_at)
+
+    @classmethod
+    def open(cls, path: str) -> "Frame":
+        """Load an image file as a frame"""
+        with Image.open(path) as img:
+            img.load()
+            return cls(img.convert("RGB"), os.path.getmtime(path), path=path)
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return self.image.size
+
+    def crop(self, box: Tuple[int, int, int, int]) -> "Frame":
+        """A frame of the (left, top, right, bottom) box of this one"""
+        return Frame(self.image.crop(box), self.captured_at)
+
+    def resized(self, max_size: Optional[Tuple[int, int]] = None) -> Image.Image:
+        """The image scaled down to fit max_size (the image itself if it already fits)"""
+        max_w, max_h = max_size or max_model_size()
+        if self.image.width <= max_w and self.image.height <= max_h:
+            return self.image
+        img = self.image.copy()
+        img.thumbnail((max_w, max_h), RESAMPLE, reducing_gap=2.0)
+        logger.debug(f"Resized frame from {self.image.size} to {img.size}")
+        return img
+
+    def encode(
+        self,
+        fmt: str = MODEL_IMAGE_FORMAT,
+        quality: int = MODEL_IMAGE_QUALITY,
+        max_size: Optional[Tuple[int, int]] = None
+    ) -> bytes:
+        """
+        The frame resized and encoded for the vision model
+
+        Args:
+            fmt: Pillow format name (JPEG, WEBP or PNG)
+            quality: JPEG/WEBP quality (ignored for PNG)
+            max_size: Bounding box to scale down to (default: max_model_size())
+
+        Returns:
+            Encoded image bytes
+        """
+        max_size = max_size or max_model_size()
+        key = (fmt.upper(), quality, max_size)
+        with self._encode_lock:
+            if key not in self._encoded:
+                buffer = io.BytesIO()
+                options = {"compress_level": 1} if key[0] == "PNG" else {"quality": quality}
+                self.resized(max_size).save(buffer, format=key[0], **options)
+                self._encoded[key] = buffer.getvalue()
+            return self._encoded[key]
+
+    def save(self, directory: Optional[str] = None) -> str:
+        """
+        Write the full-size frame as PNG (once) and return its path
+
+        Args:
+            directory: Where to write (default: SCREENSHOT_DIR)
+        """
+        with self._save_lock:
+            if self.path is None:
+                directory = directory or os.getenv("SCREENSHOT_DIR", "/tmp/agent_screenshots")
+                os.makedirs(directory, exist_ok=True)
+                stamp = datetime.fromtimestamp(self.captured_at).strftime("%Y%m%d_%H%M%S_%f")
+                path = os.path.join(directory, f"screen_{stamp}.png")
+                # Written on the request path: favour speed over file size
+                self.image.save(path, format="PNG", compress_level=1)
+                self.path = path
+                logger.debug(f"Saved frame to {path}")
+            return self.path
@@ -0,0 +1,146 @@
+"""
+Screen-state cache for vision analyses
+Keys an analysis by a perceptual hash of the screen plus the prompt, so an
+/action on a screen that has not (visibly) changed is answered from memory
+instead of another vision model run
+"""
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger("agent_s.vision.screen_cache")
+
+
+def dhash(image: Image.Image, hash_size: int = 16) -> int:
+    """
+    Difference hash of an image: one bit per horizontally adjacent pair of
+    cells in a (hash_size + 1) x hash_size grayscale thumbnail, set when the
+    right cell is brighter. Robust to noise and re-encoding; blind to changes
+    much smaller than a cell (a cursor, a clock, a few typed characters).
+    """
+    small = image.resize((hash_size + 1, hash_size), Image.Resampling.BILINEAR, reducing_gap=2.0)
+    pixels = np.asarray(small.convert("L"), dtype=np.int16)
+    bits = pixels[:, 1:] > pixels[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    """Number of differing bits between two hashes"""
+    return (a ^ b).bit_count()
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Case- and whitespace-insensitive form of a prompt, for cache keys"""
+    return re.sub(r"\s+", " ", prompt).strip().casefold()
+
+
+class ScreenCache:
+    """
+    TTL cache of vision analyses (or anything else derived from a screen,
+    such as action plans) keyed by (prompt, screen hash)
+
+    A lookup hits when an entry for the same normalized prompt is still
+    fresh and its screen hash is within max_distance bits of the current
+    one; the nearest such entry wins. Changes below the hash resolution are
+    invisible to it, so callers should invalidate() after acting on the
+    screen themselves, and the TTL bounds how long an outside change can go
+    unnoticed.
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[float] = None,
+        max_distance: Optional[int] = None,
+        hash_size: int = 16,
+        max_entries: int = 256
+    ):
+        """
+        Args:
+            ttl: Seconds an analysis stays valid (VISION_CACHE_TTL; 0 disables)
+            max_distance: Largest Hamming distance still treated as the same
+                screen (VISION_CACHE_DISTANCE, out of hash_size**2 bits)
+            hash_size: dHash grid size
+            max_entries: Upper bound on cached analyses (LRU eviction)
+        """
+        if ttl is None:
+            ttl = float(os.getenv("VISION_CACHE_TTL", 15))
+        if max_distance is None:
+            max_distance = int(os.getenv("VISION_CACHE_DISTANCE", 1))
+        self.ttl = ttl
+        self.max_distance = max_distance
+        self.hash_size = hash_size
+        self.max_entries = max_entries
+
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[float, Any]]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def fingerprint(self, image: Image.Image) -> int:
+        """Perceptual hash of a screen image"""
+        return dhash(image, self.hash_size)
+
+    def get(self, fingerprint: int, prompt: str) -> Optional[Any]:
+        """Cached analysis of a matching screen for this prompt, if any"""
+        prompt = normalize_prompt(prompt)
+        now = time.monotonic()
+        best, best_distance = None, self.max_distance + 1
+        for key, (expires, _) in list(self._entries.items()):
+            if expires <= now:
+                del self._entries[key]
+                continue
+            if key[0] != prompt:
+                continue
+            distance = hamming(key[1], fingerprint)
+            if distance < best_distance:
+                best, best_distance = key, distance
+        if best is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(best)
+        self.hits += 1
+        logger.debug(f"Screen cache hit at distance {best_distance}")
+        return self._entries[best][1]
+
+    def put(self, fingerprint: int, prompt: str, analysis: Any):
+        """Remember the analysis of a screen for this prompt"""
+        if not self.enabled:
+            return
+        key = (normalize_prompt(prompt), fingerprint)
+        self._entries[key] = (time.monotonic() + self.ttl, analysis)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self):
+        """Forget every analysis (the screen is known to have changed)"""
+        if self._entries:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for /health"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+            "ttl": self.ttl,
+            "max_distance": self.max_distance
+        }
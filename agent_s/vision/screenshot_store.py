@@ -0,0 +1,195 @@
+"""
+Screenshot retention
+Stores saved frames under SCREENSHOT_DIR named by their content, so a
+repeated screen is written once, and keeps the directory inside a size and
+age budget by evicting the least recently used files
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from agent_s.vision.frame import Frame
+
+logger = logging.getLogger("agent_s.vision.screenshot_store")
+
+IMAGE_EXTENSIONS = {".png": "image/png", ".webp": "image/webp", ".jpg": "image/jpeg", ".jpeg": "image/jpeg"}
+
+
+def content_digest(frame: Frame) -> str:
+    """Hash of a frame's pixels and size (identical captures share it)"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(b"%dx%d" % frame.size)
+    digest.update(frame.image.tobytes())
+    return digest.hexdigest()
+
+
+class ScreenshotStore:
+    """
+    Content-addressed, size- and age-bounded screenshot directory
+
+    Files are named screen_<digest>.png (or .webp when compressed), so
+    saving a frame identical to a stored one only refreshes that file. An
+    in-memory index (name -> size, creation time) ordered by last use
+    answers lookups without touching the filesystem and drives eviction:
+    after every write, files older than max_age go first, then the least
+    recently saved or served until the directory fits in max_bytes. Files
+    already in the directory at startup are adopted into the index, oldest
+    first, so a previously unbounded directory is trimmed too.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        max_age: Optional[float] = None,
+        compress: Optional[bool] = None
+    ):
+        """
+        Args:
+            directory: Where screenshots live (SCREENSHOT_DIR)
+            max_bytes: Disk budget (SCREENSHOT_MAX_MB, in MB; 0 = unbounded)
+            max_age: Seconds a file is kept (SCREENSHOT_MAX_AGE; 0 = forever)
+            compress: Store lossless WEBP, under half the size of the fast
+                PNG but about eight times slower to write (SCREENSHOT_COMPRESS)
+        """
+        if directory is None:
+            directory = os.getenv("SCREENSHOT_DIR", "/tmp/agent_screenshots")
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv("SCREENSHOT_MAX_MB", 512)) * 1024 * 1024)
+        if max_age is None:
+            max_age = float(os.getenv("SCREENSHOT_MAX_AGE", 24 * 3600))
+        if compress is None:
+            compress = os.getenv("SCREENSHOT_COMPRESS", "false").lower() in ("1", "true", "yes")
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.compress = compress
+
+        # name -> (bytes, created); least recently used first
+        self._index: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.writes = 0
+        self.dedup_hits = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._adopt()
+
+    def _adopt(self):
+        """Index the images already in the directory, oldest first"""
+        found = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file() and os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS:
+                    stat = entry.stat()
+                    found.append((stat.st_mtime, entry.name, stat.st_size))
+        for mtime, name, size in sorted(found):
+            self._index[name] = (size, mtime)
+            self._bytes += size
+        if found:
+            logger.info(f"Adopted {len(found)} screenshots ({self._bytes / 1e6:.1f} MB) in {self.directory}")
+            with self._lock:
+                self._evict()
+
+    def save(self, frame: Frame) -> str:
+        """
+        Store a frame (once per distinct screen) and return its path
+
+        Blocking: hashing and encoding take tens of milliseconds (more when
+        compressing), so call it from a worker thread on the request path.
+        """
+        extension = "webp" if self.compress else "png"
+        if frame.path is not None and os.path.dirname(frame.path) == self.directory:
+            # Stored before (by this store): skip hashing
+            name, path = os.path.basename(frame.path), frame.path
+        else:
+            name = f"screen_{content_digest(frame)}.{extension}"
+            path = os.path.join(self.directory, name)
+        with self._lock:
+            if name in self._index:
+                self._index.move_to_end(name)
+                self.dedup_hits += 1
+                frame.path = path
+                return path
+
+        if self.compress:
+            frame.image.save(path, format="WEBP", lossless=True, method=4)
+        else:
+            # Written on the request path: favour speed over file size
+            frame.image.save(path, format="PNG", compress_level=1)
+        size = os.path.getsize(path)
+
+        with self._lock:
+            if name not in self._index:
+                self._bytes += size
+            self._index[name] = (size, time.time())
+            self._index.move_to_end(name)
+            self.writes += 1
+            self._evict(keep=name)
+        frame.path = path
+        logger.debug(f"Stored screenshot {name} ({size / 1024:.0f} KB)")
+        return path
+
+    def path(self, name: str) -> Optional[str]:
+        """Path of a stored screenshot, or None if it is not (or no longer) stored"""
+        with self._lock:
+            if name not in self._index:
+                return None
+            self._index.move_to_end(name)
+        return os.path.join(self.directory, name)
+
+    def touch(self, name: str):
+        """Mark a screenshot as recently used"""
+        with self._lock:
+            if name in self._index:
+                self._index.move_to_end(name)
+
+    def media_type(self, name: str) -> str:
+        return IMAGE_EXTENSIONS.get(os.path.splitext(name)[1].lower(), "application/octet-stream")
+
+    def _evict(self, keep: Optional[str] = None):
+        """Drop expired files, then least recently used ones over budget (lock held)"""
+        if self.max_age > 0:
+            cutoff = time.time() - self.max_age
+            for name, (_, created) in list(self._index.items()):
+                if created < cutoff and name != keep:
+                    self._remove(name)
+        if self.max_bytes > 0:
+            for name in list(self._index):
+                if self._bytes <= self.max_bytes:
+                    break
+                if name != keep:
+                    self._remove(name)
+
+    def _remove(self, name: str):
+        size, _ = self._index.pop(name)
+        self._bytes -= size
+        self.evictions += 1
+        self.evicted_bytes += size
+        try:
+            os.unlink(os.path.join(self.directory, name))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Could not delete screenshot {name}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Usage and counters for /health"""
+        return {
+            "files": len(self._index),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "max_age": self.max_age,
+            "compress": self.compress,
+            "writes": self.writes,
+            "dedup_hits": self.dedup_hits,
+            "evictions": self.evictions,
+            "evicted_bytes": self.evicted_bytes
+        }
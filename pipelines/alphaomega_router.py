@@ -9,6 +9,13 @@ from pydantic import BaseModel, Field
 import httpx
 from datetime import datetime
 
+try:
+    # Precompiled rules shared with the MCP OpenAI bridge
+    from agent_s.mcp.intents import ROUTER_PARSER
+except ImportError:
+    # Pasted into OpenWebUI without the agent_s package; use the inline heuristics
+    ROUTER_PARSER = None
+
 
 class Pipeline:
     """Intelligent router for AlphaOmega multi-backend system"""
@@ -375,50 +382,105 @@ class Pipeline:
         messages: List[Dict],
         event_emitter: Any = None
     ) -> AsyncGenerator[str, None]:
-        """Route to Agent-S for computer use automation"""
+        """
+        Route to Agent-S for computer use automation
         
-        try:
+        Reads /action/stream and relays its progress as it happens: the
+        screen analysis is streamed into the reply token by token, and each
+        stage (capture, plan, every executed step) becomes a status event.
+        """
+        
+        async def status(description: str, done: bool = False):
             if event_emitter:
-                await event_emitter({
-                    "type": "status",
-                    "data": {"description": "Executing computer use action...", "done": False}
-                })
+                await event_emitter({"type": "status", "data": {"description": description, "done": done}})
+        
+        try:
+            await status("Capturing screen...")
             
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(
-                    f"{self.valves.AGENT_S_HOST}/action",
+            analysis_started = False
+            planned = 0
+            result = None
+            # No overall deadline: the stream shows progress, so only a stall is an error
+            timeout = httpx.Timeout(60.0, read=120.0)
+            async with httpx.AsyncClient(timeout=timeout) as client:
+                async with client.stream(
+                    "POST",
+                    f"{self.valves.AGENT_S_HOST}/action/stream",
                     json={
                         "prompt": message,
                         "messages": messages,
                         "safe_mode": True
-                    },
-                    timeout=60.0
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
+                    }
+                ) as response:
+                    if response.status_code != 200:
+                        await status("Agent-S request failed", done=True)
+                        yield f"Agent-S error: {response.status_code}"
+                        return
                     
-                    # Stream response
+                    async for line in response.aiter_lines():
+                        if not line.strip():
+                            continue
+                        event = json.loads(line)
+                        kind = event.get("event")
+                        
+                        if kind == "captured":
+                            await status("Analyzing screen...")
+                        elif kind == "analysis_token":
+                            if not analysis_started:
+                                analysis_started = True
+                                yield "**Screen analysis:**\n"
+                            yield event["text"]
+                        elif kind == "analysis":
+                            if not analysis_started:
+                                # Answered from the screen cache: no tokens came first
+                                analysis_started = True
+                                yield f"**Screen analysis:**\n{event['text']}"
+                            await status("Planning actions...")
+                        elif kind == "plan":
+                            planned = len(event["steps"])
+                            if planned:
+                                await status(f"Planned {planned} step{'s' if planned != 1 else ''}")
+                        elif kind == "step":
+                            mark = "✓" if event["success"] else "✗"
+                            await status(
+                                f"{mark} Step {event['index'] + 1}/{planned}: "
+                                f"{event['description']} ({event['total']:.1f}s)"
+                            )
+                        elif kind == "done":
+                            result = event["result"]
+                        elif kind == "error":
+                            await status("Action failed", done=True)
+                            yield f"\n\nError executing action: {event.get('detail')}"
+                            return
+            
+            if result is None:
+                await status("Action interrupted", done=True)
+                yield "\n\n⚠️ Agent-S closed the connection before finishing."
+                return
+            
+            if not result.get("success", True):
+                await status("Action not completed", done=True)
+                yield f"\n\n❌ {result.get('error') or 'Action failed'}"
+            else:
+                await status("Action complete", done=True)
+                if not analysis_started:
                     yield result.get("response", "Action completed")
-                    
-                    # Add screenshot if available
-                    if "screenshot" in result and result["screenshot"]:
-                        yield f"\n\n📸 Screenshot:\n![Screen]({result['screenshot']})"
-                    
-                    # Add actions taken
-                    if "actions_taken" in result and result["actions_taken"]:
-                        yield "\n\n**Actions taken:**\n"
-                        for action in result["actions_taken"]:
-                            yield f"- {action}\n"
-                            
-                elif response.status_code == 403:
-                    yield "⚠️ Action blocked by safety validator."
-                else:
-                    yield f"Agent-S error: {response.status_code}"
+            
+            # Add screenshot if available
+            if result.get("screenshot"):
+                yield f"\n\n📸 Screenshot:\n![Screen]({result['screenshot']})"
+            
+            # Add actions taken
+            if result.get("actions_taken"):
+                yield "\n\n**Actions taken:**\n"
+                for action in result["actions_taken"]:
+                    yield f"- {action}\n"
                     
         except httpx.ConnectError:
+            await status("Agent-S unavailable", done=True)
             yield "⚠️ Agent-S service is not available. Please ensure Agent-S is running."
         except Exception as e:
+            await status("Action failed", done=True)
             yield f"Error executing action: {str(e)}"
     
     async def _route_to_mcp(
@@ -471,6 +533,15 @@ class Pipeline:
     
     def _detect_mcp_tool(self, message: str) -> tuple:
         """Detect which MCP tool to call and extract parameters"""
+        if ROUTER_PARSER is None:
+            return self._detect_mcp_tool_inline(message)
+        intent = ROUTER_PARSER.parse(message)
+        if not intent:
+            return (None, {})
+        return (intent["tool"], intent["args"])
+    
+    def _detect_mcp_tool_inline(self, message: str) -> tuple:
+        """Keyword heuristics used when agent_s.mcp.intents is unavailable"""
         message_lower = message.lower()
         
         # Task management - more flexible patterns
@@ -1,12 +1,13 @@
 #!/bin/bash
 # AlphaOmega MCP Bridge Startup Script
-# Starts the MCP OpenAI Bridge for OpenWebUI integration
+# Starts the unified MCP bridge (OpenAI-compatible, tool server and REST
+# front-ends in one process) for OpenWebUI integration
 
 set -e
 
 SCRIPT_DIR="$( cd "$( dirname "${BASH_SOURCE[0]}" )" && pwd )"
 PROJECT_ROOT="$(dirname "$SCRIPT_DIR")"
-BRIDGE_SCRIPT="$PROJECT_ROOT/agent_s/mcp/openai_bridge.py"
+BRIDGE_MODULE="agent_s.mcp.bridge"
 LOG_FILE="$PROJECT_ROOT/logs/openai-bridge.log"
 PID_FILE="/tmp/mcp-openai-bridge.pid"
 
@@ -38,12 +39,12 @@ mkdir -p "$PROJECT_ROOT/logs"
 
 # Start the bridge
 echo "📦 Starting Python OpenAI Bridge..."
-echo "   Script: $BRIDGE_SCRIPT"
+echo "   Module: $BRIDGE_MODULE"
 echo "   Log: $LOG_FILE"
 echo ""
 
 cd "$PROJECT_ROOT"
-nohup python "$BRIDGE_SCRIPT" >> "$LOG_FILE" 2>&1 &
+nohup python -m "$BRIDGE_MODULE" >> "$LOG_FILE" 2>&1 &
 BRIDGE_PID=$!
 
 echo $BRIDGE_PID > "$PID_FILE"
@@ -71,6 +72,8 @@ if ps -p "$BRIDGE_PID" > /dev/null 2>&1; then
         echo "   URL: http://localhost:8002"
         echo "   Type: OpenAI"
         echo "   Model: mcp-assistant"
+        echo ""
+        echo "   Tool server (same process): http://localhost:8002/openapi.json"
         echo "========================================================================"
     else
         echo "⚠️  Bridge started but not responding yet"
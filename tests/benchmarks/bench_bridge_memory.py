@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark bridge memory: three bridge processes vs one unified bridge
+
+Starts the OpenAI, v2 and v1 bridges as separate uvicorn processes (the old
+deployment, each with its own MCP child), then the unified bridge serving
+all front-ends, against the fake MCP server. After a short warm-up of tool
+calls on every surface, reports the resident memory of each process tree
+(bridge plus MCP children) from /proc.
+
+Usage:
+    python tests/benchmarks/bench_bridge_memory.py [--server-args "--tools 76"] [--port 18300]
+"""
+import argparse
+import json
+import os
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+FAKE_SERVER = Path(__file__).resolve().parent / "fake_mcp_server.py"
+
+DEPLOYMENTS = {
+    "separate": [
+        ["agent_s.mcp.openai_bridge:app"],
+        ["agent_s.mcp.http_server_v2:app"],
+        ["agent_s.mcp.http_server:app"],
+    ],
+    "unified": [
+        ["--factory", "agent_s.mcp.bridge:create_app"],
+    ],
+}
+
+WARMUP = [
+    ("/tools/list_tasks/execute", {}),
+    ("/tools/list_tasks", {}),
+    ("/v1/chat/completions", {"messages": [{"role": "user", "content": "show my tasks"}]}),
+    ("/openapi.json", None),
+]
+
+
+def rss_kb(pid):
+    """Resident set size of a process and all its descendants"""
+    total = 0
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            total += next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+        children = Path(f"/proc/{pid}/task/{pid}/children").read_text().split()
+    except (OSError, StopIteration):
+        return total
+    return total + sum(rss_kb(int(child)) for child in children)
+
+
+def call(url, body=None):
+    data = None if body is None else json.dumps(body).encode()
+    request = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, response.read()
+    except OSError as e:
+        return getattr(e, "code", None), b""
+
+
+def wait_ready(base, process, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Bridge exited with {process.returncode}")
+        status, body = call(f"{base}/health")
+        if status == 200 and json.loads(body).get("mcp") == "running":
+            return
+        time.sleep(0.1)
+    raise RuntimeError("Bridge did not become ready")
+
+
+def measure(name, env, port, rounds):
+    processes = []
+    try:
+        for offset, target in enumerate(DEPLOYMENTS[name]):
+            base = f"http://127.0.0.1:{port + offset}"
+            process = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", *target, "--port", str(port + offset), "--log-level", "warning"],
+                cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+            processes.append((process, base))
+        for process, base in processes:
+            wait_ready(base, process)
+            for _ in range(rounds):
+                for path, body in WARMUP:
+                    call(f"{base}{path}", body)
+        time.sleep(0.5)
+        return [rss_kb(process.pid) for process, _ in processes]
+    finally:
+        for process, _ in processes:
+            process.terminate()
+            process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare memory of separate and unified MCP bridges")
+    parser.add_argument("--server-args", default="--tools 76 --latency-ms 1 --result-bytes 2048")
+    parser.add_argument("--rounds", type=int, default=50, help="Warm-up calls per surface")
+    parser.add_argument("--port", type=int, default=18300)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ,
+            MCP_SERVER_COMMAND=f"{shlex.quote(sys.executable)} {shlex.quote(str(FAKE_SERVER))} {args.server_args}",
+            MCP_TOOL_MANIFEST=str(Path(tmp) / "tools.json"),
+            PYTHONPATH=str(ROOT),
+        )
+        results = {name: measure(name, env, args.port, args.rounds) for name in DEPLOYMENTS}
+
+    print("Resident memory, bridge process trees including MCP children:")
+    for name, sizes in results.items():
+        detail = " + ".join(f"{kb / 1024:.1f}" for kb in sizes)
+        print(f"  {name:9s} {sum(sizes) / 1024:7.1f} MiB  ({detail})")
+    print(f"  unified / separate = {sum(results['unified']) / sum(results['separate']):.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark the MCP transport JSON codecs on multi-megabyte tool results
+
+Compares the old text-mode path (str line, strip, json.loads) with every
+available codec decoding a memoryview of the raw bytes, then times full
+tools/call round-trips through MCPStdioTransport with each codec.
+
+Usage:
+    python tests/benchmarks/bench_codec.py [--megabytes 1 4 16] [--repeat 5]
+"""
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import textwrap
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(ROOT))
+
+from agent_s.mcp.codec import available_codecs
+from agent_s.mcp.transport import MCPStdioTransport
+
+# Answers every request with a pre-serialized inventory of about `megabytes` MB
+SERVER = textwrap.dedent('''
+    import json, sys
+    sys.path.insert(0, sys.argv[1])
+    from tests.benchmarks.bench_codec import inventory_rows
+    result = None
+    for line in sys.stdin.buffer:
+        request = json.loads(line)
+        if result is None:
+            result = json.dumps({"rows": inventory_rows(request["params"]["arguments"]["megabytes"])})
+        sys.stdout.write('{"jsonrpc": "2.0", "id": %d, "result": %s}\\n' % (request["id"], result))
+        sys.stdout.flush()
+''')
+
+
+def inventory_rows(megabytes: float):
+    """Inventory rows shaped like the mcpart list_inventory tool output"""
+    row = {
+        "id": 0, "sku": "CAN-16x20-LIN", "name": "Stretched linen canvas 16x20",
+        "category": "canvas", "quantity": 12, "reorder_level": 5,
+        "unit_cost": 18.75, "price": 39.0, "supplier": "Blick Art Materials",
+        "location": "Shelf B3", "notes": "Gallery wrap, primed twice", "updated": "2025-01-14T09:30:00Z"
+    }
+    size = len(json.dumps(row))
+    return [dict(row, id=i, quantity=i % 40) for i in range(int(megabytes * 1e6 / size))]
+
+
+def inventory_response(request_id: int, megabytes: float):
+    return {"jsonrpc": "2.0", "id": request_id, "result": {"rows": inventory_rows(megabytes)}}
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def bench_codecs(megabytes, repeat):
+    message = inventory_response(1, megabytes)
+    raw = json.dumps(message).encode("utf-8") + b"\n"
+    print(f"\n{len(raw) / 1e6:.1f} MB line")
+
+    legacy_decode = best_of(lambda: json.loads(raw.decode("utf-8").strip()), repeat)
+    legacy_encode = best_of(lambda: (json.dumps(message) + "\n").encode("utf-8"), repeat)
+    print(f"  {'text json (old)':18s} decode {legacy_decode:8.1f} ms   encode {legacy_encode:8.1f} ms")
+
+    for name, codec in available_codecs().items():
+        def decode():
+            with memoryview(raw) as view, view[:-1] as line:
+                codec.decode(line)
+        print(f"  {name:18s} decode {best_of(decode, repeat):8.1f} ms   "
+              f"encode {best_of(lambda: codec.encode(message), repeat):8.1f} ms")
+
+
+async def bench_round_trips(megabytes, repeat):
+    with tempfile.TemporaryDirectory() as tmp:
+        script = Path(tmp) / "server.py"
+        script.write_text(SERVER)
+        print(f"\ntools/call round-trip, {megabytes} MB result")
+        for name, codec in available_codecs().items():
+            transport = MCPStdioTransport([sys.executable, str(script), str(ROOT)], timeout=60.0, codec=codec)
+            transport.start()
+            try:
+                params = {"name": "list_inventory", "arguments": {"megabytes": megabytes}}
+                await transport.request("tools/call", params)  # Server builds its payload
+                timings = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    await transport.request("tools/call", params)
+                    timings.append(time.perf_counter() - start)
+            finally:
+                transport.stop()
+            print(f"  {name:18s} {min(timings) * 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MCP transport JSON codecs")
+    parser.add_argument("--megabytes", type=float, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for megabytes in args.megabytes:
+        bench_codecs(megabytes, args.repeat)
+    asyncio.run(bench_round_trips(max(args.megabytes), args.repeat))
+
+
+if __name__ == "__main__":
+    main()
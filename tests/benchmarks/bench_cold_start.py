@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark openai_bridge cold start
+
+Launches the bridge under uvicorn against a fake MCP server that takes
+--init-seconds to answer initialize (node loading mcpart), and reports how
+long until /health answers, until /tools lists tools, and until the first
+tool call succeeds. Runs once without a tool manifest and once with the
+manifest the first run left behind.
+
+Usage:
+    python tests/benchmarks/bench_cold_start.py [--init-seconds 1.5] [--port 18002]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+
+SERVER = textwrap.dedent('''
+    import json, sys, time
+
+    init_seconds = float(sys.argv[1])
+    tools = [{"name": f"tool_{i}", "description": f"Tool {i}", "inputSchema": {"type": "object"}} for i in range(40)]
+    for line in sys.stdin:
+        request = json.loads(line)
+        if "id" not in request:
+            continue
+        if request["method"] == "initialize":
+            time.sleep(init_seconds)
+            result = {"serverInfo": {"name": "bench"}}
+        elif request["method"] == "tools/list":
+            result = {"tools": tools}
+        else:
+            result = {"content": [{"type": "text", "text": "ok"}]}
+        sys.stdout.write(json.dumps({"jsonrpc": "2.0", "id": request["id"], "result": result}) + "\\n")
+        sys.stdout.flush()
+''')
+
+
+def get(url, data=None):
+    try:
+        request = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return json.loads(response.read())
+    except OSError:
+        return None
+
+
+def run_once(port, env):
+    base = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "agent_s.mcp.openai_bridge:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env
+    )
+    marks = {}
+    try:
+        while "tools" not in marks:
+            body = get(f"{base}/tools")
+            if body is not None:
+                marks.setdefault("health", time.perf_counter() - start)
+                if body["count"]:
+                    marks["tools"] = time.perf_counter() - start
+            time.sleep(0.01)
+        body = get(f"{base}/tools/tool_0/execute", data=b"{}")
+        marks["first call"] = time.perf_counter() - start
+        assert body and body["success"], body
+    finally:
+        process.terminate()
+        process.wait()
+    return marks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MCP bridge cold start")
+    parser.add_argument("--init-seconds", type=float, default=1.5)
+    parser.add_argument("--port", type=int, default=18002)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        script = Path(tmp) / "server.py"
+        script.write_text(SERVER)
+        env = dict(
+            os.environ,
+            MCP_SERVER_COMMAND=f"{sys.executable} {script} {args.init_seconds}",
+            MCP_TOOL_MANIFEST=str(Path(tmp) / "tools.json"),
+        )
+        print(f"MCP initialize takes {args.init_seconds}s; seconds from process launch:")
+        for label in ("no manifest", "with manifest"):
+            marks = run_once(args.port, env)
+            print(f"  {label:14s} " + "   ".join(f"{name} {seconds:6.2f}" for name, seconds in marks.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark Agent-S input execution: per-action steps vs batched keystrokes
+
+Runs a form-filling plan (a click, then typed fields separated by Tab and a
+long note) through ExecutionEngine on the recording input backend, against
+a stand-in screen that echoes every input event, so it needs no display:
+
+    per action   each action executed and settled on its own, typed
+                 (the behaviour before keyboard batching and paste)
+    batched      consecutive keyboard actions in one batch, long text pasted
+
+for each speed profile, and reports the engine's own time (probing and
+waiting for the screen), the input time the events would take on a display
+(typing intervals, tweens, pauses; pyautogui's sleeps) and their sum.
+
+Under Xvfb the same plan can drive a real display with
+AGENT_INPUT_BACKEND=pyautogui; this script keeps to the recorder so the
+numbers are comparable across machines.
+
+Usage:
+    python tests/benchmarks/bench_input.py [--profiles instant,human,demo] [--note-length 200]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from agent_s.actions.backend import RecordingBackend
+from agent_s.actions.engine import ExecutionEngine
+from agent_s.actions.keyboard import KeyboardAction
+from agent_s.actions.mouse import MouseAction
+from agent_s.vision.frame import Frame
+
+
+class EchoScreen:
+    """A screen that shows one more mark for every input event recorded"""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def grab(self, region=None):
+        img = Image.new("RGB", (640, 360), color="white")
+        draw = ImageDraw.Draw(img)
+        for i in range(len(self.backend.events)):
+            x, y = 10 + (i % 30) * 20, 10 + (i // 30) * 20
+            draw.rectangle((x, y, x + 12, y + 12), fill="black")
+        return Frame(img)
+
+
+def form_plan(note_length):
+    def key(name):
+        return {"type": "keyboard", "params": {"action": "press", "key": name}, "description": f"Press {name}"}
+
+    def text(value):
+        return {"type": "keyboard", "params": {"action": "type", "text": value}, "description": "Type"}
+
+    note = ("Please deliver to the back door. " * 20)[:note_length]
+    return [
+        {"type": "mouse", "params": {"action": "click", "x": 200, "y": 120}, "description": "Click the name field"},
+        text("Ada "), text("Lovelace"), key("tab"),
+        text("ada@example.com"), key("tab"),
+        text("12 St James's Square, London SW1Y 4JH"), key("tab"),
+        text(note), key("enter"),
+    ]
+
+
+async def run_plan(plan, profile, batched):
+    backend = RecordingBackend()
+    screen = EchoScreen(backend)
+    keyboard = KeyboardAction(backend, allow_paste=batched, paste_min_chars=40)
+    engine = ExecutionEngine(screen, MouseAction(backend), keyboard, quiet=0.1, poll_min=0.02, poll_max=0.1)
+    # As learned after a few actions on a responsive UI
+    engine.response_latency = 0.05
+
+    start = time.perf_counter()
+    if batched:
+        reports = await engine.run(plan, profile=profile)
+    else:
+        reports = []
+        for i, action in enumerate(plan):
+            report = await engine.step(i, action, profile)
+            reports.append(report)
+    wall = time.perf_counter() - start
+    assert all(r["success"] for r in reports), reports
+    return wall, backend.elapsed, len(backend.events)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched keyboard/mouse execution")
+    parser.add_argument("--profiles", default="instant,human,demo")
+    parser.add_argument("--note-length", type=int, default=200)
+    args = parser.parse_args()
+
+    plan = form_plan(args.note_length)
+    print(f"{len(plan)}-action form plan, {sum(len(a['params'].get('text', '')) for a in plan)} characters typed")
+    print(f"{'profile':<8} {'mode':<11} {'engine':>8} {'input':>8} {'total':>8} {'events':>7}")
+    for profile in args.profiles.split(","):
+        for batched in (False, True):
+            wall, simulated, events = asyncio.run(run_plan(plan, profile, batched))
+            mode = "batched" if batched else "per action"
+            print(f"{profile:<8} {mode:<11} {wall:>7.2f}s {simulated:>7.2f}s {wall + simulated:>7.2f}s {events:>7}")
+
+
+if __name__ == "__main__":
+    main()
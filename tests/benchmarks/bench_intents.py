@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark the MCP intent parser
+
+Runs every message of tests/data/intent_corpus.jsonl through its parser and
+reports accuracy and per-message latency. For router messages the inline
+keyword heuristics of pipelines/alphaomega_router.py are timed as a baseline.
+
+Usage:
+    python tests/benchmarks/bench_intents.py [--rounds 2000]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "pipelines"))
+
+from agent_s.mcp.intents import BRIDGE_PARSER, ROUTER_PARSER
+
+CORPUS = ROOT / "tests" / "data" / "intent_corpus.jsonl"
+PARSERS = {"bridge": BRIDGE_PARSER, "router": ROUTER_PARSER}
+
+
+def time_per_call(fn, messages, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for message in messages:
+            fn(message)
+    return (time.perf_counter() - start) / (rounds * len(messages)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the MCP intent parser")
+    parser.add_argument("--rounds", type=int, default=2000, help="Passes over the corpus")
+    args = parser.parse_args()
+
+    with open(CORPUS) as f:
+        corpus = [json.loads(line) for line in f if line.strip()]
+
+    for name, intent_parser in PARSERS.items():
+        cases = [c for c in corpus if c["parser"] == name]
+        correct = 0
+        for case in cases:
+            intent = intent_parser.parse(case["text"])
+            got = (intent["tool"], intent["args"]) if intent else (None, {})
+            correct += got == (case["tool"], case["args"])
+        messages = [c["text"] for c in cases]
+        micros = time_per_call(intent_parser.parse, messages, args.rounds)
+        print(f"{name:7s} accuracy {correct}/{len(cases)}  {micros:6.2f} µs/message")
+
+    try:
+        from alphaomega_router import Pipeline
+    except ImportError as e:
+        print(f"router baseline skipped: {e}")
+        return
+    pipeline = Pipeline()
+    cases = [c for c in corpus if c["parser"] == "router"]
+    correct = sum(pipeline._detect_mcp_tool_inline(c["text"]) == (c["tool"], c["args"]) for c in cases)
+    micros = time_per_call(pipeline._detect_mcp_tool_inline, [c["text"] for c in cases], args.rounds)
+    print(f"inline  accuracy {correct}/{len(cases)}  {micros:6.2f} µs/message (router baseline)")
+
+
+if __name__ == "__main__":
+    main()
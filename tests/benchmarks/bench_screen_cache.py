@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark the perceptual-hash screen cache on synthetic frame differences
+
+Takes a synthetic desktop capture (see bench_screenshot_pipeline.py) and a
+set of edited copies, from pixel-identical to a different window layout,
+and reports for each hash size the dHash time, the Hamming distance of
+every edit from the original and whether the cache would treat it as the
+same screen. Then times a cached analyze() against one that goes to a
+stand-in model with a fixed latency.
+
+Usage:
+    python tests/benchmarks/bench_screen_cache.py [--size 2560x1440] [--model-latency 8.0]
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+from PIL import ImageDraw
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from agent_s.vision.analyzer import VisionAnalyzer
+from agent_s.vision.frame import Frame
+from agent_s.vision.screen_cache import ScreenCache, dhash, hamming
+from bench_screenshot_pipeline import synthetic_screen
+
+
+def edited(img, draw_fn):
+    copy = img.copy()
+    draw_fn(ImageDraw.Draw(copy), copy.width, copy.height)
+    return copy
+
+
+def edits(img):
+    """(name, image) pairs, roughly in order of how much changed"""
+    return [
+        ("identical", img.copy()),
+        ("cursor blink", edited(img, lambda d, w, h: d.rectangle((w // 2, h // 2, w // 2 + 1, h // 2 + 16), fill=0))),
+        ("clock tick", edited(img, lambda d, w, h: d.text((w - 80, h - 20), "12:01", fill=(255, 255, 255)))),
+        ("typed text", edited(img, lambda d, w, h: d.text((w // 8, h // 5), "hello world typed", fill=0))),
+        ("toast", edited(img, lambda d, w, h: d.rectangle((w - 420, 40, w - 40, 140), fill=(30, 30, 30)))),
+        ("dialog", edited(img, lambda d, w, h: d.rectangle(
+            (w // 2 - 300, h // 2 - 200, w // 2 + 300, h // 2 + 200), fill=(230, 230, 230), outline=0
+        ))),
+        ("other windows", synthetic_screen(img.width, img.height, seed=3)),
+    ]
+
+
+def hash_table(img, cases, max_distance):
+    for hash_size in (8, 16, 32):
+        times = []
+        for _ in range(10):
+            start = time.perf_counter()
+            base = dhash(img, hash_size)
+            times.append(time.perf_counter() - start)
+        bits = hash_size * hash_size
+        print(f"  dHash {hash_size}x{hash_size} ({bits} bits), {statistics.median(times) * 1000:.1f} ms per frame")
+        for name, case in cases:
+            distance = hamming(base, dhash(case, hash_size))
+            verdict = "same screen" if distance <= max_distance else "changed"
+            print(f"    {name:14s} distance {distance:4d}  {verdict}")
+
+
+async def analyze_timings(img, model_latency, runs):
+    analyzer = VisionAnalyzer(cache=ScreenCache(ttl=60))
+
+    async def model(**kwargs):
+        await asyncio.sleep(model_latency)
+        return {"message": {"content": "A desktop with several windows"}}
+
+    with patch.object(analyzer.client, "chat", new=model):
+        start = time.perf_counter()
+        await analyzer.analyze(Frame(img), "What is on the screen?")
+        miss = time.perf_counter() - start
+        hits = []
+        for _ in range(runs):
+            frame = Frame(img.copy())
+            start = time.perf_counter()
+            await analyzer.analyze(frame, "What is on the screen?")
+            hits.append(time.perf_counter() - start)
+    return miss, statistics.median(hits), analyzer.cache.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the perceptual-hash screen cache")
+    parser.add_argument("--size", default="2560x1440")
+    parser.add_argument("--model-latency", type=float, default=8.0, help="Seconds per stand-in model call")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.split("x"))
+    img = synthetic_screen(width, height)
+    max_distance = ScreenCache().max_distance
+    print(f"{width}x{height} synthetic screen, same-screen threshold {max_distance} bits:")
+    hash_table(img, edits(img), max_distance)
+
+    miss, hit, stats = asyncio.run(analyze_timings(img, args.model_latency, args.runs))
+    print(f"analyze(): model call {miss * 1000:.0f} ms, cache hit p50 {hit * 1000:.1f} ms "
+          f"(hit rate {stats['hit_rate']:.2f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark the Agent-S screenshot pipeline: disk round-trips vs in memory
+
+Builds a synthetic desktop-like capture (windows, text, an image) as the raw
+BGRA buffer mss returns, then times what one /action does with it before
+the vision model sees the image:
+
+    disk    the old path: mss PNG to SCREENSHOT_DIR, re-open, Lanczos resize,
+            write _optimized.png, read it back and base64 it for Ollama
+    memory  Frame.from_bgra, resize and encode once, base64 the bytes
+    memory+save  as memory, plus the full PNG written for include_screenshot
+
+and reports latency, bytes written to disk and bytes sent to the model.
+
+Usage:
+    python tests/benchmarks/bench_screenshot_pipeline.py [--size 2560x1440] [--runs 20]
+        [--format JPEG] [--quality 85]
+"""
+import argparse
+import base64
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import mss.tools
+from mss.screenshot import ScreenShot
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from agent_s.vision.frame import Frame
+
+
+def synthetic_screen(width, height, seed=0):
+    """A desktop-ish image: flat windows with text rows and one noisy photo"""
+    rng = random.Random(seed)
+    img = Image.new("RGB", (width, height), (40, 44, 52))
+    draw = ImageDraw.Draw(img)
+    for _ in range(6):
+        x, y = rng.randrange(0, width - 400), rng.randrange(0, height - 300)
+        w, h = rng.randrange(400, width // 2), rng.randrange(300, height // 2)
+        draw.rectangle((x, y, x + w, y + h), fill=(245, 245, 245), outline=(90, 90, 90))
+        draw.rectangle((x, y, x + w, y + 28), fill=(60, 120, 200))
+        for row in range(y + 40, y + h - 16, 18):
+            text = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz     ") for _ in range(w // 7))
+            draw.text((x + 8, row), text, fill=(20, 20, 20))
+    photo = Image.effect_noise((width // 5, height // 5), 60).convert("RGB")
+    img.paste(photo, (width - photo.width - 40, height - photo.height - 40))
+    return img
+
+
+def as_mss_shot(img):
+    """The image as the ScreenShot mss.grab() would return"""
+    data = bytearray(img.tobytes("raw", "BGRX"))
+    return ScreenShot(data, {"left": 0, "top": 0, "width": img.width, "height": img.height})
+
+
+def disk_path(shot, directory):
+    """Pre-change pipeline; returns (payload for Ollama, bytes written)"""
+    path = os.path.join(directory, f"screen_{time.time_ns()}.png")
+    mss.tools.to_png(shot.rgb, shot.size, output=path)
+    img = Image.open(path)
+    img.thumbnail((1280, 720), Image.Resampling.LANCZOS)
+    optimized = path.replace(".png", "_optimized.png")
+    img.save(optimized, optimize=True, quality=85)
+    payload = base64.b64encode(Path(optimized).read_bytes())
+    return payload, os.path.getsize(path) + os.path.getsize(optimized)
+
+
+def memory_path(shot, directory, fmt, quality, save):
+    frame = Frame.from_bgra(shot.bgra, shot.size)
+    payload = base64.b64encode(frame.encode(fmt, quality))
+    written = os.path.getsize(frame.save(directory)) if save else 0
+    return payload, written
+
+
+def run(label, fn, runs):
+    times, written, sent = [], 0, 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        payload, nbytes = fn()
+        times.append(time.perf_counter() - start)
+        written, sent = nbytes, len(payload)
+    print(f"  {label:13s} p50 {statistics.median(times) * 1000:7.1f} ms   max {max(times) * 1000:7.1f} ms   "
+          f"disk {written / 1024:7.1f} KiB   to model {sent / 1024:6.1f} KiB (base64)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Agent-S screenshot pipeline")
+    parser.add_argument("--size", default="2560x1440")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--format", default="JPEG")
+    parser.add_argument("--quality", type=int, default=85)
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.split("x"))
+    shot = as_mss_shot(synthetic_screen(width, height))
+    print(f"{width}x{height} capture, model image {args.format} q{args.quality}, {args.runs} runs per path:")
+    with tempfile.TemporaryDirectory() as tmp:
+        run("disk", lambda: disk_path(shot, tmp), args.runs)
+        run("memory", lambda: memory_path(shot, tmp, args.format, args.quality, False), args.runs)
+        run("memory+save", lambda: memory_path(shot, tmp, args.format, args.quality, True), args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Fake MCP stdio server for load-testing the bridges without mcpart
+
+Speaks enough MCP (initialize, tools/list, tools/call, ping) for the
+bridges, with a configurable tool count, latency distribution, result
+size and error rate. Calls are answered concurrently, like mcpart's async
+handlers, so the bridge's in-flight window is what limits throughput.
+
+Usage:
+    python tests/benchmarks/fake_mcp_server.py [--tools 76] [--latency-ms 5]
+        [--latency-dist lognormal] [--result-bytes 2048] [--error-rate 0.01]
+
+    MCP_SERVER_COMMAND="python tests/benchmarks/fake_mcp_server.py --tools 76" \
+        python agent_s/mcp/openai_bridge.py
+"""
+import argparse
+import json
+import math
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Real mcpart tool names first, so chat intents and the result cache see familiar tools
+MCPART_TOOLS = [
+    ("list_tasks", "List tasks, optionally filtered by status"),
+    ("add_task", "Create a new task"),
+    ("complete_task", "Mark a task as completed"),
+    ("search_notes", "Search notes by keyword"),
+    ("list_notes", "List recent notes"),
+    ("check_inventory", "Look up stock for an item"),
+    ("list_inventory", "List inventory items"),
+    ("list_expenses", "List expenses"),
+    ("list_customers", "List customers"),
+]
+
+
+def make_tools(count):
+    tools = []
+    for i in range(count):
+        name, description = MCPART_TOOLS[i] if i < len(MCPART_TOOLS) else (f"tool_{i}", f"Synthetic tool {i}")
+        tools.append({
+            "name": name,
+            "description": description,
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "query": {"type": "string", "description": "Free-text filter"},
+                    "limit": {"type": "integer", "minimum": 1, "maximum": 1000},
+                    "n": {"type": "integer", "description": "Request number (makes calls distinct)"}
+                }
+            }
+        })
+    return tools
+
+
+def latency_sampler(kind, mean_ms, jitter_ms, rng):
+    """Seconds to wait before answering a call"""
+    mean, jitter = mean_ms / 1000, jitter_ms / 1000
+    if kind == "fixed":
+        return lambda: mean
+    if kind == "uniform":
+        return lambda: max(0.0, rng.uniform(mean - jitter, mean + jitter))
+    if kind == "exponential":
+        return lambda: rng.expovariate(1 / mean) if mean > 0 else 0.0
+    # lognormal: mean as given, jitter as the standard deviation (long tail)
+    if mean <= 0:
+        return lambda: 0.0
+    sigma2 = math.log(1 + (jitter / mean) ** 2) if jitter else 0.0
+    mu = math.log(mean) - sigma2 / 2
+    return lambda: rng.lognormvariate(mu, math.sqrt(sigma2))
+
+
+def make_rows(result_bytes):
+    row = {"id": 0, "title": "Order stretched canvas 16x20", "status": "open", "due": "2025-01-17", "tags": ["studio"]}
+    count = max(1, result_bytes // len(json.dumps(row)))
+    return [dict(row, id=i) for i in range(count)]
+
+
+class FakeServer:
+    def __init__(self, args):
+        self.tools = make_tools(args.tools)
+        self.names = {t["name"] for t in self.tools}
+        self.rng = random.Random(args.seed)
+        self.latency = latency_sampler(args.latency_dist, args.latency_ms, args.latency_jitter_ms, self.rng)
+        self.error_rate = args.error_rate
+        self.text = json.dumps(make_rows(args.result_bytes))
+        self.out_lock = threading.Lock()
+        self.pool = ThreadPoolExecutor(max_workers=args.workers)
+
+    def send(self, message):
+        data = json.dumps(message) + "\n"
+        with self.out_lock:
+            sys.stdout.write(data)
+            sys.stdout.flush()
+
+    def handle(self, request):
+        method = request.get("method")
+        if "id" not in request:
+            return
+        if method == "initialize":
+            result = {"protocolVersion": "2024-11-05", "capabilities": {"tools": {}},
+                      "serverInfo": {"name": "fake-mcpart", "version": "0.0.0"}}
+        elif method == "tools/list":
+            result = {"tools": self.tools}
+        elif method == "ping":
+            result = {}
+        elif method == "tools/call":
+            self.pool.submit(self.call, request)
+            return
+        else:
+            self.send({"jsonrpc": "2.0", "id": request["id"], "error": {"code": -32601, "message": f"Unknown method {method}"}})
+            return
+        self.send({"jsonrpc": "2.0", "id": request["id"], "result": result})
+
+    def call(self, request):
+        time.sleep(self.latency())
+        name = request["params"].get("name")
+        if name not in self.names:
+            result = {"content": [{"type": "text", "text": f"Unknown tool: {name}"}], "isError": True}
+        elif self.rng.random() < self.error_rate:
+            result = {"content": [{"type": "text", "text": "Simulated failure"}], "isError": True}
+        else:
+            result = {"content": [{"type": "text", "text": self.text}]}
+        self.send({"jsonrpc": "2.0", "id": request["id"], "result": result})
+
+    def serve(self):
+        for line in sys.stdin:
+            if line.strip():
+                self.handle(json.loads(line))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake MCP stdio server")
+    parser.add_argument("--tools", type=int, default=76)
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Mean tools/call latency")
+    parser.add_argument("--latency-jitter-ms", type=float, default=2.0, help="Spread (stddev for lognormal)")
+    parser.add_argument("--latency-dist", choices=["fixed", "uniform", "exponential", "lognormal"], default="lognormal")
+    parser.add_argument("--result-bytes", type=int, default=2048, help="Approximate size of each result")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of calls returning isError")
+    parser.add_argument("--workers", type=int, default=64, help="Calls answered concurrently")
+    parser.add_argument("--seed", type=int, default=0)
+    FakeServer(parser.parse_args()).serve()
+
+
+if __name__ == "__main__":
+    main()
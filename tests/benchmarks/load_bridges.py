@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Load-test the MCP bridges against the fake MCP stdio server
+
+Starts each bridge under uvicorn with MCP_SERVER_COMMAND pointing at
+fake_mcp_server.py, then drives tool execution, chat completions (OpenAI
+bridge only) and /openapi.json at each concurrency level for a fixed
+duration. Every (bridge, endpoint, concurrency) cell becomes one row of the
+JSON and CSV reports, so runs from different commits can be diffed.
+
+Usage:
+    python tests/benchmarks/load_bridges.py [--bridges unified openai v2 v1]
+        [--concurrency 1 4 16 64] [--duration 5] [--out load-report]
+        [--server-args "--latency-ms 5 --result-bytes 2048"] [--cache]
+"""
+import argparse
+import asyncio
+import csv
+import itertools
+import json
+import os
+import platform
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+FAKE_SERVER = Path(__file__).resolve().parent / "fake_mcp_server.py"
+
+BRIDGES = {
+    "unified": {"app": "agent_s.mcp.bridge:create_app", "factory": True, "execute": "/tools/{tool}/execute", "chat": True},
+    "openai": {"app": "agent_s.mcp.openai_bridge:app", "execute": "/tools/{tool}/execute", "chat": True},
+    "v2": {"app": "agent_s.mcp.http_server_v2:app", "execute": "/tools/{tool}", "chat": False},
+    "v1": {"app": "agent_s.mcp.http_server:app", "execute": "/tools/{tool}", "chat": False},
+}
+
+FIELDS = [
+    "bridge", "endpoint", "concurrency", "duration_s", "requests", "errors", "error_rate",
+    "rps", "mean_ms", "p50_ms", "p90_ms", "p99_ms", "max_ms"
+]
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(bridge, endpoint, concurrency, elapsed, latencies, errors):
+    latencies.sort()
+    total = len(latencies) + errors
+    ms = [x * 1000 for x in latencies]
+    return {
+        "bridge": bridge,
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 3),
+        "requests": total,
+        "errors": errors,
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(sum(ms) / len(ms), 3) if ms else None,
+        "p50_ms": round(percentile(ms, 0.50), 3) if ms else None,
+        "p90_ms": round(percentile(ms, 0.90), 3) if ms else None,
+        "p99_ms": round(percentile(ms, 0.99), 3) if ms else None,
+        "max_ms": round(ms[-1], 3) if ms else None,
+    }
+
+
+def endpoint_requests(bridge, tool):
+    """(endpoint label, function building the next request) for a bridge"""
+    spec = BRIDGES[bridge]
+    counter = itertools.count()
+    execute = spec["execute"].format(tool=tool)
+    targets = [
+        ("execute", lambda: ("POST", execute, {"n": next(counter)})),
+        ("openapi", lambda: ("GET", "/openapi.json", None)),
+    ]
+    if spec["chat"]:
+        targets.append(("chat", lambda: ("POST", "/v1/chat/completions", {
+            "model": "mcp-bridge", "messages": [{"role": "user", "content": "show my tasks"}]
+        })))
+    return targets
+
+
+async def drive(client, make_request, concurrency, duration):
+    """Run `concurrency` closed-loop workers for `duration` seconds"""
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            method, path, body = make_request()
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                ok = response.status_code < 400 and _succeeded(response)
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - started, latencies, errors
+
+
+def _succeeded(response):
+    if not response.headers.get("content-type", "").startswith("application/json"):
+        return True
+    body = response.json()
+    return not (isinstance(body, dict) and body.get("success") is False)
+
+
+async def wait_ready(base, process, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base, timeout=2.0) as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"Bridge exited with {process.returncode}")
+            try:
+                health = (await client.get("/health")).json()
+                if health.get("mcp") == "running" or (health.get("mcp_running") and "mcp" not in health):
+                    return
+            except (httpx.HTTPError, ValueError):
+                pass
+            await asyncio.sleep(0.1)
+    raise RuntimeError("Bridge did not become ready")
+
+
+async def run_bridge(bridge, args, port, env):
+    base = f"http://127.0.0.1:{port}"
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", BRIDGES[bridge]["app"], "--port", str(port), "--log-level", "warning",
+         *(["--factory"] if BRIDGES[bridge].get("factory") else [])],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    rows = []
+    try:
+        await wait_ready(base, process)
+        limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+        async with httpx.AsyncClient(base_url=base, timeout=30.0, limits=limits) as client:
+            for endpoint, make_request in endpoint_requests(bridge, args.tool):
+                for concurrency in args.concurrency:
+                    await drive(client, make_request, concurrency, min(0.5, args.duration))  # Warm up
+                    row = summarize(bridge, endpoint, concurrency, *await drive(client, make_request, concurrency, args.duration))
+                    rows.append(row)
+                    print(f"  {bridge:7s} {endpoint:8s} c={concurrency:<4d} {row['rps']:9.1f} req/s  "
+                          f"p50 {row['p50_ms']} ms  p99 {row['p99_ms']} ms  errors {row['errors']}")
+    finally:
+        process.terminate()
+        process.wait()
+    return rows
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_reports(out, rows, meta):
+    out.parent.mkdir(parents=True, exist_ok=True)
+    json_path, csv_path = out.with_suffix(".json"), out.with_suffix(".csv")
+    json_path.write_text(json.dumps({"meta": meta, "results": rows}, indent=2))
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"\nWrote {json_path} and {csv_path}")
+
+
+async def main_async(args):
+    server_command = f"{shlex.quote(sys.executable)} {shlex.quote(str(FAKE_SERVER))} {args.server_args}"
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ,
+            MCP_SERVER_COMMAND=server_command,
+            MCP_TOOL_MANIFEST=str(Path(tmp) / "tools.json"),
+            MCP_SLOW_CALL_SECONDS="0",
+            PYTHONPATH=str(ROOT),
+        )
+        if not args.cache:
+            env["MCP_CACHE_TTL"] = "0"
+        for i, bridge in enumerate(args.bridges):
+            rows += await run_bridge(bridge, args, args.port + i, env)
+
+    meta = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "server_args": args.server_args,
+        "tool": args.tool,
+        "cache": args.cache,
+        "duration_s": args.duration,
+    }
+    write_reports(Path(args.out), rows, meta)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the MCP bridges with a fake MCP server")
+    parser.add_argument("--bridges", nargs="+", choices=list(BRIDGES), default=list(BRIDGES))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per concurrency level")
+    parser.add_argument("--tool", default="list_tasks")
+    parser.add_argument("--server-args", default="--tools 76 --latency-ms 5 --result-bytes 2048",
+                        help="Arguments for fake_mcp_server.py")
+    parser.add_argument("--cache", action="store_true", help="Leave the bridges' result cache on")
+    parser.add_argument("--port", type=int, default=18100)
+    parser.add_argument("--out", default="load-report", help="Report path without extension")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""
+Unit tests for the Agent-S server
+"""
+import asyncio
+import json
+
+import httpx
+import pytest
+from unittest.mock import Mock, patch
+from PIL import Image
+
+from agent_s import server
+from agent_s.actions.backend import RecordingBackend
+from agent_s.actions.engine import ExecutionEngine
+from agent_s.actions.keyboard import KeyboardAction
+from agent_s.actions.mouse import MouseAction
+from agent_s.actions.scheduler import JobScheduler
+from agent_s.planning.planner import ActionPlanner
+from agent_s.vision.analyzer import VisionAnalyzer
+from agent_s.vision.frame import Frame
+from agent_s.vision.screenshot_store import ScreenshotStore
+
+
+@pytest.fixture
+def slow_vision(monkeypatch, tmp_path):
+    """Wire the server to a vision model that answers only when released"""
+    analyzer = VisionAnalyzer(ollama_host="http://localhost:11434", model="llava:34b")
+    release = asyncio.Event()
+    
+    async def chat(**kwargs):
+        await release.wait()
+        return {'message': {'content': 'A quiet desktop'}}
+    
+    screen = Mock(screenshot_dir="/tmp/agent_screenshots")
+    screen.grab.return_value = Frame(Image.new('RGB', (1920, 1080), color='gray'))
+    monkeypatch.setattr(server, "vision_analyzer", analyzer)
+    monkeypatch.setattr(server, "screen_action", screen)
+    monkeypatch.setattr(server, "safety_validator", Mock(validate=Mock(return_value={"safe": True})))
+    monkeypatch.setattr(server, "action_planner", ActionPlanner(client=Mock(), model="stub"))
+    backend = RecordingBackend()
+    monkeypatch.setattr(server, "execution_engine", ExecutionEngine(
+        screen, MouseAction(backend), KeyboardAction(backend), step_timeout=0.05
+    ))
+    monkeypatch.setattr(server, "job_scheduler", JobScheduler())
+    monkeypatch.setattr(server, "screenshot_store", ScreenshotStore(str(tmp_path / "screens"), compress=False))
+    with patch.object(analyzer.client, 'chat', new=chat):
+        yield release
+
+
+@pytest.mark.asyncio
+async def test_health_responsive_during_vision_analysis(slow_vision):
+    """/health answers while /action is waiting on the vision model"""
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://agent-s") as client:
+        action = asyncio.create_task(client.post(
+            "/action", json={"prompt": "what's on my screen", "include_screenshot": False}
+        ))
+        await asyncio.sleep(0.1)
+        
+        health = await asyncio.wait_for(client.get("/health"), timeout=1.0)
+        
+        assert health.status_code == 200
+        assert health.json()["services"]["vision"] is True
+        assert not action.done()
+        
+        slow_vision.set()
+        response = await asyncio.wait_for(action, timeout=5.0)
+    
+    assert response.status_code == 200
+    assert "A quiet desktop" in response.json()["response"]
+
+
+@pytest.mark.asyncio
+async def test_action_executes_planned_steps(slow_vision, monkeypatch):
+    """The planner's actions run in order; a plan it cannot make is reported"""
+    plans = iter([
+        '{"actions": [{"type": "mouse", "params": {"action": "click", "x": 40, "y": 30}, "description": "Click File"},'
+        ' {"type": "keyboard", "params": {"action": "press", "key": "enter"}, "description": "Open"}]}',
+        '{"actions": [{"type": "mouse", "params": {"action": "click"}}]}',
+        '{"actions": []']
+    )
+    
+    async def chat(**kwargs):
+        return {'message': {'content': next(plans)}}
+    
+    backend = server.execution_engine.keyboard.backend
+    slow_vision.set()
+    
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://agent-s") as client:
+        with patch.object(server.action_planner.client, "chat", new=chat):
+            done = await client.post("/action", json={"prompt": "Open the File menu", "include_screenshot": False})
+            failed = await client.post("/action", json={"prompt": "Click OK", "include_screenshot": False})
+    
+    assert done.json()["success"] is True
+    assert done.json()["actions_taken"] == ["🖱️  Click File", "⌨️  Open"]
+    assert [step["changed"] for step in done.json()["steps"]] == [False, False]
+    assert backend.events == [
+        {"event": "click", "x": 40, "y": 30, "button": "left", "clicks": 1},
+        {"event": "press", "key": "enter", "presses": 1},
+    ]
+    assert failed.json()["success"] is False
+    assert "No valid plan" in failed.json()["error"]
+
+
+@pytest.mark.asyncio
+async def test_action_stream_reports_each_stage(slow_vision):
+    """/action/stream emits NDJSON events as each stage happens, ending with the response"""
+    async def tokens():
+        for piece in ["A File ", "menu at the top"]:
+            yield {'message': {'content': piece}}
+    
+    async def vision_chat(**kwargs):
+        assert kwargs['stream'] is True
+        return tokens()
+    
+    async def plan_chat(**kwargs):
+        return {'message': {'content':
+            '{"actions": [{"type": "mouse", "params": {"action": "click", "x": 40, "y": 30}, "description": "Click File"}]}'
+        }}
+    
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://agent-s") as client:
+        with patch.object(server.vision_analyzer.client, "chat", new=vision_chat), \
+                patch.object(server.action_planner.client, "chat", new=plan_chat):
+            response = await client.post(
+                "/action/stream", json={"prompt": "Open the File menu", "include_screenshot": False}
+            )
+    
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert [e["event"] for e in events] == [
+        "queued", "captured", "analysis_token", "analysis_token", "analysis", "plan", "step", "done"
+    ]
+    assert events[0]["lane"] == "control" and events[0]["position"] == 0
+    assert events[1]["width"] == 1920
+    assert events[4]["text"] == "A File menu at the top"
+    assert events[5]["steps"] == [{"type": "mouse", "description": "Click File"}]
+    assert events[6]["description"] == "Click File" and events[6]["success"] is True
+    assert events[-1]["result"]["actions_taken"] == ["🖱️  Click File"]
+    assert all(e["elapsed"] >= 0 for e in events)
+
+
+@pytest.mark.asyncio
+async def test_router_relays_action_stream(slow_vision, monkeypatch):
+    """The OpenWebUI router streams the analysis into the reply and each stage as a status"""
+    import sys
+    from pathlib import Path
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent / "pipelines"))
+    router = pytest.importorskip("alphaomega_router")
+    
+    async def tokens():
+        for piece in ["A File ", "menu"]:
+            yield {'message': {'content': piece}}
+    
+    async def vision_chat(**kwargs):
+        return tokens()
+    
+    async def plan_chat(**kwargs):
+        return {'message': {'content':
+            '{"actions": [{"type": "keyboard", "params": {"action": "press", "key": "f10"}, "description": "Open menu"}]}'
+        }}
+    
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(router.httpx, "AsyncClient", lambda **kwargs: real_client(
+        transport=httpx.ASGITransport(app=server.app), **kwargs
+    ))
+    statuses = []
+    
+    async def emitter(event):
+        statuses.append((event["data"]["description"], event["data"]["done"]))
+    
+    pipeline = router.Pipeline()
+    with patch.object(server.vision_analyzer.client, "chat", new=vision_chat), \
+            patch.object(server.action_planner.client, "chat", new=plan_chat):
+        chunks = [c async for c in pipeline._route_to_agent_s("Open the menu", [], emitter)]
+    
+    reply = "".join(chunks)
+    assert chunks[:3] == ["**Screen analysis:**\n", "A File ", "menu"]
+    assert "- ⌨️  Open menu" in reply
+    assert [d for d, _ in statuses][:4] == [
+        "Capturing screen...", "Analyzing screen...", "Planning actions...", "Planned 1 step"
+    ]
+    assert statuses[4][0].startswith("✓ Step 1/1: Open menu (")
+    assert statuses[-1] == ("Action complete", True)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_actions_take_turns_on_the_desktop(slow_vision):
+    """Two control requests never interleave their input; jobs can be polled and cancelled"""
+    plans = {
+        "Open the File menu": '{"actions": [{"type": "mouse", "params": {"action": "click", "x": 40, "y": 30}, "description": "Click File"},'
+            ' {"type": "keyboard", "params": {"action": "press", "key": "down"}, "description": "Next"}]}',
+        "Save the file": '{"actions": [{"type": "keyboard", "params": {"action": "hotkey", "keys": ["ctrl", "s"]}, "description": "Save"},'
+            ' {"type": "mouse", "params": {"action": "click", "x": 90, "y": 60}, "description": "Confirm"}]}',
+    }
+    
+    async def plan_chat(**kwargs):
+        request = kwargs["messages"][-1]["content"].rsplit("Request: ", 1)[1]
+        return {'message': {'content': plans[request]}}
+    
+    backend = server.execution_engine.keyboard.backend
+    slow_vision.set()
+    
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://agent-s") as client:
+        with patch.object(server.action_planner.client, "chat", new=plan_chat):
+            first, second = await asyncio.gather(
+                client.post("/action", json={"prompt": "Open the File menu", "include_screenshot": False}),
+                client.post("/action", json={"prompt": "Save the file", "include_screenshot": False}),
+            )
+            queued = [(await client.post("/jobs", json={"prompt": "Save the file", "include_screenshot": False})).json()
+                      for _ in range(2)]
+            cancelled = await client.delete(f"/jobs/{queued[1]['job_id']}")
+            polled = await client.get(f"/jobs/{queued[0]['job_id']}")
+            while polled.json()["status"] in ("queued", "running"):
+                await asyncio.sleep(0.01)
+                polled = await client.get(f"/jobs/{queued[0]['job_id']}")
+            health = await client.get("/health")
+    
+    assert first.json()["success"] and second.json()["success"]
+    calls = [event["event"] for event in backend.events]
+    assert calls[:4] in (["click", "press", "hotkey", "click"], ["hotkey", "click", "click", "press"])
+    assert [job["status"] for job in queued] == ["queued", "queued"]
+    assert cancelled.json()["status"] == "cancelled"
+    assert polled.json()["status"] == "succeeded"
+    assert polled.json()["result"]["actions_taken"] == ["⌨️  Save", "🖱️  Confirm"]
+    lane = health.json()["jobs"]["control"]
+    assert (lane["submitted"], lane["succeeded"], lane["cancelled"]) == (4, 3, 1)
+
+
+@pytest.mark.asyncio
+async def test_screenshots_are_stored_once_and_served_from_the_index(slow_vision, tmp_path):
+    """Repeated screens share one file; only indexed names are served"""
+    (tmp_path / "secret.png").write_bytes(b"not yours")
+    slow_vision.set()
+    
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://agent-s") as client:
+        first = await client.post("/action", json={"prompt": "what's on my screen"})
+        second = await client.post("/action", json={"prompt": "what's on my screen"})
+        name = first.json()["screenshot"].rsplit("/", 1)[1]
+        served = await client.get(f"/screenshot/{name}")
+        escaped = await client.get("/screenshot/..%2Fsecret.png")
+        health = await client.get("/health")
+    
+    assert first.json()["screenshot"] == second.json()["screenshot"]
+    assert served.status_code == 200 and served.headers["content-type"] == "image/png"
+    assert escaped.status_code == 404
+    assert health.json()["screenshots"]["dedup_hits"] == 1
@@ -0,0 +1,150 @@
+"""
+Unit tests for the closed-loop execution engine
+"""
+import time
+
+import pytest
+from unittest.mock import AsyncMock, Mock
+from PIL import Image, ImageDraw
+
+from agent_s.actions.backend import RecordingBackend
+from agent_s.actions.engine import ExecutionEngine
+from agent_s.actions.keyboard import KeyboardAction
+from agent_s.vision.frame import Frame
+
+
+class FakeUI:
+    """
+    A screen that reacts to input: `delay` seconds after an action a panel
+    appears, then (for `animate` seconds) a spinner keeps changing
+    """
+
+    def __init__(self, delay=0.05, animate=0.0, spinner_forever=False):
+        self.delay = delay
+        self.animate = animate
+        self.spinner_forever = spinner_forever
+        self.acted_at = None
+        self.actions = 0
+
+    def execute(self, params, profile=None):
+        self.acted_at = time.monotonic()
+        self.actions += 1
+        return {"success": True}
+
+    def execute_batch(self, actions, profile=None):
+        return [self.execute(params, profile) for params in actions]
+
+    def grab(self, region=None):
+        img = Image.new("RGB", (320, 240), color="white")
+        draw = ImageDraw.Draw(img)
+        elapsed = time.monotonic() - self.acted_at if self.acted_at else -1
+        if elapsed >= self.delay:
+            draw.rectangle((20, 20, 120, 120), fill="navy")
+            if self.spinner_forever or elapsed < self.delay + self.animate:
+                x = 200 + int(elapsed * 1000) % 80
+                draw.rectangle((x, 200, x + 20, 220), fill="red")
+        return Frame(img)
+
+
+def engine(ui, **kwargs):
+    options = {"step_timeout": 2.0, "quiet": 0.1, "poll_min": 0.01, "poll_max": 0.05, "probe_scale": 2}
+    options.update(kwargs)
+    return ExecutionEngine(ui, ui, ui, **options)
+
+
+CLICK = {"type": "mouse", "params": {"action": "click", "x": 50, "y": 50}, "description": "Click"}
+
+
+@pytest.mark.asyncio
+async def test_step_ends_once_the_ui_settles():
+    ui = FakeUI(delay=0.05, animate=0.2)
+
+    [report] = await engine(ui).run([CLICK])
+
+    assert report["success"] and report["changed"] and not report["timed_out"]
+    assert 0.04 <= report["first_change"] < 0.2
+    # reaction + animation + quiet window, well short of the step timeout
+    assert 0.3 <= report["settle"] < 0.8
+
+
+@pytest.mark.asyncio
+async def test_no_reaction_waits_only_the_learned_grace():
+    quick = FakeUI(delay=0.02)
+    e = engine(quick)
+    await e.run([CLICK, CLICK, CLICK])
+    learned = e.response_latency
+    assert learned < 0.15
+
+    e.screen = FakeUI(delay=60)
+    [report] = await e.run([CLICK])
+
+    assert not report["changed"]
+    assert report["settle"] == pytest.approx(e.grace, abs=0.1)
+    assert e.grace < 0.5
+
+
+@pytest.mark.asyncio
+async def test_endless_animation_hits_the_step_timeout():
+    ui = FakeUI(delay=0.0, spinner_forever=True)
+
+    [report] = await engine(ui, step_timeout=0.4).run([CLICK])
+
+    assert report["timed_out"]
+    assert report["settle"] == pytest.approx(0.4, abs=0.1)
+
+
+@pytest.mark.asyncio
+async def test_expected_region_ends_the_wait_early():
+    ui = FakeUI(delay=0.05, spinner_forever=True)
+    action = dict(CLICK, expect={"region": [20, 20, 100, 100]})
+
+    [report] = await engine(ui).run([action])
+
+    assert report["expected"] is True
+    assert not report["timed_out"]
+    assert report["settle"] < 0.3
+
+
+@pytest.mark.asyncio
+async def test_failures_are_reported_and_the_plan_continues():
+    ui = FakeUI(delay=60)
+    keyboard = Mock(execute=Mock(return_value={"success": False, "error": "no display"}))
+    mcp = Mock(execute_tool=AsyncMock(return_value={"artifact_url": "http://mcp/a/1"}))
+    e = ExecutionEngine(ui, ui, keyboard, mcp, step_timeout=0.05)
+
+    reports = await e.run([
+        {"type": "keyboard", "params": {"action": "press", "key": "enter"}, "description": "Enter"},
+        {"type": "wait", "params": {"duration": 0}, "description": "Pause"},
+        {"type": "mcp_tool", "tool": "create_artifact", "params": {}, "description": "Save"},
+    ])
+
+    assert [r["success"] for r in reports] == [False, True, True]
+    assert reports[0]["error"] == "no display"
+    assert reports[2]["artifact_url"] == "http://mcp/a/1"
+    mcp.execute_tool.assert_awaited_once_with(tool_name="create_artifact", params={})
+
+
+@pytest.mark.asyncio
+async def test_consecutive_keystrokes_run_as_one_batch():
+    """Typing needs no wait between keystrokes: one batch, one settle, text joined"""
+    ui = FakeUI(delay=0.02)
+    backend = RecordingBackend()
+    e = ExecutionEngine(ui, ui, KeyboardAction(backend, paste_min_chars=1000), step_timeout=2.0,
+                        quiet=0.05, poll_min=0.01, poll_max=0.05, probe_scale=2)
+    typing = [
+        {"type": "keyboard", "params": {"action": "type", "text": "hello "}, "description": "Type"},
+        {"type": "keyboard", "params": {"action": "type", "text": "world"}, "description": "Type more"},
+        {"type": "keyboard", "params": {"action": "press", "key": "enter"}, "description": "Submit"},
+    ]
+
+    reports = await e.run(typing + [CLICK] + typing[:1], profile="instant")
+
+    assert [r.get("batch") for r in reports] == [3, 3, 3, None, None]
+    assert [r["success"] for r in reports] == [True] * 5
+    assert reports[0]["settle"] == reports[1]["settle"] == 0.0
+    assert backend.events == [
+        {"event": "write", "text": "hello world"},
+        {"event": "press", "key": "enter", "presses": 1},
+        {"event": "write", "text": "hello "},
+    ]
+    assert backend.elapsed == 0.0
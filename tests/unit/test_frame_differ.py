@@ -0,0 +1,73 @@
+"""
+Unit tests for the frame differ and incremental analysis
+"""
+import io
+
+import numpy as np
+import pytest
+from unittest.mock import patch
+from PIL import Image, ImageDraw
+
+from agent_s.vision.analyzer import VisionAnalyzer
+from agent_s.vision.differ import FrameDiffer, changed_regions, luma
+from agent_s.vision.frame import Frame
+
+
+def screen(*boxes):
+    img = Image.new('RGB', (640, 480), color=(40, 44, 52))
+    draw = ImageDraw.Draw(img)
+    for box in boxes:
+        draw.rectangle(box, fill=(240, 240, 240))
+    return Frame(img)
+
+
+def test_changed_regions_finds_separate_boxes():
+    before = luma(screen())
+    after = luma(screen((100, 50, 180, 90), (400, 300, 401, 315)))
+
+    assert changed_regions(before, before) == []
+    assert changed_regions(before, after) == [(96, 48, 96, 48), (400, 288, 16, 32)]
+
+
+def test_nearby_changes_merge_and_noise_is_ignored():
+    before = luma(screen())
+    after = luma(screen((100, 100, 110, 110), (130, 100, 140, 110)))
+    noisy = np.clip(before.astype(np.int16) + np.random.default_rng(0).integers(-8, 8, before.shape), 0, 255)
+
+    assert changed_regions(before, after) == [(96, 96, 48, 16)]
+    assert changed_regions(before, noisy.astype(np.uint8)) == []
+
+
+def test_differ_gives_up_on_large_changes():
+    differ = FrameDiffer(max_regions=4, max_fraction=0.25, padding=8)
+    before = luma(screen())
+
+    assert differ.regions(before, luma(screen((100, 50, 180, 90)))) == [(88, 40, 112, 64)]
+    assert differ.regions(before, luma(screen((0, 0, 639, 300)))) is None
+    assert differ.regions(before, luma(screen(*[(x, 10, x + 4, 14) for x in range(0, 600, 100)]))) is None
+
+
+@pytest.mark.asyncio
+async def test_incremental_analysis_describes_only_changed_regions():
+    analyzer = VisionAnalyzer(model="llava:34b", differ=FrameDiffer(max_steps=1))
+    answers = iter(["A terminal and an editor", "A save dialog", "Editor with a menu open"])
+
+    with patch.object(analyzer.client, 'chat') as mock_chat:
+        mock_chat.side_effect = lambda **kwargs: {'message': {'content': next(answers)}}
+
+        full = await analyzer.analyze(screen(), "What is open?")
+        unchanged = await analyzer.analyze(screen(), "What is open?")
+        dialog = await analyzer.analyze(screen((200, 150, 400, 250)), "What is open?")
+        again = await analyzer.analyze(screen((200, 150, 400, 250), (10, 10, 30, 20)), "What is open?")
+
+    region = mock_chat.call_args_list[1].kwargs['messages'][0]
+    assert full == unchanged == "A terminal and an editor"
+    assert dialog == (
+        "A terminal and an editor\n\nChanged since the previous capture:\n"
+        "- Region at (184, 136), 240x128: A save dialog"
+    )
+    assert "(184, 136)" in region['content']
+    assert Image.open(io.BytesIO(region['images'][0])).size == (240, 128)
+    # max_steps reached: the next change gets a full analysis
+    assert again == "Editor with a menu open"
+    assert mock_chat.call_count == 3
@@ -0,0 +1,76 @@
+"""
+Unit tests for the mouse and keyboard handlers on the recording backend
+"""
+import pytest
+
+from agent_s.actions.backend import RecordingBackend, get_backend, speed_profile
+from agent_s.actions.keyboard import KeyboardAction
+from agent_s.actions.mouse import MouseAction
+
+LONG = "The quick brown fox jumps over the lazy dog, twice over."
+
+
+def test_long_text_is_pasted_when_the_policy_allows():
+    """Long single-line text goes through the clipboard; everything else is typed"""
+    backend = RecordingBackend()
+    keyboard = KeyboardAction(backend, allow_paste=True, paste_min_chars=40)
+
+    assert keyboard.execute({"action": "type", "text": LONG})["method"] == "paste"
+    assert keyboard.execute({"action": "type", "text": "short"})["method"] == "type"
+    assert keyboard.execute({"action": "type", "text": LONG + "\n"})["method"] == "type"
+    assert keyboard.execute({"action": "type", "text": LONG, "interval": 0.05})["method"] == "type"
+    assert keyboard.execute({"action": "type", "text": LONG}, profile="demo")["method"] == "type"
+    assert [e["event"] for e in backend.events] == ["paste", "write", "write", "write", "write"]
+
+    no_clipboard = KeyboardAction(RecordingBackend(clipboard=False), allow_paste=True, paste_min_chars=40)
+    assert no_clipboard.execute({"action": "type", "text": LONG})["method"] == "type"
+    never = KeyboardAction(RecordingBackend(), allow_paste=False)
+    assert never.execute({"action": "type", "text": LONG})["method"] == "type"
+
+
+def test_speed_profiles_set_default_timings():
+    """Profiles fill in the intervals and tweens an action leaves out; explicit ones win"""
+    timings = {}
+    for profile in ("instant", "human", "demo"):
+        backend = RecordingBackend()
+        MouseAction(backend).execute({"action": "move", "x": 10, "y": 20}, profile=profile)
+        KeyboardAction(backend, allow_paste=False).execute({"action": "type", "text": "abcd"}, profile=profile)
+        timings[profile] = backend.elapsed
+
+    assert timings["instant"] == 0.0
+    # Tween and keystrokes, plus the pause after each action
+    assert timings["human"] == pytest.approx(0.5 + 4 * 0.01 + 2 * 0.1)
+    assert timings["demo"] > timings["human"]
+
+    backend = RecordingBackend()
+    MouseAction(backend).execute({"action": "move", "x": 1, "y": 1, "duration": 0.2}, profile="instant")
+    assert backend.elapsed == pytest.approx(0.2)
+
+    with pytest.raises(ValueError):
+        speed_profile("warp")
+    assert isinstance(get_backend("mock"), RecordingBackend)
+
+
+def test_drag_goes_to_absolute_coordinates():
+    """Plans give drag targets in screen pixels, not offsets from the cursor"""
+    backend = RecordingBackend()
+    mouse = MouseAction(backend)
+    mouse.execute({"action": "move", "x": 100, "y": 100}, profile="instant")
+    mouse.execute({"action": "drag", "x": 800, "y": 600}, profile="instant")
+
+    assert mouse.get_position() == (800, 600)
+
+
+def test_batch_failures_do_not_stop_the_rest():
+    """A bad action in a batch is reported and the others still run"""
+    backend = RecordingBackend()
+    results = KeyboardAction(backend).execute_batch([
+        {"action": "type", "text": "a"},
+        {"action": "press"},
+        {"action": "hotkey", "keys": "ctrl+s"},
+    ], profile="human")
+
+    assert [r["success"] for r in results] == [True, False, True]
+    assert backend.events[-1] == {"event": "hotkey", "keys": ["ctrl", "s"]}
+    # The profile's pause follows each event of a batch
+    assert backend.elapsed == pytest.approx(0.01 + 3 * 0.1)
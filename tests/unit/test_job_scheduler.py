@@ -0,0 +1,90 @@
+"""
+Unit tests for the Agent-S job scheduler
+"""
+import asyncio
+
+import pytest
+
+from agent_s.actions.scheduler import ANALYSIS, CONTROL, JobCancelled, JobScheduler
+
+
+def recorder(log, name, gate=None):
+    async def run():
+        log.append(f"start {name}")
+        if gate is not None:
+            await gate.wait()
+        await asyncio.sleep(0.01)
+        log.append(f"end {name}")
+        return name
+    return run
+
+
+async def started(job):
+    while job.status == "queued":
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_control_lane_runs_one_job_at_a_time_by_priority():
+    """Control jobs never overlap; queued jobs start by priority, then submission order"""
+    scheduler = JobScheduler()
+    log, gate = [], asyncio.Event()
+    first = scheduler.submit(recorder(log, "first", gate))
+    await started(first)
+    low = scheduler.submit(recorder(log, "low"))
+    urgent = scheduler.submit(recorder(log, "urgent"), priority=5)
+
+    assert (scheduler.position(urgent), scheduler.position(low)) == (0, 1)
+
+    gate.set()
+    assert await low.wait() == "low"
+    assert log == ["start first", "end first", "start urgent", "end urgent", "start low", "end low"]
+    await scheduler.aclose()
+
+
+@pytest.mark.asyncio
+async def test_analysis_lane_runs_beside_control():
+    """Analysis-only jobs run in parallel, without waiting for the desktop"""
+    scheduler = JobScheduler(analysis_workers=2)
+    log, gate = [], asyncio.Event()
+    control = scheduler.submit(recorder(log, "control", gate))
+    reads = [scheduler.submit(recorder(log, f"read{i}"), lane=ANALYSIS) for i in range(2)]
+
+    await asyncio.gather(*(job.wait() for job in reads))
+
+    assert control.status == "running"
+    assert log[:3] == ["start control", "start read0", "start read1"]
+    gate.set()
+    await control.wait()
+    stats = scheduler.stats()
+    assert stats[ANALYSIS]["succeeded"] == 2 and stats[CONTROL]["succeeded"] == 1
+    assert stats[ANALYSIS]["workers"] == 2 and stats[CONTROL]["queued"] == 0
+    await scheduler.aclose()
+
+
+@pytest.mark.asyncio
+async def test_cancel_queued_and_running_jobs():
+    """Cancelled jobs report it, the lane moves on, and failures are kept"""
+    scheduler = JobScheduler()
+    log, gate = [], asyncio.Event()
+    running = scheduler.submit(recorder(log, "running", gate))
+    await started(running)
+    queued = scheduler.submit(recorder(log, "queued"))
+
+    async def broken():
+        raise RuntimeError("no display")
+
+    failing = scheduler.submit(broken)
+
+    assert scheduler.cancel(queued.id) and scheduler.cancel(running.id)
+    with pytest.raises(JobCancelled):
+        await running.wait()
+    with pytest.raises(RuntimeError):
+        await failing.wait()
+
+    assert "start queued" not in log
+    assert scheduler.status(queued.id)["status"] == "cancelled"
+    assert scheduler.status(failing.id)["error"] == "no display"
+    assert not scheduler.cancel(failing.id)
+    assert scheduler.stats()[CONTROL]["cancelled"] == 2
+    await scheduler.aclose()
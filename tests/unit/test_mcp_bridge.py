@@ -0,0 +1,87 @@
+"""
+Unit tests for the unified MCP bridge (one core, several front-ends)
+"""
+import asyncio
+
+from fastapi.testclient import TestClient
+from agent_s.mcp import http_server, http_server_v2, openai_bridge
+from agent_s.mcp.bridge import BridgeCore, create_app
+from agent_s.mcp.catalog import ToolCatalog
+
+TOOLS = [
+    {"name": "list_tasks", "inputSchema": {"type": "object", "properties": {"limit": {"type": "integer"}}}},
+    {"name": "add_task", "inputSchema": {"type": "object"}},
+]
+
+
+class FakeTransport:
+    def __init__(self):
+        self.calls = []
+
+    def is_running(self):
+        return True
+
+    def add_notification_handler(self, handler):
+        pass
+
+    def remove_notification_handler(self, handler):
+        pass
+
+    async def request(self, method, params=None, timeout=None):
+        self.calls.append((method, params["name"]))
+        await asyncio.sleep(0)
+        return {"jsonrpc": "2.0", "result": [{"id": 1, "title": "Order canvas"}]}
+
+
+def make_client(frontends=("tools", "openai", "rest")):
+    catalog = ToolCatalog(None, refresh_interval=0)
+    catalog.update(TOOLS)
+    core = BridgeCore(catalog=catalog)
+    core.transport = FakeTransport()
+    return TestClient(create_app(core, frontends=frontends)), core
+
+
+def test_frontends_share_one_transport_and_cache():
+    """A read through any surface is served from the cache the others filled"""
+    client, core = make_client()
+
+    rest = client.post("/tools/list_tasks", json={}).json()
+    tools = client.post("/tools/list_tasks/execute", json={}).json()
+    chat = client.post("/v1/chat/completions", json={"messages": [{"role": "user", "content": "list my tasks"}]})
+
+    assert rest["success"] and tools["success"]
+    assert rest["result"] == tools["result"]
+    assert "Order canvas" in chat.json()["choices"][0]["message"]["content"]
+    assert core.transport.calls == [("tools/call", "list_tasks")]
+    health = client.get("/health").json()
+    assert health["cache"]["hits"] == 2
+    assert health["frontends"] == ["tools", "openai", "rest"]
+
+
+def test_rest_validates_before_calling_mcp():
+    client, core = make_client(frontends=("rest",))
+
+    unknown = client.post("/tools/nope", json={})
+    invalid = client.post("/tools/list_tasks", json={"limit": "ten"})
+    via_call = client.post("/tools/call", json={"name": "add_task", "arguments": {}})
+
+    assert (unknown.status_code, unknown.json()["success"]) == (404, False)
+    assert invalid.status_code == 422 and "limit" in invalid.json()["error"]
+    assert via_call.json()["success"] is True
+    assert core.transport.calls == [("tools/call", "add_task")]
+
+
+def test_first_frontend_owns_shared_paths():
+    """/openapi.json describes the first front-end's operations"""
+    tools_first, _ = make_client(frontends=("tools", "rest"))
+    rest_first, _ = make_client(frontends=("rest", "tools"))
+
+    assert "/tools/list_tasks/execute" in tools_first.get("/openapi.json").json()["paths"]
+    assert "/tools/list_tasks" in rest_first.get("/openapi.json").json()["paths"]
+    assert "/tools/list_tasks" in tools_first.get("/rest/openapi.json").json()["paths"]
+
+
+def test_legacy_entry_points_mount_their_frontends():
+    assert TestClient(openai_bridge.app).get("/").json()["frontends"] == ["openai", "tools"]
+    for module in (http_server, http_server_v2):
+        assert TestClient(module.app).get("/").json()["frontends"] == ["rest"]
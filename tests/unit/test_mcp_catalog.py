@@ -0,0 +1,232 @@
+"""
+Unit tests for the MCP bridge tool catalog
+"""
+import asyncio
+import gzip
+import json
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from agent_s.mcp.catalog import ToolCatalog, tools_fingerprint
+from agent_s.mcp.transport import MCPTransportError
+
+
+def make_tools(count):
+    return [
+        {"name": f"tool_{i}", "description": f"Tool number {i}", "inputSchema": {"type": "object"}}
+        for i in range(count)
+    ]
+
+
+def build_spec(tools):
+    return {"openapi": "3.1.0", "paths": {f"/tools/{t['name']}": {} for t in tools}}
+
+
+class FakeTransport:
+    """Minimal stand-in exposing what ToolCatalog uses"""
+
+    def __init__(self, tools):
+        self.tools = tools
+        self.handlers = []
+        self.list_calls = 0
+
+    def is_running(self):
+        return True
+
+    def add_notification_handler(self, handler):
+        self.handlers.append(handler)
+
+    async def list_tools(self):
+        self.list_calls += 1
+        if self.tools is None:
+            raise MCPTransportError("tools/list failed: backend down")
+        return self.tools
+
+
+@pytest.fixture
+def catalog():
+    return ToolCatalog(build_spec, refresh_interval=0)
+
+
+@pytest.fixture
+def client(catalog):
+    app = FastAPI(openapi_url=None)
+
+    @app.get("/openapi.json")
+    async def openapi_spec(request: Request):
+        return catalog.openapi.response(request)
+
+    return TestClient(app)
+
+
+def test_fingerprint_ignores_key_order():
+    """Reordered keys hash the same, changed content does not"""
+    a = [{"name": "x", "description": "d"}]
+    b = [{"description": "d", "name": "x"}]
+    c = [{"name": "x", "description": "changed"}]
+
+    assert tools_fingerprint(a) == tools_fingerprint(b)
+    assert tools_fingerprint(a) != tools_fingerprint(c)
+
+
+def test_spec_built_once_per_tool_list(catalog):
+    """The builder only runs when the tool list changes"""
+    calls = []
+    catalog.spec_builder = lambda tools: calls.append(len(tools)) or build_spec(tools)
+
+    assert catalog.update(make_tools(3)) is True
+    for _ in range(5):
+        catalog.openapi
+    assert catalog.update(make_tools(3)) is False
+    catalog.openapi
+
+    assert calls == [3]
+
+
+def test_etag_and_not_modified(catalog, client):
+    """Matching If-None-Match gets an empty 304"""
+    catalog.update(make_tools(5))
+
+    first = client.get("/openapi.json")
+    assert first.status_code == 200
+    assert len(first.json()["paths"]) == 5
+
+    etag = first.headers["etag"]
+    again = client.get("/openapi.json", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+
+    catalog.update(make_tools(6))
+    changed = client.get("/openapi.json", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+def test_gzip_served_when_accepted(catalog, client):
+    """Large specs are served from the precompressed body"""
+    catalog.update(make_tools(100))
+
+    response = client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json() == json.loads(catalog.openapi.body)
+    assert gzip.decompress(catalog.openapi.gzipped) == catalog.openapi.body
+
+
+@pytest.mark.asyncio
+async def test_list_changed_notification_triggers_refresh(catalog):
+    """A tools/list_changed notification refreshes the catalog"""
+    transport = FakeTransport(make_tools(2))
+    catalog.watch(transport)
+
+    transport.tools = make_tools(4)
+    for handler in transport.handlers:
+        handler({"jsonrpc": "2.0", "method": "notifications/tools/list_changed"})
+    for _ in range(10):
+        await asyncio.sleep(0.01)
+        if len(catalog.tools) == 4:
+            break
+
+    assert transport.list_calls == 1
+    assert len(catalog.tools) == 4
+    await catalog.close()
+
+
+def test_lookup_index_follows_updates(catalog):
+    """Name lookups reflect the current tool list"""
+    catalog.update(make_tools(3))
+    assert catalog.get("tool_2")["description"] == "Tool number 2"
+
+    catalog.update(make_tools(1))
+    assert catalog.get("tool_0") is not None
+    assert catalog.get("tool_2") is None
+
+
+def test_validate_arguments(catalog):
+    """Arguments are checked against the tool's inputSchema"""
+    catalog.update([{
+        "name": "add_task",
+        "inputSchema": {
+            "type": "object",
+            "properties": {"title": {"type": "string"}, "priority": {"enum": ["low", "high"]}},
+            "required": ["title"]
+        }
+    }])
+
+    assert catalog.validate_arguments("add_task", {"title": "Order paint"}) == []
+
+    errors = catalog.validate_arguments("add_task", {"priority": "urgent"})
+    assert len(errors) == 2
+    assert any("'title' is a required property" in e for e in errors)
+    assert any(e.startswith("priority:") for e in errors)
+
+
+def test_validators_compiled_once_per_version(catalog):
+    """The compiled validator is reused until the tool list changes"""
+    catalog.update([{"name": "t", "inputSchema": {"type": "object"}}])
+
+    catalog.validate_arguments("t", {})
+    first = catalog._validators["t"]
+    catalog.validate_arguments("t", {"a": 1})
+    assert catalog._validators["t"] is first
+
+    catalog.update([{"name": "t", "inputSchema": {"type": "object", "required": ["a"]}}])
+    assert catalog.validate_arguments("t", {}) != []
+    assert catalog._validators["t"] is not first
+
+
+def test_invalid_schema_skips_validation(catalog):
+    """A broken inputSchema from the server does not block calls"""
+    catalog.update([{"name": "t", "inputSchema": {"type": "not-a-type"}}])
+
+    assert catalog.validate_arguments("t", {"anything": True}) == []
+
+
+@pytest.mark.asyncio
+async def test_manifest_persisted_and_reloaded(tmp_path):
+    """Tool lists from the server survive a restart; other servers' manifests are ignored"""
+    path = tmp_path / "manifest" / "tools.json"
+    first = ToolCatalog(build_spec, refresh_interval=0, manifest_path=str(path))
+    first.load_manifest(key="node a.js")
+    first.watch(FakeTransport(make_tools(3)))
+    await first.refresh()
+    await first.close()
+
+    second = ToolCatalog(build_spec, refresh_interval=0, manifest_path=str(path))
+    assert second.load_manifest(key="node a.js") is True
+    assert second.source == "manifest"
+    assert second.version == first.version
+    assert second.get("tool_2") is not None
+
+    other = ToolCatalog(build_spec, refresh_interval=0, manifest_path=str(path))
+    assert other.load_manifest(key="node b.js") is False
+    assert other.tools == []
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_keeps_catalog_and_manifest(tmp_path):
+    """A tools/list error leaves the served tools and the saved manifest alone"""
+    path = tmp_path / "tools.json"
+    catalog = ToolCatalog(build_spec, refresh_interval=0, manifest_path=str(path))
+    transport = FakeTransport(make_tools(3))
+    catalog.watch(transport)
+    await catalog.refresh()
+    version, saved = catalog.version, path.read_text()
+
+    transport.tools = None
+    assert await catalog.refresh() is False
+    await catalog.close()
+
+    assert catalog.version == version
+    assert catalog.get("tool_2") is not None
+    assert path.read_text() == saved
+
+
+def test_unreadable_manifest_is_ignored(tmp_path):
+    path = tmp_path / "tools.json"
+    path.write_text("{not json")
+    catalog = ToolCatalog(build_spec, refresh_interval=0, manifest_path=str(path))
+
+    assert catalog.load_manifest() is False
+    assert catalog.source == "empty"
@@ -0,0 +1,74 @@
+"""
+Unit tests for the MCP transport JSON codecs and binary line reader
+"""
+import sys
+import textwrap
+
+import pytest
+from agent_s.mcp.codec import JSONCodec, available_codecs, get_codec
+from agent_s.mcp.transport import MCPStdioTransport
+
+CODECS = available_codecs()
+
+# Replies with `size` inventory rows; prints a non-JSON line and a blank line first
+FAKE_SERVER = textwrap.dedent('''
+    import json, sys
+
+    for line in sys.stdin:
+        request = json.loads(line)
+        size = request["params"].get("arguments", {}).get("size", 1)
+        rows = [{"sku": f"SKU-{i}", "name": f"Item {i} \\u00e9", "quantity": i} for i in range(size)]
+        sys.stdout.write("npm WARN not json\\n\\n")
+        sys.stdout.write(json.dumps({"jsonrpc": "2.0", "id": request["id"], "result": {"rows": rows}}) + "\\n")
+        sys.stdout.flush()
+''')
+
+
+@pytest.mark.parametrize("codec", CODECS.values(), ids=list(CODECS))
+def test_codec_round_trip(codec):
+    message = {"jsonrpc": "2.0", "id": 1, "result": {"text": "café ☕", "n": [1, 2.5, None, True]}}
+
+    encoded = codec.encode(message)
+
+    assert isinstance(encoded, bytes)
+    assert codec.decode(encoded) == message
+    with memoryview(b"  " + encoded + b"  ") as view:
+        assert codec.decode(view[2:-2]) == message
+
+
+@pytest.mark.parametrize("codec", CODECS.values(), ids=list(CODECS))
+def test_codec_rejects_garbage_with_value_error(codec):
+    with pytest.raises(ValueError):
+        codec.decode(b"npm WARN deprecated")
+
+
+def test_get_codec_falls_back():
+    assert get_codec("json").name == "json"
+    assert get_codec("no-such-codec").name == next(iter(CODECS))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("codec", CODECS.values(), ids=list(CODECS))
+async def test_large_results_split_across_reads(tmp_path, codec):
+    """Lines spanning many pipe reads are reassembled and decoded intact"""
+    script = tmp_path / "fake_mcp.py"
+    script.write_text(FAKE_SERVER)
+    transport = MCPStdioTransport([sys.executable, str(script)], timeout=10.0, codec=codec, buffer_size=4096)
+    transport.start()
+    try:
+        big = await transport.request("tools/call", {"name": "list_inventory", "arguments": {"size": 40000}})
+        small = await transport.request("tools/call", {"name": "list_inventory", "arguments": {"size": 2}})
+    finally:
+        transport.stop()
+
+    rows = big["result"]["rows"]
+    assert len(rows) == 40000
+    assert rows[-1] == {"sku": "SKU-39999", "name": "Item 39999 é", "quantity": 39999}
+    assert len(small["result"]["rows"]) == 2
+
+
+def test_default_transport_codec():
+    transport = MCPStdioTransport(["true"])
+
+    assert isinstance(transport.codec, JSONCodec)
+    assert transport.codec.name == next(iter(CODECS))
@@ -0,0 +1,46 @@
+"""
+Unit tests for the fake MCP stdio server used by the load-test harness
+"""
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from agent_s.mcp.transport import MCPStdioTransport
+
+FAKE_SERVER = Path(__file__).resolve().parent.parent / "benchmarks" / "fake_mcp_server.py"
+
+
+def start(*args):
+    transport = MCPStdioTransport([sys.executable, str(FAKE_SERVER), *args], timeout=5.0)
+    transport.start()
+    return transport
+
+
+@pytest.mark.asyncio
+async def test_fake_server_speaks_mcp():
+    transport = start("--tools", "12", "--latency-ms", "1", "--result-bytes", "4096")
+    try:
+        init = await transport.initialize("test", "1.0")
+        tools = await transport.list_tools()
+        response = await transport.request("tools/call", {"name": "list_tasks", "arguments": {}})
+        unknown = await transport.request("tools/call", {"name": "nope", "arguments": {}})
+    finally:
+        transport.stop()
+
+    assert init["result"]["serverInfo"]["name"] == "fake-mcpart"
+    assert len(tools) == 12 and tools[0]["name"] == "list_tasks" and tools[-1]["name"] == "tool_11"
+    rows = json.loads(response["result"]["content"][0]["text"])
+    assert 3000 < len(json.dumps(rows)) <= 4200
+    assert unknown["result"]["isError"] is True
+
+
+@pytest.mark.asyncio
+async def test_fake_server_error_rate():
+    transport = start("--error-rate", "1", "--latency-dist", "fixed", "--latency-ms", "0")
+    try:
+        response = await transport.request("tools/call", {"name": "list_tasks", "arguments": {}})
+    finally:
+        transport.stop()
+
+    assert response["result"]["isError"] is True
@@ -0,0 +1,218 @@
+"""
+Unit tests for MCP request flow control (in-flight window, fair queueing, 429s)
+"""
+import asyncio
+import sys
+import textwrap
+
+import pytest
+from fastapi.testclient import TestClient
+from agent_s.mcp import openai_bridge
+from agent_s.mcp.bridge import BridgeCore, create_app
+from agent_s.mcp.catalog import ToolCatalog
+from agent_s.mcp.flow import FairLimiter, QueueFullError, current_caller
+from agent_s.mcp.metrics import BridgeMetrics
+from agent_s.mcp.transport import MCPOverloadedError, MCPStdioTransport, MCPTimeoutError
+
+# Answers each tools/call after arguments["delay"] seconds, out of order
+FAKE_SERVER = textwrap.dedent('''
+    import json, sys, threading, time
+
+    lock = threading.Lock()
+
+    def answer(request):
+        time.sleep(request["params"].get("arguments", {}).get("delay", 0))
+        with lock:
+            sys.stdout.write(json.dumps({"jsonrpc": "2.0", "id": request["id"], "result": {"ok": True}}) + "\\n")
+            sys.stdout.flush()
+
+    for line in sys.stdin:
+        threading.Thread(target=answer, args=(json.loads(line),)).start()
+''')
+
+
+@pytest.fixture
+def make_transport(tmp_path):
+    script = tmp_path / "fake_mcp.py"
+    script.write_text(FAKE_SERVER)
+    started = []
+
+    def make(**kwargs):
+        t = MCPStdioTransport([sys.executable, str(script)], **kwargs)
+        t.start()
+        started.append(t)
+        return t
+
+    yield make
+    for t in started:
+        t.stop()
+
+
+def test_limiter_grants_round_robin_across_callers():
+    limiter = FairLimiter(limit=1, max_queue=10)
+    assert limiter.acquire("a") is None
+
+    waiters = [(caller, limiter.acquire(caller)) for caller in ["a", "a", "a", "b", "c"]]
+    order = []
+    for _ in waiters:
+        limiter.finish(None)
+        granted = [(c, w) for c, w in waiters if w.done() and (c, w) not in order]
+        assert len(granted) == 1
+        order.extend(granted)
+
+    assert [c for c, _ in order] == ["a", "b", "c", "a", "a"]
+    assert limiter.stats()["queued"] == 0
+
+
+def test_limiter_rejects_when_queue_full():
+    limiter = FairLimiter(limit=1, max_queue=2)
+    limiter.acquire()
+    limiter.acquire()
+    limiter.acquire()
+
+    with pytest.raises(QueueFullError) as excinfo:
+        limiter.acquire()
+
+    assert excinfo.value.retry_after >= 1
+    assert limiter.stats()["rejected"] == 1
+
+
+def test_abandoned_waiter_leaves_queue():
+    limiter = FairLimiter(limit=1, max_queue=5)
+    limiter.acquire()
+    gone = limiter.acquire("a")
+    staying = limiter.acquire("b")
+
+    limiter.finish(gone)
+    assert limiter.stats()["queued"] == 1
+
+    limiter.finish(None)
+    assert gone.cancelled()
+    assert staying.done() and not staying.cancelled()
+    assert (limiter.stats()["in_flight"], limiter.stats()["queued"]) == (1, 0)
+
+
+@pytest.mark.asyncio
+async def test_in_flight_window_is_bounded(make_transport):
+    transport = make_transport(max_in_flight=2, max_queue=10)
+    peak = 0
+
+    async def call():
+        nonlocal peak
+        peak = max(peak, transport.flow_stats()["in_flight"])
+        await transport.request("tools/call", {"name": "t", "arguments": {"delay": 0.05}})
+        peak = max(peak, transport.flow_stats()["in_flight"])
+
+    async def sample():
+        nonlocal peak
+        for _ in range(20):
+            peak = max(peak, transport.flow_stats()["in_flight"])
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(sample(), *(call() for _ in range(6)))
+
+    assert peak == 2
+    assert transport.flow_stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_queue_overflow_raises_overloaded(make_transport):
+    transport = make_transport(max_in_flight=1, max_queue=1)
+    slow = asyncio.ensure_future(transport.request("tools/call", {"name": "t", "arguments": {"delay": 0.3}}))
+    queued = asyncio.ensure_future(transport.request("tools/call", {"name": "t", "arguments": {}}))
+    await asyncio.sleep(0.05)
+
+    with pytest.raises(MCPOverloadedError) as excinfo:
+        await transport.request("tools/call", {"name": "t", "arguments": {}})
+
+    assert excinfo.value.retry_after >= 1
+    await asyncio.gather(slow, queued)
+
+
+@pytest.mark.asyncio
+async def test_queue_wait_counts_toward_timeout_and_queue_phase(make_transport):
+    transport = make_transport(timeout=0.2, max_in_flight=1, max_queue=5)
+    timings = []
+    transport.add_call_observer(timings.append)
+    slow = asyncio.ensure_future(transport.request("tools/call", {"name": "t", "arguments": {"delay": 0.5}}, timeout=2.0))
+    await asyncio.sleep(0.02)
+
+    with pytest.raises(MCPTimeoutError):
+        await transport.request("tools/call", {"name": "t", "arguments": {}})
+    assert transport.flow_stats()["queued"] == 0
+
+    await slow
+    fast = await transport.request("tools/call", {"name": "t", "arguments": {}}, timeout=2.0)
+    assert fast["result"] == {"ok": True}
+
+    queued = asyncio.ensure_future(transport.request("tools/call", {"name": "t", "arguments": {}}, timeout=2.0))
+    await transport.request("tools/call", {"name": "t", "arguments": {"delay": 0.1}}, timeout=2.0)
+    await queued
+    assert max(t.phases()["queue"] for t in timings) >= 0.05
+
+
+@pytest.mark.asyncio
+async def test_callers_share_slots_fairly(make_transport):
+    transport = make_transport(max_in_flight=1, max_queue=50)
+    finished = []
+
+    async def call(caller, i):
+        token = current_caller.set(caller)
+        try:
+            await transport.request("tools/call", {"name": "t", "arguments": {"delay": 0.01}})
+        finally:
+            current_caller.reset(token)
+        finished.append((caller, i))
+
+    greedy = [asyncio.ensure_future(call("greedy", i)) for i in range(8)]
+    await asyncio.sleep(0.005)
+    polite = asyncio.ensure_future(call("polite", 0))
+    await asyncio.gather(polite, *greedy)
+
+    # The late caller is served after at most one queued greedy request
+    assert finished.index(("polite", 0)) <= 2
+
+
+def test_flow_metrics_exported(make_transport):
+    transport = make_transport(max_in_flight=3)
+    metrics = BridgeMetrics(slow_seconds=0)
+    metrics.watch_flow(transport)
+
+    body = metrics.response().body.decode()
+
+    assert "mcp_in_flight 0.0" in body
+    assert "mcp_in_flight_limit 3.0" in body
+    assert "mcp_queue_depth 0.0" in body
+    assert "mcp_queue_rejected_total 0.0" in body
+
+
+class OverloadedTransport:
+    def is_running(self):
+        return True
+
+    async def request(self, method, params=None, timeout=None):
+        raise MCPOverloadedError("MCP request queue full, retry after 3s", 3)
+
+
+def test_bridge_returns_429_with_retry_after(monkeypatch):
+    monkeypatch.setattr(openai_bridge.core, "transport", OverloadedTransport())
+
+    response = TestClient(openai_bridge.app).post("/tools/list_tasks/execute", json={})
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "3"
+    assert response.json()["success"] is False
+
+
+def test_every_frontend_returns_429():
+    core = BridgeCore(catalog=ToolCatalog(None, refresh_interval=0))
+    core.transport = OverloadedTransport()
+    client = TestClient(create_app(core))
+
+    for path, body in (
+        ("/tools/list_tasks", {}),
+        ("/tools/call", {"name": "list_tasks"}),
+        ("/v1/chat/completions", {"messages": [{"role": "user", "content": "list my tasks"}]}),
+    ):
+        response = client.post(path, json=body)
+        assert (path, response.status_code, response.headers["retry-after"]) == (path, 429, "3")
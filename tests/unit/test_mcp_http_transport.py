@@ -0,0 +1,244 @@
+"""
+Unit tests for the MCP streamable HTTP transport
+"""
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+import pytest_asyncio
+import uvicorn
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import StreamingResponse
+from agent_s.mcp.catalog import ToolCatalog
+from agent_s.mcp.http_transport import MCPHTTPTransport
+from agent_s.mcp.transport import MCPTimeoutError, MCPTransportError, MCPStdioTransport, create_transport
+
+TOOLS = [{"name": "echo"}, {"name": "slow"}, {"name": "progress"}]
+
+
+class FakeMCPServer:
+    """Streamable HTTP MCP server stand-in, served by uvicorn on a thread"""
+
+    def __init__(self):
+        self.app = FastAPI()
+        self.sessions = set()
+        self.sessions_opened = 0
+        self.client_ports = set()
+        self.notifications = []
+        self.tools = list(TOOLS)
+        self.listeners = []
+        self.loop = None
+        self.app.post("/mcp")(self.post)
+        self.app.get("/mcp")(self.get)
+        self.app.delete("/mcp")(self.delete)
+
+    async def post(self, request: Request):
+        self.client_ports.add(request.client.port)
+        message = json.loads(await request.body())
+        if "id" not in message:
+            self.notifications.append(message["method"])
+            return Response(status_code=202)
+        if message["method"] == "initialize":
+            self.sessions_opened += 1
+            session = f"session-{self.sessions_opened}"
+            self.sessions.add(session)
+            return self.reply(message, {"protocolVersion": "2025-03-26", "serverInfo": {"name": "fake"}},
+                              headers={"Mcp-Session-Id": session})
+        if request.headers.get("mcp-session-id") not in self.sessions:
+            return Response(status_code=404)
+        if message["method"] == "tools/list":
+            return self.reply(message, {"tools": self.tools})
+
+        name = message["params"]["name"]
+        arguments = message["params"].get("arguments", {})
+        if name == "slow":
+            await asyncio.sleep(arguments.get("seconds", 0.05))
+        if name == "progress":
+            return StreamingResponse(self.progress_events(message), media_type="text/event-stream")
+        return self.reply(message, {"content": [{"type": "text", "text": json.dumps(arguments)}]})
+
+    def reply(self, message, result, headers=None):
+        body = json.dumps({"jsonrpc": "2.0", "id": message["id"], "result": result})
+        return Response(body, media_type="application/json", headers=headers)
+
+    async def progress_events(self, message):
+        token = message["params"].get("_meta", {}).get("progressToken")
+        for step in (1, 2):
+            note = {"jsonrpc": "2.0", "method": "notifications/progress",
+                    "params": {"progressToken": token, "progress": step, "total": 2}}
+            yield f"event: message\ndata: {json.dumps(note)}\n\n"
+            await asyncio.sleep(0.01)
+        yield ": keep-alive\n\n"
+        response = {"jsonrpc": "2.0", "id": message["id"], "result": {"done": True}}
+        yield f"id: 7\ndata: {json.dumps(response)}\n\n"
+
+    async def get(self, request: Request):
+        if request.headers.get("mcp-session-id") not in self.sessions:
+            return Response(status_code=404)
+        self.loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        self.listeners.append(queue)
+
+        async def events():
+            while True:
+                message = await queue.get()
+                yield f"data: {json.dumps(message)}\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    async def delete(self, request: Request):
+        self.sessions.discard(request.headers.get("mcp-session-id"))
+        return Response(status_code=200)
+
+    def change_tools(self, tools):
+        """Swap the tool list and announce it on every event stream"""
+        self.tools = tools
+        message = {"jsonrpc": "2.0", "method": "notifications/tools/list_changed"}
+        for queue in self.listeners:
+            self.loop.call_soon_threadsafe(queue.put_nowait, message)
+
+
+@pytest.fixture(scope="module")
+def server():
+    fake = FakeMCPServer()
+    config = uvicorn.Config(fake.app, host="127.0.0.1", port=0, log_level="warning")
+    uv = uvicorn.Server(config)
+    thread = threading.Thread(target=uv.run, daemon=True)
+    thread.start()
+    while not uv.started:
+        time.sleep(0.01)
+    port = uv.servers[0].sockets[0].getsockname()[1]
+    fake.url = f"http://127.0.0.1:{port}/mcp"
+    yield fake
+    uv.should_exit = True
+    thread.join(timeout=5)
+
+
+@pytest_asyncio.fixture
+async def transport(server):
+    t = MCPHTTPTransport(server.url, timeout=5.0, pool_size=4)
+    t.start()
+    await t.initialize("test", "1.0")
+    yield t
+    await t.aclose()
+
+
+@pytest.mark.asyncio
+async def test_initialize_opens_session(server, transport):
+    assert transport.session_id in server.sessions
+    assert transport.protocol_version == "2025-03-26"
+    assert "notifications/initialized" in server.notifications
+
+    response = await transport.request("tools/call", {"name": "echo", "arguments": {"n": 1}})
+    assert json.loads(response["result"]["content"][0]["text"]) == {"n": 1}
+    assert await transport.list_tools() == TOOLS
+
+
+@pytest.mark.asyncio
+async def test_session_ended_on_close(server):
+    t = MCPHTTPTransport(server.url, listen=False)
+    t.start()
+    await t.initialize("test", "1.0")
+    session = t.session_id
+
+    await t.aclose()
+
+    assert session not in server.sessions
+    assert not t.is_running()
+
+
+@pytest.mark.asyncio
+async def test_sse_response_delivers_progress_then_result(transport):
+    progress = []
+    transport.add_notification_handler(
+        lambda m: progress.append(m["params"]["progress"]) if m["method"] == "notifications/progress" else None
+    )
+    timings = []
+    transport.add_call_observer(timings.append)
+
+    response = await transport.request("tools/call", {"name": "progress", "arguments": {}, "_meta": {"progressToken": 5}})
+
+    assert response["result"] == {"done": True}
+    assert progress == [1, 2]
+    assert timings[-1].outcome == "ok" and timings[-1].response_bytes > 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_a_bounded_pool(server, transport):
+    server.client_ports.clear()
+
+    responses = await asyncio.gather(*(
+        transport.request("tools/call", {"name": "slow", "arguments": {"n": n, "seconds": 0.02}})
+        for n in range(40)
+    ))
+
+    assert [json.loads(r["result"]["content"][0]["text"])["n"] for r in responses] == list(range(40))
+    # The event stream holds one pooled connection; requests share the rest
+    assert len(server.client_ports) <= 4
+
+
+@pytest.mark.asyncio
+async def test_request_timeout(transport):
+    with pytest.raises(MCPTimeoutError):
+        await transport.request("tools/call", {"name": "slow", "arguments": {"seconds": 0.5}}, timeout=0.1)
+
+
+@pytest.mark.asyncio
+async def test_expired_session_is_renewed(server, transport):
+    """A request that finds its session gone re-initializes once and is retried"""
+    expired = transport.session_id
+    server.sessions.discard(expired)
+    server.notifications.clear()
+
+    responses = await asyncio.gather(*(
+        transport.request("tools/call", {"name": "echo", "arguments": {"n": n}}) for n in range(5)
+    ))
+
+    assert [json.loads(r["result"]["content"][0]["text"])["n"] for r in responses] == list(range(5))
+    assert transport.session_id in server.sessions and transport.session_id != expired
+    # Concurrent callers share one new handshake
+    assert server.notifications.count("notifications/initialized") == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_session_without_handshake_fails(server):
+    """A transport that never initialized has no handshake to repeat"""
+    t = MCPHTTPTransport(server.url, listen=False)
+    t.start()
+    t.session_id = "session-unknown"
+    with pytest.raises(MCPTransportError, match="session expired"):
+        await t.request("tools/list", {})
+    assert t.session_id is None
+    await t.aclose()
+
+
+@pytest.mark.asyncio
+async def test_list_changed_on_event_stream_refreshes_catalog(server, transport):
+    catalog = ToolCatalog(lambda tools: {}, refresh_interval=0)
+    catalog.watch(transport)
+    await catalog.refresh()
+    while not server.listeners:
+        await asyncio.sleep(0.01)
+
+    server.change_tools(TOOLS + [{"name": "added"}])
+    for _ in range(200):
+        if catalog.get("added"):
+            break
+        await asyncio.sleep(0.01)
+
+    assert catalog.get("added") is not None
+    server.tools = list(TOOLS)
+    await catalog.close()
+
+
+def test_create_transport_prefers_url(monkeypatch):
+    monkeypatch.delenv("MCP_SERVER_URL", raising=False)
+    assert isinstance(create_transport(["node", "index.js"]), MCPStdioTransport)
+
+    monkeypatch.setenv("MCP_SERVER_URL", "http://mcp.internal/mcp")
+    monkeypatch.setenv("MCP_SERVER_TOKEN", "secret")
+    transport = create_transport(["node", "index.js"])
+    assert isinstance(transport, MCPHTTPTransport)
+    assert transport.headers == {"Authorization": "Bearer secret"}
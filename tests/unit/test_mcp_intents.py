@@ -0,0 +1,79 @@
+"""
+Unit tests for the MCP intent parser
+"""
+import json
+from pathlib import Path
+
+import pytest
+from agent_s.mcp.intents import BRIDGE_PARSER, ROUTER_PARSER, Category, IntentParser, Rule
+
+CORPUS = Path(__file__).parent.parent / "data" / "intent_corpus.jsonl"
+PARSERS = {"bridge": BRIDGE_PARSER, "router": ROUTER_PARSER}
+
+
+def load_corpus():
+    with open(CORPUS) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+@pytest.mark.parametrize("case", load_corpus(), ids=lambda c: f"{c['parser']}:{c['text'][:40]}")
+def test_corpus(case):
+    """Every corpus message maps to the expected tool and arguments"""
+    intent = PARSERS[case["parser"]].parse(case["text"])
+
+    if case["tool"] is None:
+        assert intent is None
+    else:
+        assert intent is not None
+        assert (intent["tool"], intent["args"]) == (case["tool"], case["args"])
+
+
+def test_arguments_are_typed():
+    intent = BRIDGE_PARSER.parse("complete task 42")
+
+    assert intent["args"]["id"] == 42
+    assert intent["explain"] == "Completing task #42"
+
+
+def test_earlier_category_wins():
+    """A message matching several categories uses the first one listed"""
+    parser = IntentParser([
+        Category("a", ["alpha"], [Rule("tool_a")]),
+        Category("b", ["beta"], [Rule("tool_b")]),
+    ])
+
+    assert parser.parse("beta then alpha")["tool"] == "tool_a"
+    assert [c.name for c in parser.categories_for("beta then alpha")] == ["a", "b"]
+
+
+def test_unmatched_category_falls_through():
+    """A category without a matching rule hands over to the next one"""
+    parser = IntentParser([
+        Category("a", ["alpha"], [Rule("tool_a", r"\bstrict\b")]),
+        Category("b", ["beta"], [Rule("tool_b")]),
+    ])
+
+    assert parser.parse("alpha beta")["tool"] == "tool_b"
+    assert parser.parse("strict alpha beta")["tool"] == "tool_a"
+
+
+def test_bad_conversion_skips_rule():
+    parser = IntentParser([
+        Category("a", ["alpha"], [
+            Rule("numbered", r"alpha (?P<n>\S+)", types={"n": int}),
+            Rule("fallback"),
+        ]),
+    ])
+
+    assert parser.parse("alpha 7")["args"] == {"n": 7}
+    assert parser.parse("alpha seven")["tool"] == "fallback"
+
+
+def test_router_uses_shared_parser():
+    """The router pipeline delegates to the shared rules when importable"""
+    import sys
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent / "pipelines"))
+    router = pytest.importorskip("alphaomega_router")
+
+    assert router.ROUTER_PARSER is ROUTER_PARSER
+    assert router.Pipeline()._detect_mcp_tool("Check inventory for paint") == ("check_inventory", {"product_name": "paint"})
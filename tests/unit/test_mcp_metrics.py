@@ -0,0 +1,131 @@
+"""
+Unit tests for MCP bridge call metrics
+"""
+import json
+import logging
+import sys
+import textwrap
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from agent_s.mcp.metrics import BridgeMetrics, redact
+from agent_s.mcp.transport import CallTiming, MCPStdioTransport, MCPTimeoutError
+
+
+# Echoes tools/call arguments; "slow" sleeps first, "hang" never answers
+FAKE_SERVER = textwrap.dedent('''
+    import json, sys, time
+
+    for line in sys.stdin:
+        request = json.loads(line)
+        name = request["params"].get("name")
+        if name == "hang":
+            continue
+        if name == "slow":
+            time.sleep(0.1)
+        sys.stdout.write(json.dumps({"jsonrpc": "2.0", "id": request["id"], "result": {"echo": request["params"]}}) + "\\n")
+        sys.stdout.flush()
+''')
+
+
+@pytest.fixture
+def transport(tmp_path):
+    script = tmp_path / "fake_mcp.py"
+    script.write_text(FAKE_SERVER)
+    t = MCPStdioTransport([sys.executable, str(script)], timeout=5.0)
+    t.start()
+    yield t
+    t.stop()
+
+
+def make_timing(name="list_tasks", arguments=None, server=0.002):
+    timing = CallTiming("tools/call", {"name": name, "arguments": arguments or {}})
+    timing.write_start = timing.started + 0.0001
+    timing.write_end = timing.write_start + 0.0002
+    timing.received = timing.write_end + server
+    timing.decoded = timing.received + 0.0003
+    timing.request_bytes = 120
+    timing.response_bytes = 4000
+    timing.outcome = "ok"
+    return timing
+
+
+def test_redact_keeps_shape_only():
+    redacted = redact({"title": "Pay rent", "id": 7, "done": False, "tags": ["a", "b"], "meta": {"note": "secret"}})
+
+    assert redacted == {"title": "<str:8>", "id": "<int>", "done": False,
+                        "tags": ["<str:1>", "<str:1>"], "meta": {"note": "<str:6>"}}
+    assert "secret" not in json.dumps(redacted)
+
+
+def test_metrics_endpoint_exposes_per_tool_histograms():
+    metrics = BridgeMetrics(slow_seconds=0)
+    metrics.observe(make_timing("list_tasks"))
+    metrics.observe(make_timing("add_task"))
+
+    app = FastAPI()
+    app.get("/metrics")(lambda: metrics.response())
+    body = TestClient(app).get("/metrics").text
+
+    assert 'mcp_calls_total{outcome="ok",tool="list_tasks"} 1.0' in body
+    for phase in ("queue", "write", "server", "decode"):
+        assert f'mcp_call_phase_seconds_count{{phase="{phase}",tool="add_task"}} 1.0' in body
+    assert 'mcp_payload_bytes_sum{direction="response",tool="list_tasks"} 4000.0' in body
+
+
+def test_slow_calls_are_logged_without_argument_values(caplog):
+    metrics = BridgeMetrics(slow_seconds=0.05)
+
+    with caplog.at_level(logging.WARNING, logger="agent_s.mcp.slow"):
+        metrics.observe(make_timing("fast_tool", {"q": "private"}))
+        metrics.observe(make_timing("search_notes", {"query": "private"}, server=0.1))
+
+    assert len(caplog.records) == 1
+    message = caplog.records[0].getMessage()
+    assert "search_notes" in message and "server=" in message
+    assert '"query": "<str:7>"' in message
+    assert "private" not in message
+
+
+def test_spans_written_to_file(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    metrics = BridgeMetrics(slow_seconds=0, span_file=str(path))
+
+    metrics.observe(make_timing("list_tasks"))
+    metrics.close()
+
+    spans = [json.loads(line) for line in path.read_text().splitlines()]
+    root, children = spans[0], spans[1:]
+    assert root["name"] == "tools/call list_tasks"
+    assert [c["name"] for c in children] == ["queue", "write", "server", "decode"]
+    assert all(c["parentSpanId"] == root["spanId"] and c["traceId"] == root["traceId"] for c in children)
+    assert children[-1]["endTimeUnixNano"] <= root["endTimeUnixNano"]
+
+
+@pytest.mark.asyncio
+async def test_transport_reports_call_timings(transport):
+    seen = []
+    transport.add_call_observer(seen.append)
+
+    await transport.request("tools/call", {"name": "slow", "arguments": {"x": 1}})
+
+    assert len(seen) == 1
+    timing = seen[0]
+    phases = timing.phases()
+    assert timing.name == "slow" and timing.outcome == "ok"
+    assert set(phases) == {"queue", "write", "server", "decode"}
+    assert phases["server"] >= 0.09
+    assert timing.request_bytes > 0 and timing.response_bytes > 0
+
+
+@pytest.mark.asyncio
+async def test_transport_reports_timeouts(transport):
+    seen = []
+    transport.add_call_observer(seen.append)
+
+    with pytest.raises(MCPTimeoutError):
+        await transport.request("tools/call", {"name": "hang"}, timeout=0.1)
+
+    assert [t.outcome for t in seen] == ["timeout"]
+    assert transport._timings == {}
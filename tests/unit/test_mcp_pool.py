@@ -0,0 +1,86 @@
+"""
+Unit tests for the MCP transport pool
+"""
+import asyncio
+import sys
+import textwrap
+
+import pytest
+from agent_s.mcp.pool import MCPTransportPool
+from agent_s.mcp.transport import MCPStdioTransport, MCPTransportError
+
+# Answers tools/call with its own pid after arguments["delay"] seconds;
+# "announce" makes it send tools/list_changed first
+FAKE_SERVER = textwrap.dedent('''
+    import json, os, sys, threading, time
+
+    lock = threading.Lock()
+
+    def emit(message):
+        with lock:
+            sys.stdout.write(json.dumps(message) + "\\n")
+            sys.stdout.flush()
+
+    def answer(request):
+        arguments = request["params"].get("arguments", {})
+        time.sleep(arguments.get("delay", 0))
+        if arguments.get("announce"):
+            emit({"jsonrpc": "2.0", "method": "notifications/tools/list_changed"})
+        emit({"jsonrpc": "2.0", "id": request["id"], "result": {"pid": os.getpid()}})
+
+    for line in sys.stdin:
+        request = json.loads(line)
+        if "id" in request:
+            threading.Thread(target=answer, args=(request,), daemon=True).start()
+''')
+
+
+@pytest.fixture
+def pool(tmp_path):
+    script = tmp_path / "fake_mcp.py"
+    script.write_text(FAKE_SERVER)
+    p = MCPTransportPool(
+        [MCPStdioTransport([sys.executable, str(script)], timeout=5.0, max_in_flight=0) for _ in range(2)],
+        max_in_flight=4
+    )
+    p.start()
+    yield p
+    p.stop()
+
+
+@pytest.mark.asyncio
+async def test_requests_spread_over_workers(pool):
+    responses = await asyncio.gather(*(
+        pool.request("tools/call", {"name": "t", "arguments": {"delay": 0.05}}) for _ in range(8)
+    ))
+
+    pids = [r["result"]["pid"] for r in responses]
+    assert len(set(pids)) == 2
+    assert sorted(pids.count(pid) for pid in set(pids)) == [4, 4]
+    assert pool.flow_stats()["workers"] == [0, 0]
+    assert pool.flow_stats()["limit"] == 4
+
+
+@pytest.mark.asyncio
+async def test_worker_events_reach_pool_subscribers(pool):
+    notifications, timings = [], []
+    pool.add_notification_handler(notifications.append)
+    pool.add_call_observer(timings.append)
+
+    await pool.request("tools/call", {"name": "t", "arguments": {"announce": True}})
+
+    assert notifications[0]["method"] == "notifications/tools/list_changed"
+    assert [t.name for t in timings] == ["t"]
+
+
+@pytest.mark.asyncio
+async def test_stopped_worker_is_skipped(pool):
+    pool.workers[0].stop()
+
+    responses = await asyncio.gather(*(pool.request("tools/call", {"name": "t"}) for _ in range(3)))
+
+    assert {r["result"]["pid"] for r in responses} == {pool.workers[1].process.pid}
+    pool.workers[1].stop()
+    assert not pool.is_running()
+    with pytest.raises(MCPTransportError):
+        await pool.request("tools/call", {"name": "t"})
@@ -0,0 +1,189 @@
+"""
+Unit tests for the MCP tool result cache
+"""
+import asyncio
+
+import pytest
+from agent_s.mcp.catalog import ToolCatalog
+from agent_s.mcp.result_cache import READ, UNKNOWN, WRITE, ToolResultCache
+
+
+class FakeServer:
+    """Counts tools/call round-trips and answers with a call number"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+
+    def fetch(self, name, arguments=None, error=False):
+        async def _fetch():
+            self.calls.append((name, arguments))
+            await asyncio.sleep(self.delay)
+            if error:
+                return {"jsonrpc": "2.0", "result": {"isError": True, "content": []}}
+            return {"jsonrpc": "2.0", "result": {"n": len(self.calls)}}
+        return _fetch
+
+
+@pytest.fixture
+def cache():
+    return ToolResultCache(default_ttl=60, ttls={})
+
+
+def test_classification_by_name(cache):
+    assert cache.classify("list_tasks") == READ
+    assert cache.classify("get_sales_report") == READ
+    assert cache.classify("add_task") == WRITE
+    assert cache.classify("record_sale") == WRITE
+    assert cache.classify("frobnicate") == UNKNOWN
+
+
+def test_annotations_override_name():
+    """MCP tool annotations win over the naming convention"""
+    catalog = ToolCatalog(lambda tools: {}, refresh_interval=0)
+    catalog.update([
+        {"name": "list_and_archive", "annotations": {"readOnlyHint": False}},
+        {"name": "frobnicate", "annotations": {"readOnlyHint": True}},
+    ])
+    cache = ToolResultCache(catalog=catalog, default_ttl=60)
+
+    assert cache.classify("list_and_archive") == WRITE
+    assert cache.classify("frobnicate") == READ
+
+
+@pytest.mark.asyncio
+async def test_reads_hit_until_ttl_expires():
+    server = FakeServer()
+    cache = ToolResultCache(default_ttl=0.05)
+
+    first = await cache.call("list_tasks", {}, server.fetch("list_tasks"))
+    second = await cache.call("list_tasks", {}, server.fetch("list_tasks"))
+    assert first == second
+    assert len(server.calls) == 1
+
+    await asyncio.sleep(0.06)
+    await cache.call("list_tasks", {}, server.fetch("list_tasks"))
+    assert len(server.calls) == 2
+    assert cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_arguments_are_part_of_the_key(cache):
+    server = FakeServer()
+
+    await cache.call("list_tasks", {"status": "open", "limit": 5}, server.fetch("list_tasks"))
+    await cache.call("list_tasks", {"limit": 5, "status": "open"}, server.fetch("list_tasks"))
+    await cache.call("list_tasks", {"status": "done"}, server.fetch("list_tasks"))
+
+    assert len(server.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_write_invalidates_related_reads(cache):
+    """add_task drops list_tasks but leaves list_inventory cached"""
+    server = FakeServer()
+    await cache.call("list_tasks", {}, server.fetch("list_tasks"))
+    await cache.call("list_inventory", {}, server.fetch("list_inventory"))
+
+    await cache.call("add_task", {"title": "Order paint"}, server.fetch("add_task"))
+    await cache.call("list_tasks", {}, server.fetch("list_tasks"))
+    await cache.call("list_inventory", {}, server.fetch("list_inventory"))
+
+    assert [name for name, _ in server.calls] == ["list_tasks", "list_inventory", "add_task", "list_tasks"]
+
+
+@pytest.mark.asyncio
+async def test_failed_write_keeps_cache(cache):
+    server = FakeServer()
+    await cache.call("list_tasks", {}, server.fetch("list_tasks"))
+
+    await cache.call("add_task", {}, server.fetch("add_task", error=True))
+    await cache.call("list_tasks", {}, server.fetch("list_tasks"))
+
+    assert len(server.calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_explicit_invalidation_and_unknown_tools(cache):
+    """Declared dependencies are honoured and unknown tools clear everything"""
+    cache.invalidates = {"record_sale": {"list_inventory"}}
+    server = FakeServer()
+    await cache.call("list_inventory", {}, server.fetch("list_inventory"))
+    await cache.call("list_tasks", {}, server.fetch("list_tasks"))
+
+    await cache.call("record_sale", {}, server.fetch("record_sale"))
+    assert cache.stats()["entries"] == 1
+
+    await cache.call("frobnicate", {}, server.fetch("frobnicate"))
+    assert cache.stats()["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_identical_reads_are_coalesced(cache):
+    server = FakeServer(delay=0.05)
+
+    results = await asyncio.gather(*(
+        cache.call("list_tasks", {}, server.fetch("list_tasks")) for _ in range(10)
+    ))
+
+    assert len(server.calls) == 1
+    assert all(r == results[0] for r in results)
+    assert cache.stats()["coalesced"] == 9
+
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_does_not_cancel_followers(cache):
+    """Callers sharing a read fetch it themselves if the first caller goes away"""
+    server = FakeServer(delay=0.05)
+
+    leader = asyncio.ensure_future(cache.call("list_tasks", {}, server.fetch("list_tasks")))
+    await asyncio.sleep(0.01)
+    followers = [
+        asyncio.ensure_future(cache.call("list_tasks", {}, server.fetch("list_tasks")))
+        for _ in range(3)
+    ]
+    await asyncio.sleep(0.01)
+    leader.cancel()
+    results = await asyncio.gather(*followers)
+
+    assert leader.cancelled()
+    # One follower re-fetched for all of them
+    assert len(server.calls) == 2
+    assert all(r == results[0] for r in results)
+    assert cache.stats()["entries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_write_during_read_prevents_stale_store(cache):
+    """A read that started before a write is not cached afterwards"""
+    server = FakeServer(delay=0.05)
+
+    read = asyncio.ensure_future(cache.call("list_tasks", {}, server.fetch("list_tasks")))
+    await asyncio.sleep(0.01)
+    await cache.call("add_task", {}, FakeServer().fetch("add_task"))
+    await read
+
+    assert cache.stats()["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_zero_ttl_disables_caching_per_tool():
+    server = FakeServer()
+    cache = ToolResultCache(default_ttl=60, ttls={"list_tasks": 0})
+
+    for _ in range(3):
+        await cache.call("list_tasks", {}, server.fetch("list_tasks"))
+
+    assert len(server.calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction():
+    server = FakeServer()
+    cache = ToolResultCache(default_ttl=60, max_entries=2)
+
+    for n in range(3):
+        await cache.call("list_tasks", {"page": n}, server.fetch("list_tasks"))
+
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["evictions"] == 1
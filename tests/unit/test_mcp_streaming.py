@@ -0,0 +1,123 @@
+"""
+Unit tests for streaming large MCP tool results
+"""
+import json
+import threading
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from agent_s.mcp.codec import get_codec
+from agent_s.mcp.streaming import SpillBuffer, StreamCancelled, iter_json, iter_ndjson, result_response
+
+CODEC = get_codec()
+
+ROWS = [{"sku": f"SKU-{i}", "name": f"Item {i}", "quantity": i} for i in range(2000)]
+RESULTS = [
+    ROWS,
+    {"content": [{"type": "text", "text": json.dumps(row)} for row in ROWS[:50]], "isError": False},
+    {"title": "Pay rent", "id": 3},
+    "plain text",
+    [],
+]
+
+
+@pytest.mark.parametrize("result", RESULTS, ids=["list", "mcp-content", "dict", "str", "empty"])
+@pytest.mark.parametrize("chunk_size", [1, 256, 1 << 20])
+def test_iter_json_matches_one_shot_encoding(result, chunk_size):
+    body = b"".join(iter_json({"success": True, "tool": "t"}, result, CODEC, chunk_size))
+
+    assert json.loads(body) == {"success": True, "tool": "t", "result": result}
+
+
+def test_iter_json_chunks_are_bounded():
+    chunks = list(iter_json({}, ROWS, CODEC, 4096))
+
+    assert len(chunks) > 10
+    # Every chunk but the last reaches the target, and overshoots by at most one row
+    assert all(4096 <= len(c) < 4096 + 100 for c in chunks[:-1])
+
+
+def test_ndjson_one_line_per_item():
+    content = {"content": [{"type": "text", "text": "a"}, {"type": "text", "text": "b"}]}
+
+    lines = b"".join(iter_ndjson(content, CODEC, 64)).splitlines()
+    assert [json.loads(line) for line in lines] == content["content"]
+
+    lines = b"".join(iter_ndjson({"id": 1}, CODEC, 64)).splitlines()
+    assert [json.loads(line) for line in lines] == [{"id": 1}]
+
+
+def test_spill_buffer_spills_and_preserves_order():
+    buffer = SpillBuffer(max_memory=100)
+    chunks = [bytes([65 + i]) * 30 for i in range(10)]
+    for chunk in chunks:
+        buffer.write(chunk)
+    buffer.close()
+
+    assert buffer.spilled_bytes == 300 - 90
+    assert b"".join(buffer) == b"".join(chunks)
+
+
+def test_spill_buffer_reader_waits_for_writer():
+    buffer = SpillBuffer(max_memory=10)
+    received = []
+    reader = threading.Thread(target=lambda: received.extend(buffer))
+    reader.start()
+    for i in range(50):
+        buffer.write(b"%03d" % i)
+    buffer.close()
+    reader.join(timeout=5)
+
+    assert b"".join(received) == b"".join(b"%03d" % i for i in range(50))
+
+
+def test_spill_buffer_cancel_stops_writer():
+    buffer = SpillBuffer(max_memory=10)
+    buffer.write(b"x" * 20)
+    buffer.cancel()
+
+    with pytest.raises(StreamCancelled):
+        buffer.write(b"more")
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+
+    @app.get("/result")
+    async def result(request: Request, rows: int, max_memory: int = 1 << 20):
+        response = await result_response(
+            {"success": True}, ROWS[:rows],
+            ndjson=request.query_params.get("format") == "ndjson",
+            chunk_size=1024, max_memory=max_memory
+        )
+        app.state.last = response
+        return response
+
+    return TestClient(app)
+
+
+def test_small_result_is_a_plain_response(client):
+    response = client.get("/result", params={"rows": 3})
+
+    assert response.headers["content-length"] == str(len(response.content))
+    assert not isinstance(client.app.state.last, StreamingResponse)
+    assert response.json() == {"success": True, "result": ROWS[:3]}
+
+
+@pytest.mark.parametrize("max_memory", [1 << 20, 2048])
+def test_large_result_is_streamed(client, max_memory):
+    response = client.get("/result", params={"rows": 2000, "max_memory": max_memory})
+
+    assert isinstance(client.app.state.last, StreamingResponse)
+    assert "content-length" not in response.headers
+    assert response.json() == {"success": True, "result": ROWS}
+
+
+def test_ndjson_response(client):
+    response = client.get("/result", params={"rows": 2000, "format": "ndjson"})
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line) for line in response.text.splitlines()] == ROWS
@@ -0,0 +1,128 @@
+"""
+Unit tests for the MCP stdio transport
+"""
+import asyncio
+import sys
+import textwrap
+import threading
+
+import pytest
+from agent_s.mcp.transport import MCPStdioTransport, MCPTimeoutError, MCPTransportError
+
+
+# Answers every request out of order after a random delay and sprinkles
+# notifications in between, which is the worst case for response routing
+FAKE_SERVER = textwrap.dedent('''
+    import json, random, sys, threading, time
+
+    lock = threading.Lock()
+
+    def emit(message):
+        with lock:
+            sys.stdout.write(json.dumps(message) + "\\n")
+            sys.stdout.flush()
+
+    def answer(request):
+        time.sleep(random.uniform(0, 0.005))
+        if request["method"] == "tools/call" and request["params"].get("name") == "hang":
+            return
+        if request["method"] == "tools/call" and request["params"].get("name") == "exit":
+            sys.stdout.flush()
+            import os
+            os._exit(0)
+        if request["method"] == "tools/list":
+            emit({"jsonrpc": "2.0", "id": request["id"], "error": {"code": -32603, "message": "backend down"}})
+            return
+        if random.random() < 0.1:
+            emit({"jsonrpc": "2.0", "method": "notifications/message", "params": {}})
+        emit({"jsonrpc": "2.0", "id": request["id"], "result": {"echo": request["params"]}})
+
+    for line in sys.stdin:
+        request = json.loads(line)
+        if "id" not in request:
+            continue
+        threading.Thread(target=answer, args=(request,), daemon=True).start()
+''')
+
+
+@pytest.fixture
+def transport(tmp_path):
+    """Start a transport against the out-of-order fake server"""
+    script = tmp_path / "fake_mcp.py"
+    script.write_text(FAKE_SERVER)
+    # Queue room for the 500-request burst below; the window stays at its default
+    t = MCPStdioTransport([sys.executable, str(script)], timeout=5.0, max_queue=1000)
+    t.start()
+    yield t
+    t.stop()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_not_crossed(transport):
+    """Stress test: every caller gets the response to its own request"""
+    async def call(n):
+        response = await transport.request("tools/call", {"name": "echo", "arguments": {"n": n}})
+        return n, response
+
+    results = await asyncio.gather(*(call(n) for n in range(500)))
+
+    for n, response in results:
+        assert response["result"]["echo"]["arguments"]["n"] == n
+    assert transport._pending == {}
+
+
+def test_sync_requests_from_threads_are_not_crossed(transport):
+    """Blocking callers on many threads are routed correctly too"""
+    mismatches = []
+
+    def worker(base):
+        for n in range(base, base + 25):
+            response = transport.request_sync("tools/call", {"name": "echo", "arguments": {"n": n}})
+            if response["result"]["echo"]["arguments"]["n"] != n:
+                mismatches.append(n)
+
+    threads = [threading.Thread(target=worker, args=(i * 100,)) for i in range(8)]
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+
+    assert mismatches == []
+
+
+def test_notifications_reach_handlers(transport):
+    """Messages without an id go to notification handlers, not callers"""
+    seen = []
+    transport.add_notification_handler(seen.append)
+
+    for n in range(200):
+        transport.request_sync("tools/call", {"name": "echo", "arguments": {"n": n}})
+
+    assert seen
+    assert all(m["method"] == "notifications/message" for m in seen)
+
+
+@pytest.mark.asyncio
+async def test_request_timeout(transport):
+    """A request the server never answers times out and is forgotten"""
+    with pytest.raises(MCPTimeoutError):
+        await transport.request("tools/call", {"name": "hang"}, timeout=0.2)
+
+    assert transport._pending == {}
+
+
+@pytest.mark.asyncio
+async def test_list_tools_error_is_raised(transport):
+    """A JSON-RPC error to tools/list is not mistaken for an empty tool list"""
+    with pytest.raises(MCPTransportError, match="backend down"):
+        await transport.list_tools()
+
+
+@pytest.mark.asyncio
+async def test_server_exit_fails_pending_requests(transport):
+    """Outstanding requests fail fast when the child goes away"""
+    pending = transport.send("tools/call", {"name": "hang"})
+    transport.send("tools/call", {"name": "exit"})
+
+    with pytest.raises(MCPTransportError):
+        await asyncio.wait_for(asyncio.wrap_future(pending), timeout=2.0)
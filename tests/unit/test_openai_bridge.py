@@ -0,0 +1,265 @@
+"""
+Unit tests for the MCP OpenAI bridge
+"""
+import asyncio
+import json
+import sys
+import textwrap
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+import agent_s.mcp.bridge.openai_api as openai_api
+import agent_s.mcp.bridge.tool_server as tool_server
+from agent_s.mcp.bridge import BridgeCore, create_app
+from agent_s.mcp.catalog import ToolCatalog
+
+
+TASKS = [
+    {"id": 1, "title": "Order canvas", "completed": False, "due": "friday"},
+    {"id": 2, "title": "Pay rent", "completed": True},
+]
+
+
+class FakeTransport:
+    """In-process stand-in for MCPStdioTransport"""
+
+    def __init__(self, result, delay=0.0, progress=()):
+        self.result = result
+        self.delay = delay
+        self.progress = progress
+        self.handlers = []
+        self.calls = []
+
+    def is_running(self):
+        return True
+
+    def add_notification_handler(self, handler):
+        self.handlers.append(handler)
+
+    def remove_notification_handler(self, handler):
+        self.handlers.remove(handler)
+
+    async def request(self, method, params=None, timeout=None):
+        self.calls.append((method, params))
+        token = (params or {}).get("_meta", {}).get("progressToken")
+        for step in self.progress:
+            await asyncio.sleep(self.delay)
+            for handler in list(self.handlers):
+                handler({"method": "notifications/progress",
+                         "params": {"progressToken": token, "progress": step, "total": len(self.progress)}})
+        await asyncio.sleep(self.delay)
+        return {"jsonrpc": "2.0", "result": self.result}
+
+
+FRONTENDS = ("openai", "tools")
+
+
+@pytest.fixture
+def core():
+    # Each test starts with an empty catalog and result cache
+    return BridgeCore(catalog=ToolCatalog(None, refresh_interval=0))
+
+
+@pytest.fixture
+def client(core):
+    return TestClient(create_app(core, frontends=FRONTENDS))
+
+
+def read_events(response):
+    """Split an SSE body into decoded chunks, stopping at [DONE]"""
+    events = []
+    for block in response.text.split("\n\n"):
+        if not block.startswith("data: "):
+            continue
+        data = block[len("data: "):]
+        if data == "[DONE]":
+            events.append("[DONE]")
+            break
+        events.append(json.loads(data))
+    return events
+
+
+def content_of(events):
+    return "".join(e["choices"][0]["delta"].get("content") or "" for e in events if e != "[DONE]")
+
+
+def test_stream_result_matches_formatted_result():
+    """Streaming renders exactly the text the non-streaming path returns"""
+    cases = [
+        ("list_tasks", TASKS),
+        ("list_tasks", []),
+        ("list_inventory", [{"name": "Canvas", "quantity": 4}, "junk"]),
+        ("list_expenses", [{"date": "2025-01-01", "amount": "12.5", "category": "paint"}]),
+        ("unknown_tool", {"a": 1}),
+    ]
+    for tool, result in cases:
+        assert "".join(openai_api._stream_result_for_chat(tool, result)) == openai_api._format_result_for_chat(tool, result)
+
+
+def test_stream_result_falls_back_to_json_mid_render():
+    """A result the formatter chokes on still ends with its JSON dump"""
+    result = {"content": [{"type": "text"}]}
+
+    streamed = "".join(openai_api._stream_result_for_chat("list_tasks", result))
+
+    assert streamed.endswith(json.dumps(result))
+
+
+def test_chat_stream_sends_role_then_result(client, core):
+    """A streamed chat starts with a role chunk and ends with [DONE]"""
+    core.transport = FakeTransport(TASKS)
+
+    response = client.post("/v1/chat/completions", json={
+        "messages": [{"role": "user", "content": "what tasks do I have?"}],
+        "stream": True
+    })
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = read_events(response)
+    assert events[0]["choices"][0]["delta"]["role"] == "assistant"
+    assert events[0]["object"] == "chat.completion.chunk"
+    assert events[-2]["choices"][0]["finish_reason"] == "stop"
+    assert events[-1] == "[DONE]"
+    assert content_of(events) == openai_api._format_result_for_chat("list_tasks", TASKS)
+    # One chunk per rendered line, not one blob
+    assert len(events) == 2 + 1 + len(TASKS) + 1
+
+
+def test_chat_stream_reports_slow_tools(client, core, monkeypatch):
+    """Long-running tools get a progress line before the result"""
+    monkeypatch.setattr(openai_api, "STREAM_PROGRESS_SECONDS", 0.02)
+    core.transport = FakeTransport(TASKS, delay=0.1)
+
+    response = client.post("/v1/chat/completions", json={
+        "messages": [{"role": "user", "content": "list my tasks"}],
+        "stream": True
+    })
+
+    content = content_of(read_events(response))
+    assert content.startswith("_⏳ Running list_tasks…_\n")
+    assert content.endswith(openai_api._format_result_for_chat("list_tasks", TASKS))
+    assert ": still running" in response.text
+
+
+def test_chat_stream_relays_mcp_progress(client, core, monkeypatch):
+    """MCP progress notifications for this call are shown in the stream"""
+    monkeypatch.setattr(openai_api, "STREAM_PROGRESS_SECONDS", 0.02)
+    fake = FakeTransport(TASKS, delay=0.05, progress=(1, 2))
+    core.transport = fake
+
+    response = client.post("/v1/chat/completions", json={
+        "messages": [{"role": "user", "content": "list my tasks"}],
+        "stream": True
+    })
+
+    content = content_of(read_events(response))
+    assert "list_tasks: 2/2" in content
+    assert fake.handlers == []
+
+
+def test_chat_without_stream_is_unchanged(client, core):
+    """stream=false still returns a single chat.completion body"""
+    core.transport = FakeTransport(TASKS)
+
+    response = client.post("/v1/chat/completions", json={
+        "messages": [{"role": "user", "content": "what tasks do I have?"}]
+    })
+
+    body = response.json()
+    assert body["object"] == "chat.completion"
+    assert body["choices"][0]["message"]["content"] == openai_api._format_result_for_chat("list_tasks", TASKS)
+
+
+def test_repeated_read_served_from_cache(client, core):
+    """A second identical read does not reach the MCP server"""
+    fake = FakeTransport(TASKS)
+    core.transport = fake
+
+    for _ in range(2):
+        response = client.post("/tools/list_tasks/execute", json={})
+        assert response.json()["success"] is True
+
+    assert len(fake.calls) == 1
+    assert client.get("/health").json()["cache"]["hits"] == 1
+
+
+def test_execute_ndjson(client, core):
+    """?format=ndjson returns one line per item of a list result"""
+    core.transport = FakeTransport(TASKS)
+
+    response = client.post("/tools/list_tasks/execute?format=ndjson", json={})
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line) for line in response.text.splitlines()] == TASKS
+
+
+# MCP server that takes a while to initialize, like node loading mcpart
+SLOW_START_SERVER = textwrap.dedent('''
+    import json, sys, time
+
+    for line in sys.stdin:
+        request = json.loads(line)
+        if "id" not in request:
+            continue
+        if request["method"] == "initialize":
+            time.sleep(1.0)
+            result = {"serverInfo": {"name": "slow"}}
+        else:
+            result = {"tools": [{"name": "list_tasks"}, {"name": "add_task"}]}
+        sys.stdout.write(json.dumps({"jsonrpc": "2.0", "id": request["id"], "result": result}) + "\\n")
+        sys.stdout.flush()
+''')
+
+
+def test_cold_start_serves_manifest_while_mcp_starts(tmp_path, monkeypatch):
+    """Tools are served from the manifest at once; the live list replaces it when MCP is up"""
+    script = tmp_path / "slow_mcp.py"
+    script.write_text(SLOW_START_SERVER)
+    command = f"{sys.executable} {script}"
+    manifest = tmp_path / "tools.json"
+    manifest.write_text(json.dumps({"key": command, "tools": [{"name": "list_tasks"}]}))
+
+    catalog = ToolCatalog(None, refresh_interval=0, manifest_path=str(manifest))
+    monkeypatch.setenv("MCP_SERVER_COMMAND", command)
+
+    started = time.perf_counter()
+    with TestClient(create_app(BridgeCore(catalog=catalog), frontends=FRONTENDS)) as client:
+        assert client.get("/tools").json()["count"] == 1
+        assert time.perf_counter() - started < 0.5
+        assert client.get("/health").json()["mcp"] == "starting"
+
+        # Requests needing MCP wait for it instead of failing
+        assert client.post("/tools/list_tasks/execute", json={}).json()["success"] is True
+        health = client.get("/health").json()
+        assert (health["mcp"], health["tools_source"], health["tools"]) == ("running", "server", 2)
+
+    saved = json.loads(manifest.read_text())
+    assert saved["key"] == command
+    assert [t["name"] for t in saved["tools"]] == ["list_tasks", "add_task"]
+
+
+def test_dashboard_rendered_once_per_tool_list(monkeypatch):
+    """The dashboard is cached per tool list, revalidated by ETag, and inlines no schemas"""
+    renders = []
+    render = tool_server._render_dashboard
+    monkeypatch.setattr(tool_server, "_render_dashboard", lambda tools: renders.append(1) or render(tools))
+    catalog = ToolCatalog(None, refresh_interval=0)
+    schema = {"type": "object", "properties": {"title": {"type": "string"}}}
+    catalog.update([{"name": f"tool_{i}", "description": "<b>Tool</b> & co", "inputSchema": schema} for i in range(80)])
+    client = TestClient(create_app(BridgeCore(catalog=catalog), frontends=FRONTENDS))
+
+    first = client.get("/dashboard", headers={"Accept-Encoding": "gzip"})
+    again = client.get("/dashboard", headers={"If-None-Match": first.headers["etag"]})
+
+    assert first.headers["content-encoding"] == "gzip"
+    assert first.text.count("data-tool='tool_") == 80
+    assert '"properties"' not in first.text
+    assert "&lt;b&gt;Tool&lt;/b&gt; &amp; co" in first.text
+    assert again.status_code == 304
+    assert len(renders) == 1
+
+    catalog.update(catalog.tools[:3])
+    assert client.get("/dashboard").text.count("data-tool=") == 3
+    assert len(renders) == 2
@@ -0,0 +1,109 @@
+"""
+Unit tests for the LLM action planner
+"""
+import json
+
+import pytest
+from PIL import Image, ImageDraw
+
+from agent_s.planning.planner import ActionPlanner
+from agent_s.planning.schema import PlanError, plan_errors, validate_plan
+from agent_s.vision.frame import Frame
+from agent_s.vision.screen_cache import ScreenCache
+
+CLICK_SAVE = {"actions": [
+    {"type": "mouse", "params": {"action": "click", "x": 640, "y": 20}, "description": "Click Save"},
+    {"type": "wait", "params": {"duration": 1}, "description": "Wait for the dialog"},
+    {"type": "keyboard", "params": {"action": "type", "text": "notes.txt"}, "description": "Type the file name"},
+    {"type": "keyboard", "params": {"action": "press", "key": "enter"}, "description": "Confirm"},
+]}
+
+
+class StubLLM:
+    """Answers chat() with fixed plans, in order, and records the requests"""
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.calls = []
+
+    async def chat(self, model, messages, format=None, options=None):
+        self.calls.append(messages)
+        answer = self.answers.pop(0)
+        return {"message": {"content": answer if isinstance(answer, str) else json.dumps(answer)}}
+
+
+def screen(window=False):
+    img = Image.new("RGB", (1280, 720), color="white")
+    if window:
+        ImageDraw.Draw(img).rectangle((100, 100, 700, 500), fill="navy")
+    return Frame(img)
+
+
+def planner(*answers):
+    return ActionPlanner(client=StubLLM(*answers), model="stub", cache=ScreenCache(ttl=60, max_distance=0))
+
+
+def test_validate_plan_checks_each_action_schema():
+    assert validate_plan(CLICK_SAVE, (1280, 720)) == CLICK_SAVE["actions"]
+
+    errors = plan_errors({"actions": [
+        {"type": "mouse", "params": {"action": "drag", "x": 10}, "description": "Drag"},
+        {"type": "keyboard", "params": {"action": "hotkey"}, "description": "Shortcut"},
+        {"type": "shell", "params": {}, "description": "rm"},
+        {"type": "mouse", "params": {"action": "click", "x": 2000, "y": 5}, "description": "Off screen"},
+    ]}, (1280, 720))
+
+    assert len(errors) == 4
+    assert "'y' is a required property" in errors[0]
+    assert "'keys' is a required property" in errors[1]
+    assert errors[2].startswith("Action 3: type must be one of")
+    assert "outside the 1280x720 screen" in errors[3]
+    with pytest.raises(PlanError):
+        validate_plan({"steps": []})
+
+
+@pytest.mark.asyncio
+async def test_plan_is_cached_by_prompt_and_screen():
+    p = planner(CLICK_SAVE, CLICK_SAVE)
+
+    first = await p.plan("Save the file as notes.txt", "Editor with a Save button at the top", frame=screen())
+    first[0]["params"]["x"] = 0
+    again = await p.plan("save the file  as notes.txt", "Editor with a Save button at the top", frame=screen())
+    other_screen = await p.plan("Save the file as notes.txt", "A browser", frame=screen(window=True))
+
+    assert again == other_screen == CLICK_SAVE["actions"]
+    assert p.llm_calls == 2
+    request = p.client.calls[0][1]["content"]
+    assert "Screen size: 1280x720" in request
+    assert "Editor with a Save button" in request
+
+
+@pytest.mark.asyncio
+async def test_invalid_plan_is_retried_with_errors():
+    p = planner("not json", "```json\n" + json.dumps(CLICK_SAVE) + "\n```")
+
+    actions = await p.plan("Save the file", "Editor", frame=screen())
+
+    assert actions == CLICK_SAVE["actions"]
+    assert p.invalid_plans == 1
+    feedback = p.client.calls[1][-1]["content"]
+    assert "Not valid JSON" in feedback
+
+
+@pytest.mark.asyncio
+async def test_persistently_invalid_plan_raises_and_is_not_cached():
+    bad = {"actions": [{"type": "mouse", "params": {"action": "click", "x": 5000, "y": 5}, "description": "Click"}]}
+    p = planner(bad, bad)
+
+    with pytest.raises(PlanError, match="outside the 1280x720 screen"):
+        await p.plan("Click OK", "A dialog", frame=screen())
+
+    assert p.cache.stats()["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_observation_requests_skip_the_llm():
+    p = planner()
+
+    assert await p.plan("What's on my screen?", "A desktop", frame=screen()) == []
+    assert p.llm_calls == 0
@@ -0,0 +1,76 @@
+"""
+Unit tests for the perceptual-hash screen cache
+"""
+import pytest
+from unittest.mock import patch
+from PIL import Image, ImageDraw
+
+from agent_s.vision.analyzer import VisionAnalyzer
+from agent_s.vision.frame import Frame
+from agent_s.vision.screen_cache import ScreenCache, dhash, hamming
+
+
+def desktop(dialog=False, cursor=False):
+    img = Image.new('RGB', (1280, 720), color=(40, 44, 52))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle((100, 80, 900, 600), fill=(245, 245, 245))
+    draw.rectangle((100, 80, 900, 108), fill=(60, 120, 200))
+    if dialog:
+        draw.rectangle((450, 250, 850, 450), fill=(200, 60, 60))
+    if cursor:
+        draw.rectangle((640, 360, 641, 376), fill=(0, 0, 0))
+    return img
+
+
+def test_dhash_tolerates_small_changes_and_sees_dialogs():
+    base = dhash(desktop())
+
+    assert hamming(base, dhash(desktop())) == 0
+    assert hamming(base, dhash(desktop(cursor=True))) <= 3
+    assert hamming(base, dhash(desktop(dialog=True))) > 3
+
+
+def test_lookup_matches_prompt_distance_and_ttl(monkeypatch):
+    cache = ScreenCache(ttl=10, max_distance=3)
+    now = [100.0]
+    monkeypatch.setattr("agent_s.vision.screen_cache.time.monotonic", lambda: now[0])
+
+    cache.put(0b1010, "What is  on the screen?", "A desktop")
+
+    assert cache.get(0b1011, "what is on the screen?") == "A desktop"
+    assert cache.get(0b0101, "what is on the screen?") is None
+    assert cache.get(0b1010, "click the button") is None
+    now[0] += 11
+    assert cache.get(0b1010, "what is on the screen?") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_nearest_entry_wins_and_lru_evicts():
+    cache = ScreenCache(ttl=10, max_distance=4, max_entries=2)
+    cache.put(0b0000, "p", "far")
+    cache.put(0b0011, "p", "near")
+
+    assert cache.get(0b0111, "p") == "near"
+
+    cache.put(0b1111, "q", "other")
+    assert cache.get(0b0011, "p") == "near"
+    assert cache.stats()["evictions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_analyzer_skips_model_for_unchanged_screen():
+    analyzer = VisionAnalyzer(model="llava:34b", cache=ScreenCache(ttl=10, max_distance=3))
+
+    with patch.object(analyzer.client, 'chat') as mock_chat:
+        mock_chat.return_value = {'message': {'content': 'A desktop'}}
+
+        first = await analyzer.analyze(Frame(desktop()), "What do you see?")
+        again = await analyzer.analyze(Frame(desktop(cursor=True)), "What do you see?")
+        changed = await analyzer.analyze(Frame(desktop(dialog=True)), "What do you see?")
+        analyzer.cache.invalidate()
+        after_input = await analyzer.analyze(Frame(desktop()), "What do you see?")
+
+    assert first == again == changed == after_input == 'A desktop'
+    assert mock_chat.call_count == 3
+    assert analyzer.cache.stats()["hits"] == 1
@@ -0,0 +1,75 @@
+"""
+Unit tests for screenshot retention
+"""
+import os
+import time
+
+from PIL import Image, ImageDraw
+
+from agent_s.vision.frame import Frame
+from agent_s.vision.screenshot_store import ScreenshotStore
+
+
+def screen(label: int) -> Frame:
+    img = Image.new('RGB', (320, 200), color=(40, 44, 52))
+    ImageDraw.Draw(img).rectangle((10 + label * 20, 10, 60 + label * 20, 60), fill=(240, 240, 240))
+    return Frame(img)
+
+
+def test_identical_frames_are_stored_once(tmp_path):
+    """A repeated screen reuses the stored file instead of writing another"""
+    store = ScreenshotStore(str(tmp_path), max_bytes=0, max_age=0, compress=False)
+
+    first = store.save(screen(0))
+    again = store.save(screen(0))
+    other = store.save(screen(1))
+
+    assert first == again != other
+    assert sorted(os.listdir(tmp_path)) == sorted([os.path.basename(first), os.path.basename(other)])
+    assert (store.writes, store.dedup_hits) == (2, 1)
+    assert store.path(os.path.basename(first)) == first
+    assert store.path("../etc/passwd") is None
+
+
+def test_size_budget_evicts_least_recently_used(tmp_path):
+    """Over the byte budget, the file used longest ago goes first"""
+    probe = ScreenshotStore(str(tmp_path / "probe"), max_bytes=0, max_age=0, compress=False)
+    size = os.path.getsize(probe.save(screen(0)))
+    store = ScreenshotStore(str(tmp_path / "store"), max_bytes=int(size * 2.5), max_age=0, compress=False)
+
+    a, b = store.save(screen(0)), store.save(screen(1))
+    store.path(os.path.basename(a))  # served: now the most recent
+    c = store.save(screen(2))
+
+    assert os.path.exists(a) and os.path.exists(c)
+    assert not os.path.exists(b)
+    assert store.path(os.path.basename(b)) is None
+    assert store.stats()["evictions"] == 1 and store.stats()["files"] == 2
+
+
+def test_existing_files_are_adopted_and_expired(tmp_path):
+    """Screenshots left by earlier runs are indexed, and dropped once too old"""
+    old, recent = tmp_path / "screen_20240101_000000_000000.png", tmp_path / "screen_recent.png"
+    for path in (old, recent):
+        screen(3).image.save(path)
+    os.utime(old, (time.time() - 7200, time.time() - 7200))
+    (tmp_path / "notes.txt").write_text("not a screenshot")
+
+    store = ScreenshotStore(str(tmp_path), max_bytes=0, max_age=3600, compress=False)
+
+    assert not old.exists()
+    assert store.path("screen_recent.png") == str(recent)
+    assert (tmp_path / "notes.txt").exists()
+    assert store.stats()["files"] == 1
+
+
+def test_compressed_storage_writes_lossless_webp(tmp_path):
+    """Compressed screenshots are WEBP, smaller than the fast PNG, pixel for pixel the same"""
+    frame = screen(4)
+    png = ScreenshotStore(str(tmp_path / "png"), compress=False).save(screen(4))
+    webp = ScreenshotStore(str(tmp_path / "webp"), compress=True).save(frame)
+
+    assert webp.endswith(".webp")
+    assert os.path.getsize(webp) < os.path.getsize(png)
+    with Image.open(webp) as img:
+        assert img.convert("RGB").tobytes() == frame.image.tobytes()
@@ -1,9 +1,12 @@
 """
 Unit tests for Vision Analyzer
 """
+import io
+
 import pytest
 from unittest.mock import Mock, patch, AsyncMock
 from agent_s.vision.analyzer import VisionAnalyzer
+from agent_s.vision.frame import Frame
 
 
 @pytest.fixture
@@ -41,7 +44,8 @@ async def test_analyze_screenshot(vision_analyzer, tmp_path):
         mock_chat.assert_called_once()
 
 
-def test_analyze_region(vision_analyzer, tmp_path):
+@pytest.mark.asyncio
+async def test_analyze_region(vision_analyzer, tmp_path):
     """Test region analysis"""
     from PIL import Image
     
@@ -58,13 +62,16 @@ def test_analyze_region(vision_analyzer, tmp_path):
             }
         }
         
-        result = vision_analyzer.analyze_region(
+        result = await vision_analyzer.analyze_region(
             image_path=str(image_path),
             x=100, y=100, w=200, h=200,
             prompt="What color is this?"
         )
         
         assert "Blue" in result
+        image = mock_chat.call_args.kwargs['messages'][0]['images'][0]
+        assert Image.open(io.BytesIO(image)).size == (200, 200)
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["test_screen.png"]
 
 
 def test_preprocess_image(vision_analyzer, tmp_path):
@@ -77,12 +84,14 @@ def test_preprocess_image(vision_analyzer, tmp_path):
     large_image.save(image_path)
     
     # Preprocess
-    processed_path = vision_analyzer._preprocess_image(str(image_path))
+    processed = vision_analyzer._preprocess_image(str(image_path))
     
-    # Check that image was resized
-    processed_image = Image.open(processed_path)
+    # Check that image was resized and encoded in memory
+    processed_image = Image.open(io.BytesIO(processed))
     assert processed_image.width <= 1280
     assert processed_image.height <= 720
+    assert processed_image.format == "JPEG"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["large_screen.png"]
 
 
 @pytest.mark.asyncio
@@ -110,3 +119,87 @@ async def test_identify_ui_elements(vision_analyzer, tmp_path):
         assert "raw_analysis" in result
         assert "elements" in result
         assert len(result["elements"]) > 0
+
+
+@pytest.mark.asyncio
+async def test_analyze_frame_sends_bytes_without_disk_writes(vision_analyzer, tmp_path, monkeypatch):
+    """A captured frame goes to the model as encoded bytes; nothing is written"""
+    from PIL import Image
+    
+    monkeypatch.setenv("SCREENSHOT_DIR", str(tmp_path))
+    frame = Frame(Image.new('RGB', (2560, 1440), color='green'))
+    
+    with patch.object(vision_analyzer.client, 'chat') as mock_chat:
+        mock_chat.return_value = {'message': {'content': 'Green screen'}}
+        
+        result = await vision_analyzer.analyze(image_path=frame, prompt="What do you see?")
+    
+    image = mock_chat.call_args.kwargs['messages'][0]['images'][0]
+    assert result == 'Green screen'
+    assert isinstance(image, bytes)
+    assert Image.open(io.BytesIO(image)).size == (1280, 720)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_frame_encodes_and_saves_once(tmp_path):
+    """Encodings are cached per format; save() writes one PNG and reuses it"""
+    from PIL import Image
+    
+    raw = Image.new('RGB', (64, 32), color=(10, 20, 30)).tobytes("raw", "BGRX")
+    frame = Frame.from_bgra(raw, (64, 32))
+    
+    assert frame.image.getpixel((0, 0)) == (10, 20, 30)
+    assert frame.encode() is frame.encode()
+    assert frame.encode("WEBP", 60) != frame.encode()
+    
+    path = frame.save(str(tmp_path))
+    assert frame.save(str(tmp_path)) == path
+    assert Image.open(path).size == (64, 32)
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+@pytest.mark.asyncio
+async def test_analyze_times_out_without_blocking(vision_analyzer):
+    """A model that never answers is abandoned after the per-call timeout"""
+    import asyncio
+    from PIL import Image
+    
+    async def hang(**kwargs):
+        await asyncio.sleep(60)
+    
+    frame = Frame(Image.new('RGB', (64, 64), color='white'))
+    with patch.object(vision_analyzer.client, 'chat', new=hang):
+        result = await vision_analyzer.analyze(frame, "What do you see?", timeout=0.05)
+    
+    assert "timed out" in result
+
+
+@pytest.mark.asyncio
+async def test_analyze_stream_yields_chunks_and_closes(vision_analyzer):
+    """Streaming yields content as it arrives; stopping early closes the stream"""
+    from PIL import Image
+    
+    closed = []
+    
+    async def chunks():
+        try:
+            for piece in ["A white ", "", "screen", " with more"]:
+                yield {'message': {'content': piece}}
+        finally:
+            closed.append(True)
+    
+    async def chat(**kwargs):
+        assert kwargs['stream'] is True
+        return chunks()
+    
+    frame = Frame(Image.new('RGB', (64, 64), color='white'))
+    with patch.object(vision_analyzer.client, 'chat', new=chat):
+        pieces = [p async for p in vision_analyzer.analyze_stream(frame, "What do you see?")]
+        
+        stream = vision_analyzer.analyze_stream(frame, "What do you see?")
+        first = await anext(stream)
+        await stream.aclose()
+    
+    assert pieces == ["A white ", "screen", " with more"]
+    assert first == "A white "
+    assert closed == [True, True]